@@ -5,4 +5,13 @@ __author_email__ = "dansonguyen@gmail.com"
 __version__ = "0.4.9.2"
 
 
-from altair.utils.schemapi import Undefined as altUndefined
+def __getattr__(name):
+    """
+    altUndefined is loaded on first use, so that importing csvviz, e.g. for
+    `csvviz --version`, doesn't also import altair
+    """
+    if name == "altUndefined":
+        from altair.utils.schemapi import Undefined
+
+        return Undefined
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,303 @@
+"""
+batch.py
+
+$ csvviz batch manifest.jsonl
+
+Renders many charts in one process, i.e. altair, pandas, and the Vizkit classes are imported
+just once, and each input file is parsed just once, no matter how many charts use it.
+
+Each line of the manifest is a JSON object, e.g.
+
+    {"viz": "bar", "input": "sales.csv", "output": "charts/sales.json", "options": {"x": "region", "y": "sum(revenue)"}}
+
+    - viz: a command name, e.g. "bar", "line"
+    - input: the path of a CSV file, or of anything else that a single chart can read,
+        e.g. a compressed CSV, or a Parquet file
+    - output: where to write the chart; its extension, i.e. '.json' or '.html', is the format
+    - options: keyed by the command's option names, with or without dashes, e.g.
+        "x", "xvar", "color-scheme", "color_scheme", "gridvar"
+
+Relative paths are relative to the working directory. Options that aren't given
+have the same defaults as on the command line
+
+$ csvviz batch --jobs 8 manifest.jsonl
+
+Renders the charts in 8 forked processes, which share the parsed dataframes
+
+$ csvviz batch --engine pyarrow --frame-cache manifest.jsonl
+
+Inputs are parsed the same way as with a single chart's --engine and --frame-cache
+"""
+
+import click
+from collections import Counter
+import json
+import os
+from pathlib import Path
+from typing import (
+    Any as AnyType,
+    Dict as DictType,
+    Iterable as IterableType,
+    Iterator as IteratorType,
+    List as ListType,
+    NamedTuple,
+    Optional as OptionalType,
+)
+
+from csvviz import registry
+from csvviz.exceptions import VizValueError
+from csvviz.utils.diskcache import atomic_path
+from csvviz.utils.parallel import can_fork, fork_map
+from csvviz.utils.sysio import clout, clerr
+
+OUTPUT_FORMATS = (
+    ".html",
+    ".json",
+)
+
+
+class BatchJob(NamedTuple):
+    lineno: int
+    viz: str
+    input_file: str
+    output: Path
+    options: DictType[str, AnyType]
+
+
+def parse_manifest(lines: IterableType[str]) -> ListType[BatchJob]:
+    """raises VizValueError for the first invalid line; blank lines are skipped"""
+    jobs = []
+    for lineno, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            d = json.loads(line)
+        except ValueError as err:
+            raise VizValueError(f"Manifest line {lineno} is not valid JSON: {err}")
+        if not isinstance(d, dict):
+            raise VizValueError(f"Manifest line {lineno} is not a JSON object")
+
+        missing = [k for k in ("viz", "input", "output") if not d.get(k)]
+        if missing:
+            raise VizValueError(
+                f"Manifest line {lineno} is missing: {', '.join(missing)}"
+            )
+        if d["viz"] not in registry.VIZ_COMMANDS:
+            raise VizValueError(
+                f"Manifest line {lineno} has an unknown viz '{d['viz']}'; expected one of: {', '.join(registry.VIZ_COMMANDS)}"
+            )
+        output = Path(d["output"])
+        if output.suffix.lower() not in OUTPUT_FORMATS:
+            raise VizValueError(
+                f"Manifest line {lineno} has an output path that doesn't end in one of: {', '.join(OUTPUT_FORMATS)}"
+            )
+
+        jobs.append(
+            BatchJob(
+                lineno=lineno,
+                viz=d["viz"],
+                input_file=d["input"],
+                output=output,
+                options=d.get("options") or {},
+            )
+        )
+    return jobs
+
+
+def job_options(command: click.Command, options: DictType[str, AnyType]) -> DictType:
+    """
+    The options dict that a Vizkit would've gotten from the command line: every param's
+    default, overridden by the given options, which are converted by each param's type
+    """
+    ctx = click.Context(command)
+    params = {}
+    for p in command.params:
+        if p.name == "input_file":
+            continue
+        params[p.name] = p
+        for opt in p.opts:
+            params.setdefault(opt.lstrip("-").replace("-", "_"), p)
+
+    opts = {p.name: p.get_default(ctx) for p in params.values()}
+    for key, value in options.items():
+        p = params.get(key.replace("-", "_"))
+        if p is None:
+            raise VizValueError(f"'{key}' is not an option of `{command.name}`")
+        try:
+            opts[p.name] = p.type_cast_value(ctx, value)
+        except click.BadParameter as err:
+            raise VizValueError(f"Invalid value for '{key}': {err.message}")
+
+    opts["no_preview"] = True
+    return opts
+
+
+class FrameCache:
+    """
+    Parses each input file once, and holds onto its dataframe only until
+    the last job that needs it has been rendered
+    """
+
+    def __init__(
+        self,
+        jobs: IterableType[BatchJob],
+        engine: str = "auto",
+        frame_cache: bool = False,
+    ):
+        self.remaining = Counter(self.key(j.input_file) for j in jobs)
+        self.engine = engine
+        self.frame_cache = frame_cache
+        self.frames = {}
+        self.errors = {}
+        # i.e. don't release frames, for when they're shared with forked processes
+        self.retain = False
+
+    @staticmethod
+    def key(path: str) -> Path:
+        return Path(path).resolve()
+
+    def get(self, path: str):
+        from csvviz.vizkit.datasource import DataSource
+
+        k = self.key(path)
+        if k in self.errors:
+            raise self.errors[k]
+        if k not in self.frames:
+            # i.e. read the same way as a single chart's input
+            src = DataSource(k, frame_cache=self.frame_cache, engine=self.engine)
+            self.frames[k] = src.read()
+        return self.frames[k]
+
+    def preload(self) -> None:
+        """parses every input now; a failure is raised later, by get()"""
+        for k in self.remaining:
+            try:
+                self.get(k)
+            except (ValueError, OSError) as err:
+                self.errors[k] = err
+
+    def release(self, path: str) -> None:
+        if self.retain:
+            return
+        k = self.key(path)
+        self.remaining[k] -= 1
+        if self.remaining[k] <= 0:
+            self.frames.pop(k, None)
+
+
+def render_job(job: BatchJob, frame) -> ListType[str]:
+    """renders and writes job's chart, and returns its warnings"""
+    command = registry.load_command(job.viz)
+    klass = registry.load_vizkit(job.viz)
+    vk = klass(input_file=frame, options=job_options(command, job.options))
+
+    # i.e. a chart that fails to serialize doesn't leave a half-written file behind
+    with atomic_path(job.output) as tmp:
+        if job.output.suffix.lower() == ".json":
+            with open(tmp, "w") as f:
+                f.writelines(vk.iter_chart_json())
+        else:
+            vk.raw_chart.save(str(tmp), format="html")
+    return vk.warnings
+
+
+class BatchResult(NamedTuple):
+    job: BatchJob
+    warnings: ListType[str]
+    error: OptionalType[str] = None
+
+
+def run_job(job: BatchJob, frames: FrameCache) -> BatchResult:
+    from altair import MaxRowsError
+
+    try:
+        return BatchResult(job, render_job(job, frames.get(job.input_file)))
+    # e.g. VizValueError, pandas.errors.ParserError, FileNotFoundError, and
+    # MaxRowsError, which isn't a ValueError
+    except (ValueError, OSError, MaxRowsError) as err:
+        return BatchResult(job, [], error=str(err))
+    finally:
+        frames.release(job.input_file)
+
+
+def run_jobs(
+    jobs: ListType[BatchJob],
+    processes: int = 1,
+    engine: str = "auto",
+    frame_cache: bool = False,
+) -> IteratorType[BatchResult]:
+    """
+    yields each job's result in the manifest's order, no matter which job finishes first.
+
+    With more than 1 process, every input is parsed up front, and the jobs are spread
+    across a pool of forked processes, which share the parsed dataframes
+    """
+    frames = FrameCache(jobs, engine=engine, frame_cache=frame_cache)
+    if processes > 1 and len(jobs) > 1 and can_fork():
+        frames.preload()
+        frames.retain = True  # i.e. each process has its own copy of the counts
+    yield from fork_map(lambda job: run_job(job, frames), jobs, processes=processes)
+
+
+@click.command(name="batch")
+@click.argument("manifest", type=click.File("r"))
+@click.option(
+    "--jobs",
+    "-j",
+    "processes",
+    type=click.IntRange(min=0),
+    default=1,
+    help="Render this many charts at a time, in separate processes; 0 means one per CPU",
+)
+@click.option(
+    "--engine",
+    type=click.Choice(["auto", "c", "pyarrow"], case_sensitive=False),
+    default="auto",
+    help="The CSV parser for every input, as with a single chart's --engine",
+)
+@click.option(
+    "--frame-cache",
+    is_flag=True,
+    help="Keep each parsed input in the columnar cache, as with a single chart's --frame-cache",
+)
+def command(manifest, processes, engine, frame_cache):
+    """
+    Render every chart described in a JSON-lines manifest, in one process, e.g.
+
+    \b
+        {"viz": "bar", "input": "sales.csv", "output": "charts/sales.json", "options": {"x": "region", "y": "sum(revenue)"}}
+
+    The path of each chart is printed as it's written, in the manifest's order. A chart
+    that fails is reported, and the rest are still rendered
+    """
+    try:
+        jobs = parse_manifest(manifest)
+    except VizValueError as err:
+        raise click.UsageError(str(err))
+
+    from csvviz.utils import arrow
+
+    if (engine == "pyarrow" or frame_cache) and not arrow.is_available():
+        clerr(
+            "Warning: --engine pyarrow and --frame-cache are ignored because they require pyarrow, e.g. `pip install pyarrow`"
+        )
+        engine, frame_cache = "c", False
+
+    failures = 0
+    results = run_jobs(
+        jobs,
+        processes=processes or os.cpu_count() or 1,
+        engine=engine,
+        frame_cache=frame_cache,
+    )
+    for result in results:
+        lineno = result.job.lineno
+        if result.error:
+            failures += 1
+            clerr(f"Error: [line {lineno}] {result.error}")
+        else:
+            [clerr(f"Warning: [line {lineno}] {w}") for w in result.warnings]
+            clout(str(result.job.output))
+
+    if failures:
+        raise click.ClickException(f"{failures} of {len(jobs)} charts failed")
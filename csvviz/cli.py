@@ -1,19 +1,27 @@
 import click
-import importlib
-import json
-from pathlib import Path
-import re
 import sys
 from typing import NoReturn as NoReturnType
 
-from csvviz import __version__
+from csvviz import __version__, registry, serve
+from csvviz.utils import spec_cache
 from csvviz.utils.sysio import clout, clerr
-from csvviz.info import command as infocommand
 
 
-SUBCOMMAND_PATHS = [
-    p for p in Path("csvviz/vizzes").glob("*.py") if p.name != "info.py"
-]
+class LazyGroup(click.Group):
+    """
+    Subcommands are looked up in csvviz.registry and imported on demand, so that
+    e.g. `csvviz --version` doesn't have to import altair, pandas, and every Vizkit
+    """
+
+    def list_commands(self, ctx) -> list:
+        return sorted(set(super().list_commands(ctx)) | set(registry.COMMANDS))
+
+    def get_command(self, ctx, name: str):
+        cmd = super().get_command(ctx, name)
+        if cmd is None and name in registry.COMMANDS:
+            cmd = registry.load_command(name)
+            self.add_command(cmd, name)
+        return cmd
 
 
 def _print_version(ctx=None, param=None, value=None) -> NoReturnType:
@@ -30,7 +38,7 @@ def _print_version(ctx=None, param=None, value=None) -> NoReturnType:
         ctx.exit()
 
 
-@click.group()
+@click.group(cls=LazyGroup)
 @click.option(
     "--version",
     callback=_print_version,
@@ -42,33 +50,32 @@ def cli(**kwargs):
     """csvviz (cvz) is a command-line tool for producing visualizations using the Vega-lite spec"""
     pass
 
-# manual hack for now
-from csvviz.vizzes import area, bar, heatmap, hist, line, scatter, stream
 
-def main():
-    ## this doesn't work for release, for some reason
-    # def _add_viz_subcommands() -> NoReturnType:
-    #     for path in SUBCOMMAND_PATHS:
-    #         modname = re.sub(f"/", ".", str(path)).rpartition(".py")[
-    #             0
-    #         ]  # e.g. "csvviz.viz.bar" or "csvviz.viz.info"
-    #         klassname = modname.split(".")[-1].capitalize() + "kit"
-    #         klass = getattr(importlib.import_module(modname), klassname)
+def output_cached(argv: list) -> bool:
+    """
+    Prints the spec that this exact command line produced before, if its input is unchanged;
+    i.e. without importing altair, pandas, or the Vizkit
+    """
+    if "--no-cache" in argv:
+        return False
+    hit = spec_cache.get_by_argv(argv)
+    if hit is None:
+        return False
+    clout(hit.spec)
+    [clerr(f"Warning: {w}") for w in hit.warnings]
+    return True
 
-    #         if getattr(klass, "register_command", None):  # TODO: remove after testing
-    #             cli.add_command(klass.register_command())
 
-    # _add_viz_subcommands()
-    # manually add info command
-    cli.add_command(infocommand)
-    cli.add_command(area.Areakit.register_command())
-    cli.add_command(bar.Barkit.register_command())
-    cli.add_command(heatmap.Heatmapkit.register_command())
-    cli.add_command(hist.Histkit.register_command())
-    cli.add_command(line.Linekit.register_command())
-    cli.add_command(scatter.Scatterkit.register_command())
-    cli.add_command(stream.Streamkit.register_command())
-    cli()
+def main():
+    argv = sys.argv[1:]
+    if output_cached(argv):
+        sys.exit(0)
+    # i.e. if `csvviz serve` is running, it does the work, already warmed up
+    exit_code = serve.forward(argv)
+    if exit_code is not None:
+        sys.exit(exit_code)
+    cli(obj={"argv": argv})
+
 
 if __name__ == "__main__":
     sys.exit(main())  # pragma: no cover
@@ -1,9 +1,8 @@
 import json
 
-import altair as alt
 import click
-import pandas as pd
 from csvviz import __version__ as csvviz_version
+from csvviz.utils.schema_index import INDEX_TOPICS, schema_index
 from csvviz.utils.sysio import clout, clerr
 
 # from typing import Mapping as MappingType, NoReturn as NoReturnType
@@ -22,10 +21,6 @@ INFO_OPTIONS = {
 }
 
 
-def load_schema():
-    return alt.vegalite.core.load_schema()
-
-
 @click.command(
     name="info",
     epilog="Topics:\n" + "\n".join([f"\n  {k}: {v}" for k, v in INFO_OPTIONS.items()]),
@@ -49,34 +44,18 @@ def command(infotype, **kwargs):
         csvinfo [TOPIC]
     """
 
-    schema = load_schema()
-
-    ## from alt.Core
-    if infotype == "aggregates":
-        values = alt.utils.core.AGGREGATES
-    elif infotype == "timeunits":
-        values = alt.utils.core.TIMEUNITS
-    elif infotype == "typecodes":
-        values = alt.utils.core.INV_TYPECODE_MAP
-
-    ## from the schema
-    elif infotype == "colors":
-        values = sorted(schema["definitions"]["ColorName"]["enum"])
-
-    elif infotype == "colorschemes":
-        cats = [
-            s["$ref"].split("/")[-1]
-            for s in schema["definitions"]["ColorScheme"]["anyOf"]
-        ]
-        values = tuple(
-            (c, val) for c in sorted(cats) for val in schema["definitions"][c]["enum"]
-        )
+    if infotype in INDEX_TOPICS:
+        # i.e. the values that come from Altair and its Vega-Lite schema
+        values = schema_index().topic(infotype)
 
     # TKD
     # elif infotype == "themes":
     #     values = sorted(AVAILABLE_THEMES)  # TODO refactor
 
     elif infotype == "versions":
+        import altair as alt
+        import pandas as pd
+
         # this should be a refactored constant
         values = {
             "csvviz": csvviz_version,
@@ -0,0 +1,49 @@
+"""
+registry.py
+
+Where each csvviz subcommand lives, so that cli.py can import only the one being invoked:
+    command name => (module name, attribute name)
+
+The attribute is either a Vizkit subclass, which gets registered as a command,
+    or an already-built click.Command, e.g. `info`
+"""
+
+import click
+import importlib
+from typing import (
+    Dict as DictType,
+    Tuple as TupleType,
+)
+
+COMMANDS: DictType[str, TupleType[str, str]] = {
+    "area": ("csvviz.vizzes.area", "Areakit"),
+    "bar": ("csvviz.vizzes.bar", "Barkit"),
+    "batch": ("csvviz.batch", "command"),
+    "heatmap": ("csvviz.vizzes.heatmap", "Heatmapkit"),
+    "hist": ("csvviz.vizzes.hist", "Histkit"),
+    "info": ("csvviz.info", "command"),
+    "line": ("csvviz.vizzes.line", "Linekit"),
+    "scatter": ("csvviz.vizzes.scatter", "Scatterkit"),
+    "serve": ("csvviz.serve", "command"),
+    "stream": ("csvviz.vizzes.stream", "Streamkit"),
+}
+
+# i.e. the commands that are Vizkits
+VIZ_COMMANDS = tuple(k for k, (_mod, attr) in COMMANDS.items() if attr.endswith("kit"))
+
+
+def load_command(name: str) -> click.Command:
+    """imports the module for the named command, and returns its click.Command"""
+    modname, attr = COMMANDS[name]
+    obj = getattr(importlib.import_module(modname), attr)
+    if isinstance(obj, click.Command):
+        return obj
+    return obj.register_command()
+
+
+def load_vizkit(name: str) -> type:
+    """returns the Vizkit subclass for the named viz command, e.g. 'bar' => Barkit"""
+    if name not in VIZ_COMMANDS:
+        raise KeyError(f"{name} is not a viz command")
+    modname, attr = COMMANDS[name]
+    return getattr(importlib.import_module(modname), attr)
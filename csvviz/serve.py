@@ -0,0 +1,297 @@
+"""
+serve.py
+
+$ csvviz serve --socket /tmp/csvviz.sock
+
+A daemon that has already imported altair, pandas, and every Vizkit, and loaded the
+schema index, so that a `csvviz` invocation only costs a fork. While it's running,
+the `csvviz` command forwards its arguments to it, i.e. via forward(), and falls back
+to running in-process if the daemon isn't there.
+
+The client sends its stdin, stdout, and stderr file descriptors over the socket, so the
+forked process reads and writes them directly, e.g. piped input, or --json output
+into a file. It also sends its working directory, and the environment variables that
+csvviz reads, e.g. $CSVVIZ_CACHE_DIR or $TZ, i.e. FORWARDED_ENV. The socket path is
+$CSVVIZ_SOCKET, or else in the csvviz cache directory; it's only accessible to its owner.
+
+Once the client's file descriptors have been handed off, the command can't be rerun
+in-process, e.g. the daemon may have read piped stdin; so forward() only falls back if
+the daemon explicitly refuses the request, and otherwise reports a failure
+
+Note: this module is imported by every `csvviz` invocation, so it should only
+import from the standard library at the top level
+"""
+
+import array
+import json
+import os
+import signal
+from pathlib import Path
+import socket
+import socketserver
+import sys
+import threading
+import time
+import traceback
+from typing import (
+    Dict as DictType,
+    List as ListType,
+    Optional as OptionalType,
+)
+
+import click
+
+from csvviz import __version__
+from csvviz.utils.schema_index import cache_dir
+
+# the longest request header, i.e. argv and the like, that the daemon will read
+MAX_HEADER_SIZE = 1 << 20
+STDIO_FDS = (0, 1, 2)
+
+# commands that shouldn't be forwarded to the daemon
+LOCAL_COMMANDS = ("serve",)
+
+# the client's environment variables that a request runs with, i.e. these, and any that
+# start with one of FORWARDED_ENV_PREFIXES; the daemon's own are unset if the client's aren't
+FORWARDED_ENV = ("TZ", "LANG", "COLUMNS", "TERM", "NO_COLOR")
+FORWARDED_ENV_PREFIXES = ("CSVVIZ_", "LC_")
+
+
+def socket_path() -> Path:
+    """$CSVVIZ_SOCKET, or else serve.sock in the cache directory"""
+    p = os.environ.get("CSVVIZ_SOCKET")
+    if p:
+        return Path(p)
+    return cache_dir() / "serve.sock"
+
+
+def is_supported() -> bool:
+    """i.e. Unix sockets that can pass file descriptors; not Windows"""
+    return hasattr(socket, "AF_UNIX") and hasattr(socket, "SCM_RIGHTS")
+
+
+def is_forwarded(name: str) -> bool:
+    return name in FORWARDED_ENV or name.startswith(FORWARDED_ENV_PREFIXES)
+
+
+def forwarded_env() -> DictType[str, str]:
+    """the subset of os.environ that forward() sends along"""
+    return {k: v for k, v in os.environ.items() if is_forwarded(k)}
+
+
+def apply_env(env: DictType[str, str]) -> None:
+    """makes os.environ's forwarded variables the client's, i.e. env"""
+    tz = os.environ.get("TZ")
+    for name in [k for k in os.environ if is_forwarded(k) and k not in env]:
+        del os.environ[name]
+    os.environ.update(env)
+    if os.environ.get("TZ") != tz and hasattr(time, "tzset"):
+        time.tzset()
+
+
+def read_line(sock: socket.socket) -> bytes:
+    buf = b""
+    while not buf.endswith(b"\n"):
+        chunk = sock.recv(4096)
+        if not chunk:
+            break
+        buf += chunk
+        if len(buf) > MAX_HEADER_SIZE:
+            raise ValueError("message is too long")
+    return buf
+
+
+def forward(argv: ListType[str], path: OptionalType[Path] = None) -> OptionalType[int]:
+    """
+    Runs argv on the daemon, if it's running, and returns its exit code;
+    returns None if argv should be run in-process instead, i.e. there's no daemon,
+    or it replied that it can't run it, e.g. it's a different version
+    """
+    if os.environ.get("CSVVIZ_NO_DAEMON") or not is_supported():
+        return None
+    if argv and argv[0] in LOCAL_COMMANDS:
+        return None
+
+    path = path or socket_path()
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(str(path))
+    except OSError:  # i.e. no daemon, or a stale socket file
+        sock.close()
+        return None
+
+    with sock:
+        header = {
+            "version": __version__,
+            "argv": argv,
+            "cwd": os.getcwd(),
+            "env": forwarded_env(),
+        }
+        fds = array.array("i", STDIO_FDS)
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            sock.sendmsg(
+                [json.dumps(header).encode() + b"\n"],
+                [(socket.SOL_SOCKET, socket.SCM_RIGHTS, fds)],
+            )
+        except OSError:  # e.g. the daemon went away before it got anything
+            return None
+        try:
+            reply = json.loads(read_line(sock) or b"{}")
+        except (OSError, ValueError):
+            reply = {}
+
+    if reply.get("error") == "mismatch":
+        return None
+    if not isinstance(reply.get("exit_code"), int):
+        # i.e. the daemon died mid-request; it may have already used e.g. stdin
+        click.echo(
+            f"Error: the csvviz daemon at {path} failed to run the command", err=True
+        )
+        return 1
+    return reply["exit_code"]
+
+
+class RequestHandler(socketserver.BaseRequestHandler):
+    """runs in a forked process, i.e. one per request"""
+
+    def handle(self):
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        sock = self.request
+        fds = array.array("i")
+        msg, ancdata, _flags, _addr = sock.recvmsg(
+            MAX_HEADER_SIZE, socket.CMSG_LEN(len(STDIO_FDS) * fds.itemsize)
+        )
+        for level, kind, data in ancdata:
+            if level == socket.SOL_SOCKET and kind == socket.SCM_RIGHTS:
+                fds.frombytes(data[: len(data) - (len(data) % fds.itemsize)])
+        if not msg:  # e.g. serve() checking whether a daemon is already listening
+            return
+        if not msg.endswith(b"\n"):
+            msg += read_line(sock)
+
+        try:
+            header = json.loads(msg)
+        except ValueError:
+            header = {}
+        if header.get("version") != __version__ or len(fds) != len(STDIO_FDS):
+            sock.sendall(json.dumps({"error": "mismatch"}).encode() + b"\n")
+            return
+
+        # from here on, this process's stdin/stdout/stderr are the client's
+        for fd, target in zip(fds, STDIO_FDS):
+            os.dup2(fd, target)
+            os.close(fd)
+        reopen_stdio()
+        os.chdir(header["cwd"])
+        apply_env(header.get("env", {}))
+
+        exit_code = run_cli(header["argv"])
+        sock.sendall(json.dumps({"exit_code": exit_code}).encode() + b"\n")
+
+
+def reopen_stdio() -> None:
+    """
+    New sys.stdin/stdout/stderr for the client's file descriptors, i.e. the daemon's
+    own streams have already decided e.g. whether they're seekable or a tty
+    """
+    sys.stdin = open(0, "r", closefd=False)
+    sys.stdout = open(1, "w", buffering=1 if os.isatty(1) else -1, closefd=False)
+    sys.stderr = open(2, "w", buffering=1, closefd=False)
+
+
+def run_cli(argv: ListType[str]) -> int:
+    """runs the csvviz command, and returns its exit code, like `csvviz` would"""
+    from csvviz.cli import cli
+
+    try:
+        cli.main(args=argv, prog_name="csvviz", obj={"argv": argv})
+        code = 0
+    except SystemExit as err:
+        code = err.code
+    except Exception:  # i.e. what the interpreter would've printed before exiting
+        traceback.print_exc()
+        code = 1
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+
+    if code is None:
+        return 0
+    return code if isinstance(code, int) else 1
+
+
+class Server(socketserver.ForkingMixIn, socketserver.UnixStreamServer):
+    pass
+
+
+def warm_up() -> None:
+    """imports and loads everything that a request might need"""
+    from csvviz import registry
+    from csvviz.utils.schema_index import schema_index
+    from csvviz.vizkit.serialize import cached_validator
+
+    for name in registry.COMMANDS:
+        registry.load_command(name)
+    schema_index()
+    cached_validator()
+
+
+def serve(path: Path) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.exists():
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(str(path))
+        except OSError:
+            path.unlink()  # i.e. a stale socket from a daemon that didn't clean up
+        else:
+            probe.close()
+            raise OSError(f"A csvviz daemon is already listening on {path}")
+
+    warm_up()
+    # i.e. the socket file is created without group/other access, rather than chmod()ed
+    # after bind(), which would leave a window in which anyone could connect
+    umask = os.umask(0o077)
+    try:
+        server = Server(str(path), RequestHandler)
+    finally:
+        os.umask(umask)
+    with server:
+        # i.e. so that e.g. `kill` also removes the socket file. shutdown() waits for
+        # serve_forever() to stop, so it can't be called from this thread
+        signal.signal(
+            signal.SIGTERM,
+            lambda signum, frame: threading.Thread(target=server.shutdown).start(),
+        )
+        try:
+            server.serve_forever()
+        finally:
+            if path.exists():
+                path.unlink()
+
+
+@click.command(name="serve")
+@click.option(
+    "--socket",
+    "socket_file",
+    type=click.Path(dir_okay=False),
+    help="The path of the Unix socket to listen on; defaults to $CSVVIZ_SOCKET, or serve.sock in the csvviz cache directory",
+)
+def command(socket_file):
+    """
+    Run a daemon that keeps csvviz loaded, so that each `csvviz` command that's run while
+    it's up only costs a fork. Commands find the daemon at $CSVVIZ_SOCKET, or the default
+    socket path; set CSVVIZ_NO_DAEMON=1 to run a command in-process anyway
+    """
+    if not is_supported():
+        raise click.ClickException("csvviz serve requires Unix domain sockets")
+    path = Path(socket_file) if socket_file else socket_path()
+    try:
+        serve(path)
+    except OSError as err:
+        raise click.ClickException(str(err))
+    except KeyboardInterrupt:
+        pass
@@ -14,3 +14,25 @@ DEFAULT_FACET_COLUMNS = 3
 DEFAULT_FACET_SPACING = 20
 
 DEFAULT_LEGEND_ORIENTATION = "right"
+
+# scatter: past this many rows, points are binned into a 2D grid, i.e. --density
+DEFAULT_DENSITY_THRESHOLD = 100000
+DEFAULT_DENSITY_MAXBINS = 50
+
+# the most disk space that cached --json specs can take up, before the least recently used are evicted
+DEFAULT_SPEC_CACHE_BYTES = 128 * 1024 * 1024
+
+# input with these extensions is read as text, i.e. without sniffing its magic bytes
+TEXT_INPUT_SUFFIXES = (".csv", ".tsv", ".txt")
+
+# --json: the dataset's rows are serialized this many at a time, rather than all at once
+DEFAULT_JSON_CHUNK_ROWS = 10000
+
+# the most disk space that --frame-cache can take up; overridden by $CSVVIZ_FRAME_CACHE_BYTES
+DEFAULT_FRAME_CACHE_BYTES = 4 * 1024 * 1024 * 1024
+
+# --engine auto: inputs at least this big are parsed with Arrow's multi-threaded CSV reader
+DEFAULT_ARROW_ENGINE_BYTES = 64 * 1024 * 1024
+
+# the read buffer for piped stdin, i.e. much bigger than sys.stdin's 8KB
+DEFAULT_STDIN_BUFFER_BYTES = 1024 * 1024
@@ -0,0 +1,119 @@
+"""
+arrow.py
+
+Helpers for the parts of csvviz that use pyarrow, i.e. --frame-cache and --engine pyarrow.
+pyarrow is optional, e.g. `pip install csvviz[arrow]`, so it's only imported
+by the functions that need it
+"""
+
+import importlib.util
+from typing import (
+    IO as IOType,
+    List as ListType,
+    Optional as OptionalType,
+    Union as UnionType,
+)
+
+import numpy as np
+import pandas as pd
+
+from csvviz.exceptions import VizValueError
+
+
+def is_available() -> bool:
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def to_pandas(table) -> pd.DataFrame:
+    """
+    table.to_pandas(), but with the dtypes that pd.read_csv would've inferred, i.e.
+        missing strings are NaN, not None; an all-empty column is float64, not object
+    """
+    import pyarrow as pa
+
+    for i, field in enumerate(table.schema):
+        if pa.types.is_null(field.type):
+            table = table.set_column(i, field.name, table.column(i).cast(pa.float64()))
+
+    # i.e. zero-copy where the dtypes allow, and the table's memory is freed as it's converted
+    df = table.to_pandas(split_blocks=True, self_destruct=True)
+    for col in df.columns:
+        if df[col].dtype == object:
+            df[col] = df[col].where(df[col].notna(), np.nan)
+    return df
+
+
+def is_peekable(stream: IOType[bytes]) -> bool:
+    """i.e. whether read_csv() can parse stream, e.g. piped stdin, which it can't rewind"""
+    return callable(getattr(stream, "peek", None))
+
+
+def read_csv(
+    source: UnionType[str, IOType[bytes]], usecols: OptionalType[ListType[str]] = None
+) -> pd.DataFrame:
+    """
+    Parses source, i.e. a CSV path, or a peekable binary stream, with Arrow's multi-threaded
+        reader, into the same dtypes that pd.read_csv would infer, e.g. dates are left as strings.
+        Arrow does the decoding, i.e. the bytes never become Python strs
+
+    Raises ValueError (e.g. pyarrow.ArrowInvalid) for input that pd.read_csv should parse
+        instead, e.g. rows with missing fields, which pandas fills with NaN; or duplicate or
+        blank column names, which pandas renames. A stream can't be handed to pandas once
+        Arrow has started reading it, so from there, it raises VizValueError
+    """
+    import pyarrow as pa
+    from pyarrow import csv as pacsv
+    from pandas._libs.parsers import STR_NA_VALUES
+
+    is_path = isinstance(source, str)
+
+    read_options = pacsv.ReadOptions(use_threads=True)
+    convert_options = dict(
+        null_values=sorted(STR_NA_VALUES),
+        strings_can_be_null=True,
+        true_values=["True", "TRUE", "true"],
+        false_values=["False", "FALSE", "false"],
+    )
+
+    # i.e. the column names, and the types inferred from the first block, which
+    # is enough to find the date columns, i.e. to keep them as strings
+    with pacsv.open_csv(
+        source if is_path else pa.BufferReader(peek_lines(source)),
+        read_options=read_options,
+        convert_options=pacsv.ConvertOptions(**convert_options),
+    ) as reader:
+        schema = reader.schema
+    names = schema.names
+    if len(set(names)) < len(names) or "" in names:
+        raise ValueError("Column names that pandas would rename")
+
+    temporal = (pa.types.is_temporal(f.type) for f in schema)
+    try:
+        table = pacsv.read_csv(
+            source,
+            read_options=read_options,
+            convert_options=pacsv.ConvertOptions(
+                **convert_options,
+                column_types={
+                    f.name: pa.string() for f, t in zip(schema, temporal) if t
+                },
+                include_columns=[c for c in names if usecols is None or c in usecols],
+            ),
+        )
+        if any(pa.types.is_temporal(t) for t in table.schema.types):
+            # e.g. a column that's blank throughout the first block, and dates after it
+            raise ValueError("Columns that Arrow parsed as dates")
+    except ValueError as err:
+        if is_path:
+            raise
+        raise VizValueError(
+            f"Arrow couldn't parse the piped input, which can't be reread with pandas; try --engine c ({err})"
+        ) from err
+    return to_pandas(table)
+
+
+def peek_lines(stream: IOType[bytes]) -> bytes:
+    """the whole lines at the start of stream's buffer, without reading them from it"""
+    head = stream.peek(1)
+    end = head.rfind(b"\n")
+    return head[: end + 1] if end >= 0 else head
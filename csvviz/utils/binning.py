@@ -0,0 +1,111 @@
+"""
+binning.py
+
+Reproduces Vega's binning in NumPy, so that histograms can be computed before
+the data is embedded in a chart
+"""
+
+import math
+import numpy as np
+from typing import (
+    NamedTuple,
+    Optional as OptionalType,
+    Tuple as TupleType,
+)
+
+# vega-lite's default maxbins for the x/y channels
+# https://vega.github.io/vega-lite/docs/bin.html#bin-parameters
+DEFAULT_MAXBINS = 10
+
+
+class BinParams(NamedTuple):
+    start: float
+    stop: float
+    step: float
+
+    @property
+    def count(self) -> int:
+        return max(1, int(round((self.stop - self.start) / self.step)))
+
+    @property
+    def edges(self) -> np.ndarray:
+        # rounded, so that e.g. 3 * 0.2 is embedded as 0.6, not 0.6000000000000001
+        return np.round(self.start + self.step * np.arange(self.count + 1), 12)
+
+
+def bin_params(
+    extent: TupleType[float, float],
+    maxbins: OptionalType[int] = None,
+    step: OptionalType[float] = None,
+    base: int = 10,
+    divide: TupleType[int, ...] = (5, 2),
+) -> BinParams:
+    """
+    A port of vega-statistics' bin(), i.e. how Vega picks "nice" bin boundaries:
+        https://github.com/vega/vega/blob/master/packages/vega-statistics/src/bin.js
+
+    extent: the (min, max) of the values to be binned
+    maxbins: the maximum number of bins; ignored if step is set
+    step: an exact step size for each bin
+    """
+    maxbins = maxbins or DEFAULT_MAXBINS
+    logb = math.log(base)
+    _min, _max = float(extent[0]), float(extent[1])
+    span = (_max - _min) or abs(_min) or 1
+
+    if not step:
+        level = math.ceil(math.log(maxbins) / logb)
+        # math.floor(x + 0.5) because JavaScript's Math.round() doesn't round half to even
+        step = base ** (math.floor(math.log(span) / logb + 0.5) - level)
+        # increase step size if too many bins
+        while math.ceil(span / step) > maxbins:
+            step *= base
+        # decrease step size if allowed
+        for d in divide:
+            v = step / d
+            if span / v <= maxbins:
+                step = v
+
+    v = math.log(step)
+    precision = 0 if v >= 0 else int(-v / logb) + 1
+    eps = base ** (-precision - 1)
+    v = math.floor(_min / step + eps) * step
+    start = v - step if _min < v else v
+    stop = math.ceil(_max / step) * step
+
+    if stop == start:
+        stop = start + step
+    return BinParams(start=start, stop=stop, step=step)
+
+
+def histogram(
+    values: np.ndarray, params: BinParams
+) -> TupleType[np.ndarray, np.ndarray]:
+    """
+    returns (counts, edges), like numpy.histogram; NaN values are ignored.
+
+    Like Vega, the last bin is closed on both sides, i.e. values equal to params.stop
+        are counted in the last bin
+    """
+    values = values[~np.isnan(values)]
+    return np.histogram(values, bins=params.count, range=(params.start, params.stop))
+
+
+def histogram2d(
+    xvalues: np.ndarray,
+    yvalues: np.ndarray,
+    xparams: BinParams,
+    yparams: BinParams,
+) -> np.ndarray:
+    """
+    returns the counts of (x, y) pairs as a 2D array, i.e. counts[i, j] is the number of
+        pairs in x bin i and y bin j; pairs with a NaN, or outside of the params, are ignored
+    """
+    valid = ~(np.isnan(xvalues) | np.isnan(yvalues))
+    counts, _xedges, _yedges = np.histogram2d(
+        xvalues[valid],
+        yvalues[valid],
+        bins=[xparams.count, yparams.count],
+        range=[(xparams.start, xparams.stop), (yparams.start, yparams.stop)],
+    )
+    return counts.astype(int)
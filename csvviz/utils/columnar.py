@@ -0,0 +1,240 @@
+"""
+columnar.py
+
+Reads Parquet, Feather, and Arrow IPC files, i.e. input that doesn't go through pd.read_csv:
+
+    fmt = detect_format("sales.parquet")        # => 'parquet'
+    column_names("sales.parquet", fmt)          # => ['region', 'month', 'revenue']
+    read("sales.parquet", fmt, columns=["month", "revenue"], filters=[("revenue", 0, 100)])
+
+The format is detected by the file's extension, or else, unless it's a text extension like .csv,
+by its magic bytes. Only the requested
+columns are read, and for Parquet, the filters skip the row groups whose statistics put them
+wholly outside of a range; every row of the other row groups is kept.
+Requires pyarrow, e.g. `pip install csvviz[arrow]`
+"""
+
+from contextlib import contextmanager
+from pathlib import Path
+from typing import (
+    Iterator as IteratorType,
+    List as ListType,
+    Optional as OptionalType,
+    Tuple as TupleType,
+)
+
+import pandas as pd
+
+from csvviz.exceptions import VizValueError
+from csvviz.settings import TEXT_INPUT_SUFFIXES
+from csvviz.utils.arrow import is_available, to_pandas
+
+# i.e. (field, min, max), inclusive
+RangeFilter = TupleType[str, float, float]
+
+EXTENSIONS = {
+    ".parquet": "parquet",
+    ".pq": "parquet",
+    ".feather": "feather",
+    ".arrow": "feather",
+    ".ipc": "feather",
+    ".arrows": "arrow_stream",
+}
+
+# (magic bytes at the start of the file, format)
+MAGIC_BYTES = (
+    (b"PAR1", "parquet"),
+    (b"ARROW1", "feather"),
+    (b"FEA1", "feather"),  # i.e. Feather V1
+    (b"\xff\xff\xff\xff", "arrow_stream"),
+)
+
+
+def detect_format(path: str) -> str:
+    """'parquet', 'feather', 'arrow_stream', or 'csv' for anything else"""
+    suffix = Path(path).suffix.lower()
+    if suffix in EXTENSIONS:
+        return EXTENSIONS[suffix]
+    if suffix in TEXT_INPUT_SUFFIXES:
+        return "csv"
+    try:
+        with open(path, "rb") as f:
+            head = f.read(8)
+            fmt = next(
+                (fmt for magic, fmt in MAGIC_BYTES if head.startswith(magic)), "csv"
+            )
+            if fmt == "parquet":
+                # i.e. a Parquet file also ends with its magic bytes, after its footer
+                f.seek(-4, 2)
+                if f.read(4) != b"PAR1":
+                    return "csv"
+    except OSError:
+        return "csv"
+    return fmt
+
+
+@contextmanager
+def _arrow_errors(path: str, fmt: str) -> IteratorType[None]:
+    """i.e. a file that isn't valid fmt is reported, rather than raised as a traceback"""
+    import pyarrow as pa
+
+    try:
+        yield
+    except (pa.ArrowException, OSError) as err:
+        raise VizValueError(f"Can't read '{path}' as {fmt}: {err}")
+
+
+def _require_pyarrow(fmt: str) -> None:
+    if not is_available():
+        raise VizValueError(
+            f"Reading {fmt} input requires pyarrow, e.g. `pip install pyarrow`"
+        )
+
+
+def _is_index_column(name: str) -> bool:
+    # i.e. how pyarrow stores a pandas RangeIndex-less index
+    return name.startswith("__index_level_")
+
+
+def schema(path: str, fmt: str):
+    """the file's pyarrow.Schema, without reading its data"""
+    _require_pyarrow(fmt)
+    import pyarrow as pa
+    from pyarrow import feather, parquet
+
+    with _arrow_errors(path, fmt):
+        if fmt == "parquet":
+            return parquet.read_schema(path)
+        if fmt == "arrow_stream":
+            with pa.ipc.open_stream(path) as reader:
+                return reader.schema
+        try:
+            with pa.ipc.open_file(path) as reader:
+                return reader.schema
+        except pa.ArrowInvalid:  # i.e. Feather V1, which isn't an IPC file
+            return feather.read_table(path).schema
+
+
+def column_names(path: str, fmt: str) -> ListType[str]:
+    return [n for n in schema(path, fmt).names if not _is_index_column(n)]
+
+
+def num_rows(path: str, fmt: str) -> OptionalType[int]:
+    """the file's row count, from its metadata, i.e. for Parquet; None for other formats"""
+    if fmt != "parquet":
+        return None
+    _require_pyarrow(fmt)
+    from pyarrow import parquet
+
+    return parquet.ParquetFile(path).metadata.num_rows
+
+
+def overlapping_row_groups(metadata, filters: ListType[RangeFilter]) -> ListType[int]:
+    """
+    the indexes of the Parquet row groups that might have a row within every one of the
+        ranges, i.e. groups with no min/max statistics for a field are kept
+    """
+    keep = []
+    for i in range(metadata.num_row_groups):
+        rg = metadata.row_group(i)
+        stats = {
+            rg.column(j).path_in_schema: rg.column(j).statistics
+            for j in range(rg.num_columns)
+        }
+        outside = False
+        for field, lo, hi in filters:
+            st = stats.get(field)
+            if st is None or not st.has_min_max:
+                continue
+            try:
+                outside = outside or st.max < lo or st.min > hi
+            except TypeError:  # e.g. a string column
+                continue
+        if not outside:
+            keep.append(i)
+    return keep
+
+
+def _as_frame(table, columns: ListType[str]) -> pd.DataFrame:
+    df = to_pandas(table)
+    if not isinstance(df.index, pd.RangeIndex):
+        # i.e. pandas metadata turned a column back into an index
+        df = df.reset_index()
+    return df[columns].reset_index(drop=True)
+
+
+def read(
+    path: str,
+    fmt: str,
+    columns: OptionalType[ListType[str]] = None,
+    filters: OptionalType[ListType[RangeFilter]] = None,
+) -> pd.DataFrame:
+    """
+    columns: the subset of columns to read, in the file's order; all columns if None
+
+    filters: for Parquet, the row groups whose min/max statistics are wholly outside of
+        one of these ranges are skipped; rows aren't filtered individually, and
+        other formats are read in full
+    """
+    _require_pyarrow(fmt)
+    import pyarrow as pa
+    from pyarrow import feather, parquet
+
+    sch = schema(path, fmt)
+    names = [n for n in sch.names if not _is_index_column(n)]
+    cols = [c for c in names if columns is None or c in columns]
+
+    with _arrow_errors(path, fmt):
+        if fmt == "parquet":
+            # i.e. filters on e.g. string columns are left alone
+            numeric = {
+                f.name
+                for f in sch
+                if pa.types.is_integer(f.type) or pa.types.is_floating(f.type)
+            }
+            ranges = [f for f in (filters or []) if f[0] in numeric]
+            pf = parquet.ParquetFile(path)
+            if ranges:
+                groups = overlapping_row_groups(pf.metadata, ranges)
+                table = pf.read_row_groups(
+                    groups, columns=cols, use_pandas_metadata=True
+                )
+            else:
+                table = pf.read(columns=cols, use_pandas_metadata=True)
+        elif fmt == "arrow_stream":
+            with pa.ipc.open_stream(path) as reader:
+                table = reader.read_all().select(cols)
+        else:
+            # i.e. only the requested columns are paged in
+            table = feather.read_table(path, columns=cols, memory_map=True)
+    return _as_frame(table, cols)
+
+
+def iter_batches(
+    path: str,
+    fmt: str,
+    batch_size: int,
+    columns: OptionalType[ListType[str]] = None,
+) -> IteratorType[pd.DataFrame]:
+    """the file as dataframes of at most batch_size rows, i.e. for --chunksize"""
+    _require_pyarrow(fmt)
+    import pyarrow as pa
+    from pyarrow import feather, parquet
+
+    names = column_names(path, fmt)
+    cols = [c for c in names if columns is None or c in columns]
+    if fmt == "parquet":
+        batches = parquet.ParquetFile(path).iter_batches(
+            batch_size=batch_size, columns=cols
+        )
+    elif fmt == "arrow_stream":
+        batches = (b.select(cols) for b in pa.ipc.open_stream(path))
+    else:
+        table = feather.read_table(path, columns=cols, memory_map=True)
+        batches = table.to_batches(max_chunksize=batch_size)
+
+    for batch in batches:
+        table = pa.Table.from_batches([batch])
+        # e.g. an IPC stream's batches can be bigger than batch_size
+        for i in range(0, max(table.num_rows, 1), batch_size):
+            yield _as_frame(table.slice(i, batch_size), cols)
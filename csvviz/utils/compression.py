@@ -0,0 +1,140 @@
+"""
+compression.py
+
+Recognizes compressed input, e.g. logs.csv.gz, by its suffix or else its magic bytes, so
+that it can be decompressed as it's parsed, rather than to a temp file first:
+
+    detect("logs.csv.gz")                   # => 'gzip'
+    detect_stream(sys.stdin.buffer)         # => 'zstd', e.g. `cat logs.csv.zst | csvviz ...`
+    decompress_stream(sys.stdin.buffer, 'zstd').read(100)
+
+zstd requires the zstandard package, e.g. `pip install csvviz[zstd]`; the others are stdlib.
+A file with a text extension, e.g. data.csv, is never sniffed, and input that turns out not
+to decompress raises VizValueError, via errors()
+"""
+
+import bz2
+import gzip
+import importlib.util
+import lzma
+from contextlib import contextmanager
+from pathlib import Path
+from typing import (
+    IO as IOType,
+    Iterable as IterableType,
+    Iterator as IteratorType,
+    Optional as OptionalType,
+    Tuple as TupleType,
+    TypeVar,
+)
+
+from csvviz.exceptions import VizValueError
+from csvviz.settings import TEXT_INPUT_SUFFIXES
+
+T = TypeVar("T")
+
+# i.e. what pd.read_csv(compression=...) calls them
+SUFFIXES = {
+    ".gz": "gzip",
+    ".bz2": "bz2",
+    ".xz": "xz",
+    ".zst": "zstd",
+    ".zstd": "zstd",
+}
+
+MAGIC_BYTES = (
+    (b"\x1f\x8b", "gzip"),
+    (b"BZh", "bz2"),
+    (b"\xfd7zXZ\x00", "xz"),
+    (b"\x28\xb5\x2f\xfd", "zstd"),
+)
+
+MAGIC_LENGTH = max(len(magic) for magic, _c in MAGIC_BYTES)
+
+
+def from_magic(head: bytes) -> OptionalType[str]:
+    return next((c for magic, c in MAGIC_BYTES if head.startswith(magic)), None)
+
+
+def detect(path: str) -> OptionalType[str]:
+    """'gzip', 'bz2', 'xz', 'zstd', or None if the file at path isn't compressed"""
+    suffix = Path(path).suffix.lower()
+    if suffix in SUFFIXES:
+        return SUFFIXES[suffix]
+    if suffix in TEXT_INPUT_SUFFIXES:
+        return None
+    try:
+        with open(path, "rb") as f:
+            return from_magic(f.read(MAGIC_LENGTH))
+    except OSError:
+        return None
+
+
+def detect_stream(stream: IOType[bytes]) -> OptionalType[str]:
+    """
+    the compression of a binary stream, e.g. piped stdin, by its magic bytes. The stream is
+        peeked at, or read from and rewound if it's seekable; None if it's neither
+    """
+    try:
+        peek = getattr(stream, "peek", None)
+        if peek is not None:
+            # peek() can return fewer bytes than asked for, e.g. from a pipe
+            return from_magic(peek(MAGIC_LENGTH)[:MAGIC_LENGTH])
+        if stream.seekable():
+            pos = stream.tell()
+            head = stream.read(MAGIC_LENGTH)
+            stream.seek(pos)
+            return from_magic(head) if isinstance(head, bytes) else None
+    except (AttributeError, OSError, ValueError):
+        pass
+    return None
+
+
+def require(compression: str) -> None:
+    if compression == "zstd" and importlib.util.find_spec("zstandard") is None:
+        raise VizValueError(
+            "Reading zstd-compressed input requires zstandard, e.g. `pip install zstandard`"
+        )
+
+
+def decompress_stream(stream: IOType[bytes], compression: str) -> IOType[bytes]:
+    """a binary file-like object that decompresses stream as it's read"""
+    require(compression)
+    if compression == "gzip":
+        return gzip.GzipFile(fileobj=stream, mode="rb")
+    if compression == "bz2":
+        return bz2.BZ2File(stream, mode="rb")
+    if compression == "xz":
+        return lzma.LZMAFile(stream, mode="rb")
+    import zstandard
+
+    # i.e. like `zstd -d`, which decompresses every frame, e.g. of concatenated files
+    return zstandard.ZstdDecompressor().stream_reader(stream, read_across_frames=True)
+
+
+def error_types(compression: str) -> TupleType[type, ...]:
+    """what reading a stream that isn't valid compression raises, e.g. gzip.BadGzipFile"""
+    # i.e. BadGzipFile and bz2's "Invalid data stream" are OSErrors; truncation is an EOFError
+    types = (OSError, EOFError, lzma.LZMAError)
+    if compression == "zstd":
+        import zstandard
+
+        types += (zstandard.ZstdError,)
+    return types
+
+
+@contextmanager
+def errors(compression: str, name: str = "input") -> IteratorType[None]:
+    """turns a decompression failure within this context into a VizValueError"""
+    try:
+        yield
+    except error_types(compression) as err:
+        raise VizValueError(f"Can't decompress {name} as {compression}: {err}") from err
+
+
+def checked(
+    chunks: IterableType[T], compression: str, name: str = "input"
+) -> IteratorType[T]:
+    """chunks, e.g. from pd.read_csv(chunksize=...), with errors() around each one"""
+    with errors(compression, name):
+        yield from chunks
@@ -0,0 +1,70 @@
+"""
+diskcache.py
+
+Helpers shared by csvviz's on-disk caches, i.e. spec_cache and frame_cache
+"""
+
+from contextlib import contextmanager
+import os
+from pathlib import Path
+from typing import Iterator as IteratorType
+
+
+def write_atomic(path: Path, data: bytes) -> None:
+    """writes to a temp file first, so that concurrent csvviz runs never read a half-written file"""
+    with atomic_path(path) as tmp:
+        tmp.write_bytes(data)
+
+
+@contextmanager
+def atomic_path(path: Path) -> IteratorType[Path]:
+    """
+    a temp path to write to, which replaces path only if the writing finishes, i.e. an error
+        leaves path as it was, rather than half-written, and the temp file is removed
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = temp_path(path)
+    try:
+        yield tmp
+        os.replace(tmp, path)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+
+
+def temp_path(path: Path) -> Path:
+    return path.with_name(f"{path.name}.{os.getpid()}.tmp")
+
+
+def touch(path: Path) -> None:
+    """marks path as recently used, i.e. for evict_lru()"""
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+def evict_lru(dirpath: Path, max_bytes: int) -> None:
+    """
+    deletes the least recently used, i.e. modified or touched, files in dirpath,
+        and its subdirectories, until they total at most max_bytes
+    """
+    entries = []
+    for p in Path(dirpath).rglob("*"):
+        try:
+            st = p.stat()
+        except OSError:  # e.g. deleted by another csvviz
+            continue
+        if p.is_file():
+            entries.append((st.st_mtime_ns, st.st_size, p))
+
+    total = sum(size for _mtime, size, _p in entries)
+    for _mtime, size, p in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            p.unlink()
+        except OSError:
+            pass
+        total -= size
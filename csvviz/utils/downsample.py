@@ -0,0 +1,131 @@
+"""
+downsample.py
+
+Largest-Triangle-Three-Buckets, i.e. downsampling a series while keeping its visual shape:
+    Steinarsson, S. (2013). Downsampling Time Series for Visual Representation
+    https://skemman.is/bitstream/1946/15343/3/SS_MSthesis.pdf
+"""
+
+import numpy as np
+import pandas as pd
+from typing import (
+    List as ListType,
+    Sequence as SequenceType,
+)
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n: int) -> np.ndarray:
+    """
+    Returns the indices of the n points of (x, y) that LTTB selects; x is expected to be sorted.
+
+    The first and last points are always kept. Every other point is picked from its own
+    bucket, as the point that makes the largest triangle with the previously picked point
+    and the average of the next bucket. That's inherently sequential across buckets, but
+    everything within a bucket (and all the bucket averages) is vectorized
+    """
+    length = len(x)
+    if n >= length or n < 3:
+        return np.arange(length) if n >= length else np.array([0, length - 1])[:n]
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+
+    # bucket i spans [edges[i], edges[i+1]); the first and last points are buckets of their own
+    every = (length - 2) / (n - 2)
+    edges = (np.floor(np.arange(n - 1) * every) + 1).astype(int)
+    edges[-1] = length - 1
+    sizes = np.diff(edges)
+    avg_x = np.add.reduceat(x[:-1], edges[:-1]) / sizes
+    avg_y = np.add.reduceat(y[:-1], edges[:-1]) / sizes
+    # the "next bucket" of the last bucket is the last point
+    avg_x = np.append(avg_x[1:], x[-1])
+    avg_y = np.append(avg_y[1:], y[-1])
+
+    picked = np.empty(n, dtype=int)
+    picked[0], picked[-1] = 0, length - 1
+    a = 0
+    for i in range(n - 2):
+        lo, hi = edges[i], edges[i + 1]
+        areas = np.abs(
+            (x[a] - avg_x[i]) * (y[lo:hi] - y[a])
+            - (x[a] - x[lo:hi]) * (avg_y[i] - y[a])
+        )
+        a = lo + int(np.argmax(areas))
+        picked[i + 1] = a
+
+    return picked
+
+
+def as_numeric(values: pd.Series) -> np.ndarray:
+    """
+    values as numbers, for measuring triangles: numbers as is, datetimes (or values
+    that can all be parsed as datetimes) as nanoseconds, and anything else by its position
+    """
+    if pd.api.types.is_numeric_dtype(values):
+        return values.to_numpy(dtype=float)
+    if not pd.api.types.is_datetime64_any_dtype(values):
+        try:
+            parsed = pd.to_datetime(values, errors="coerce")
+        except (TypeError, ValueError):
+            parsed = None
+        if parsed is None or parsed.isna().any():
+            return np.arange(len(values), dtype=float)
+        values = parsed
+    return values.to_numpy(dtype="datetime64[ns]").astype("int64").astype(float)
+
+
+def downsample_series(
+    data: pd.DataFrame,
+    xfield: str,
+    yfield: str,
+    by: ListType[str],
+    max_points: int,
+    stacked_by: SequenceType[str] = (),
+) -> pd.DataFrame:
+    """
+    Sorts data by xfield and then LTTB-downsamples each series (i.e. each group of `by`)
+    to at most max_points. Rows with a null x or y are dropped
+
+    stacked_by: the fields of `by` whose series are stacked on one another, e.g. an area
+        chart's colors. Those series are downsampled together, i.e. to the same x positions,
+        which LTTB picks from their stacked total; otherwise, the stack would be sampled
+        at a different x for each layer
+    """
+    data = data.dropna(subset=[xfield, yfield]).sort_values(xfield, kind="stable")
+    # i.e. dates like 'Jan 01 2005' are in date order, not text order; values that
+    # as_numeric() can only number by position keep the order they're sorted in above
+    data = data.iloc[np.argsort(as_numeric(data[xfield]), kind="stable")]
+    by = [f for f in by if f not in stacked_by]
+    if by:
+        keys = by[0] if len(by) == 1 else by
+        groups = data.groupby(keys, sort=False, dropna=False)
+    else:
+        groups = [((), data)]
+
+    frames = []
+    for _key, series in groups:
+        if stacked_by:
+            # i.e. in x order, as series is already sorted
+            totals = series.groupby(xfield, sort=False)[yfield].sum()
+            if len(totals) <= max_points:
+                frames.append(series)
+            else:
+                idx = lttb_indices(
+                    as_numeric(totals.index.to_series()),
+                    totals.to_numpy(dtype=float),
+                    max_points,
+                )
+                frames.append(series[series[xfield].isin(totals.index[idx])])
+        elif len(series) <= max_points:
+            frames.append(series)
+        else:
+            idx = lttb_indices(
+                as_numeric(series[xfield]),
+                as_numeric(series[yfield]),
+                max_points,
+            )
+            frames.append(series.iloc[idx])
+
+    if not frames:
+        return data
+    return pd.concat(frames).sort_index(kind="stable")
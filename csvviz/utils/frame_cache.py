@@ -0,0 +1,103 @@
+"""
+frame_cache.py
+
+An optional on-disk cache of parsed input files, i.e. --frame-cache: what pd.read_csv
+returned is stored as an uncompressed Feather (Arrow IPC) file, so that charting the same
+big CSV again memory-maps just the columns that the chart needs, rather than re-parsing
+all of the text:
+
+    df = read("data.csv", usecols=["date", "amount"])   # None on a miss
+    store("data.csv", df)
+
+The inferred dtypes, including datetimes, come back as they went in. Entries are keyed by
+the input's resolved path, size, and mtime, i.e. an edited file is a miss.
+
+The cache lives in $CSVVIZ_FRAME_CACHE_DIR, or cache_dir()/frames, and is capped at
+$CSVVIZ_FRAME_CACHE_BYTES, or DEFAULT_FRAME_CACHE_BYTES; the least recently used frames
+are evicted first. Requires pyarrow, e.g. `pip install csvviz[arrow]`
+"""
+
+import hashlib
+import os
+from pathlib import Path
+from typing import (
+    List as ListType,
+    Optional as OptionalType,
+)
+
+import pandas as pd
+
+from csvviz.settings import DEFAULT_FRAME_CACHE_BYTES
+from csvviz.utils.arrow import to_pandas
+from csvviz.utils.diskcache import evict_lru, temp_path, touch
+from csvviz.utils.schema_index import cache_dir
+
+
+def frames_dir() -> Path:
+    d = os.environ.get("CSVVIZ_FRAME_CACHE_DIR")
+    return Path(d) if d else cache_dir() / "frames"
+
+
+def max_bytes() -> int:
+    return int(os.environ.get("CSVVIZ_FRAME_CACHE_BYTES") or DEFAULT_FRAME_CACHE_BYTES)
+
+
+def entry_path(input_path: str) -> Path:
+    path = Path(input_path).resolve()
+    st = path.stat()
+    stamp = f"{path}\0{st.st_size}\0{st.st_mtime_ns}"
+    return frames_dir() / (
+        hashlib.blake2b(stamp.encode(), digest_size=20).hexdigest() + ".feather"
+    )
+
+
+def header(input_path: str) -> OptionalType[pd.DataFrame]:
+    """like DataSource.header(), i.e. just the column names; None on a miss"""
+    from pyarrow import ipc
+
+    try:
+        with ipc.open_file(str(entry_path(input_path))) as reader:
+            names = reader.schema.names
+    except (OSError, ValueError):  # i.e. pyarrow.ArrowInvalid, for a damaged file
+        return None
+    return pd.DataFrame(columns=names)
+
+
+def read(
+    input_path: str, usecols: OptionalType[ListType[str]] = None
+) -> OptionalType[pd.DataFrame]:
+    """the cached frame, with just usecols, in the input's order; None on a miss"""
+    from pyarrow import feather
+
+    path = entry_path(input_path)
+    try:
+        names = header(input_path).columns
+        cols = None if usecols is None else [c for c in names if c in usecols]
+        table = feather.read_table(str(path), columns=cols, memory_map=True)
+    except (AttributeError, OSError, ValueError):  # e.g. evicted since header()
+        return None
+    touch(path)
+    return to_pandas(table)
+
+
+def store(input_path: str, df: pd.DataFrame) -> bool:
+    """False if df can't be stored, e.g. a column of mixed strings and numbers"""
+    import pyarrow as pa
+    from pyarrow import feather
+
+    try:
+        path = entry_path(input_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+    except OSError:
+        return False
+    tmp = temp_path(path)
+    try:
+        # i.e. uncompressed, so that it can be memory-mapped
+        feather.write_feather(df, str(tmp), compression="uncompressed")
+        os.replace(tmp, path)
+    except (OSError, ValueError, TypeError, pa.ArrowException):
+        if tmp.exists():
+            tmp.unlink()
+        return False
+    evict_lru(frames_dir(), max_bytes())
+    return True
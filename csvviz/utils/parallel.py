@@ -0,0 +1,60 @@
+"""
+parallel.py
+
+A process pool for work that shares big, already-loaded objects, e.g. dataframes:
+the pool's processes are forked after the objects are loaded, so they inherit them,
+rather than having them pickled over for every task
+"""
+
+import multiprocessing as mp
+import os
+from typing import (
+    Any as AnyType,
+    Callable as CallableType,
+    Iterable as IterableType,
+    Iterator as IteratorType,
+    Optional as OptionalType,
+    Tuple as TupleType,
+)
+
+# i.e. (func, items) of the running fork_map(); set before the pool is forked
+_SHARED: OptionalType[TupleType[CallableType, list]] = None
+
+
+def _call(i: int) -> AnyType:
+    func, items = _SHARED
+    return func(items[i])
+
+
+def can_fork() -> bool:
+    return "fork" in mp.get_all_start_methods()
+
+
+def fork_map(
+    func: CallableType,
+    items: IterableType,
+    processes: OptionalType[int] = None,
+) -> IteratorType:
+    """
+    Like map(func, items), but across a pool of forked processes, and still yielding
+    the results in the order of items, no matter which process finishes first.
+
+    func and items are never pickled, so func can be a closure; the results are.
+
+    processes: defaults to one per CPU. With 1 process (or where fork isn't available,
+        e.g. Windows), this is just map()
+    """
+    global _SHARED
+
+    items = list(items)
+    processes = min(processes or os.cpu_count() or 1, len(items))
+    if processes <= 1 or not can_fork():
+        yield from map(func, items)
+        return
+
+    _SHARED = (func, items)
+    try:
+        with mp.get_context("fork").Pool(processes) as pool:
+            yield from pool.imap(_call, range(len(items)))
+    finally:
+        _SHARED = None
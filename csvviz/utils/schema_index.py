@@ -0,0 +1,113 @@
+"""
+schema_index.py
+
+A compact index of the Vega-Lite values that csvviz looks up, e.g. color scheme names,
+so that looking them up doesn't mean loading and walking the multi-megabyte schema:
+
+    schema_index().is_color_scheme("tableau20")    # => True
+
+The index is built once per altair version, i.e. the version of the bundled schema,
+then cached on disk (see cache_dir()) and in memory
+"""
+
+from functools import lru_cache
+import json
+import os
+from pathlib import Path
+from typing import (
+    Any as AnyType,
+    Dict as DictType,
+    Optional as OptionalType,
+)
+
+from csvviz.utils.diskcache import write_atomic
+
+INDEX_TOPICS = (
+    "aggregates",
+    "colors",
+    "colorschemes",
+    "timeunits",
+    "typecodes",
+)
+
+
+def cache_dir() -> Path:
+    """$CSVVIZ_CACHE_DIR, or ~/.cache/csvviz"""
+    d = os.environ.get("CSVVIZ_CACHE_DIR")
+    return Path(d) if d else Path.home() / ".cache" / "csvviz"
+
+
+def dist_version(name: str) -> str:
+    """an installed package's version, without importing it if possible"""
+    try:
+        from importlib.metadata import version
+
+        return version(name)
+    except Exception:  # e.g. python 3.7, or not installed as a distribution
+        import importlib
+
+        return importlib.import_module(name).__version__
+
+
+def altair_version() -> str:
+    return dist_version("altair")
+
+
+def build_index() -> DictType[str, AnyType]:
+    """walks Altair's Vega-Lite schema; this is the slow part"""
+    import altair as alt
+
+    schema = alt.vegalite.core.load_schema()
+    defs = schema["definitions"]
+    # e.g. ['Categorical', 'SequentialSingleHue', 'SequentialMultiHue', 'Diverging', 'Cyclical']
+    cats = [s["$ref"].split("/")[-1] for s in defs["ColorScheme"]["anyOf"]]
+
+    return {
+        "altair": alt.__version__,
+        "aggregates": list(alt.utils.core.AGGREGATES),
+        "colors": sorted(defs["ColorName"]["enum"]),
+        "colorschemes": [[c, s] for c in sorted(cats) for s in defs[c]["enum"]],
+        "timeunits": list(alt.utils.core.TIMEUNITS),
+        "typecodes": dict(alt.utils.core.INV_TYPECODE_MAP),
+    }
+
+
+class SchemaIndex:
+    def __init__(self, data: DictType[str, AnyType]):
+        self.data = data
+        self._color_schemes = frozenset(s for _cat, s in data["colorschemes"])
+        self._colors = frozenset(data["colors"])
+
+    def is_color_scheme(self, name: str) -> bool:
+        return name in self._color_schemes
+
+    def is_color(self, name: str) -> bool:
+        return name in self._colors
+
+    def topic(self, name: str) -> AnyType:
+        """the values of an `info` topic, in the shape that csvviz.info prints"""
+        if name == "colorschemes":
+            return tuple((c, s) for c, s in self.data[name])
+        return self.data[name]
+
+
+@lru_cache(maxsize=4)
+def _load_index(version: str, path: Path) -> SchemaIndex:
+    try:
+        data = json.loads(path.read_text())
+        if data.get("altair") == version and all(t in data for t in INDEX_TOPICS):
+            return SchemaIndex(data)
+    except (OSError, ValueError):
+        pass
+
+    data = build_index()
+    try:
+        write_atomic(path, json.dumps(data).encode())
+    except OSError:
+        pass  # e.g. a read-only home directory; the index just won't persist
+    return SchemaIndex(data)
+
+
+def schema_index(version: OptionalType[str] = None) -> SchemaIndex:
+    version = version or altair_version()
+    return _load_index(version, cache_dir() / f"schema-index-{version}.json")
@@ -0,0 +1,195 @@
+"""
+spec_cache.py
+
+An on-disk cache of chart specs, i.e. the output of `--json`, so that re-running the same
+command against an unchanged input file skips parsing, channel building, and serializing:
+
+    key = cache_key("bar", options, "data.csv")
+    hit = get(key)          # => CachedSpec(spec, warnings), or None
+    ...
+    put(key, spec, warnings)
+
+The key is a hash of the input's content, the command and its options, and the versions
+of csvviz, altair, and pandas. Hashing the input is skipped when its size and mtime
+haven't changed since it was last hashed.
+
+Each cached spec is also aliased by the command line that produced it, i.e. its argv
+and working directory, so that cli.main() can look it up with get_by_argv() before
+it imports the Vizkits, i.e. altair and pandas, as long as the input file's size and
+mtime are unchanged.
+
+The cache lives in cache_dir()/specs, and is capped at DEFAULT_SPEC_CACHE_BYTES;
+the least recently used specs are evicted first
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import (
+    Any as AnyType,
+    Dict as DictType,
+    List as ListType,
+    NamedTuple,
+    Optional as OptionalType,
+)
+
+from csvviz import __version__
+from csvviz.settings import DEFAULT_SPEC_CACHE_BYTES
+from csvviz.utils.diskcache import evict_lru, touch, write_atomic
+from csvviz.utils.schema_index import cache_dir, dist_version
+
+# options that don't affect the spec
+IGNORED_OPTIONS = (
+    "input_file",
+    "no_cache",
+    "no_preview",
+)
+
+HASH_BLOCKSIZE = 1 << 20
+
+
+class CachedSpec(NamedTuple):
+    spec: str
+    warnings: ListType[str]
+
+
+def specs_dir() -> Path:
+    return cache_dir() / "specs"
+
+
+def content_hash(path: Path) -> str:
+    """
+    A hash of the file's bytes; memoized on disk by the file's size and mtime,
+        so that an unchanged file is only read once
+    """
+    stamp = _stamp(path)
+    memo = (
+        specs_dir()
+        / "inputs"
+        / hashlib.blake2b(str(path).encode(), digest_size=16).hexdigest()
+    )
+    try:
+        d = json.loads(memo.read_text())
+        if d["stamp"] == stamp:
+            return d["digest"]
+    except (OSError, ValueError, KeyError):
+        pass
+
+    h = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCKSIZE), b""):
+            h.update(block)
+    digest = h.hexdigest()
+    try:
+        write_atomic(memo, json.dumps({"stamp": stamp, "digest": digest}).encode())
+    except OSError:
+        pass
+    return digest
+
+
+def cache_key(
+    command: str, options: DictType[str, AnyType], input_path: str
+) -> OptionalType[str]:
+    """
+    None if the input isn't a regular file, e.g. stdin, which can't be cached
+    """
+    path = Path(input_path)
+    try:
+        if not path.is_file():
+            return None
+        digest = content_hash(path.resolve())
+    except OSError:
+        return None
+
+    opts = {k: v for k, v in options.items() if k not in IGNORED_OPTIONS}
+    return _hash([digest, command, opts, versions()])
+
+
+def _hash(obj: AnyType) -> str:
+    blob = json.dumps(obj, sort_keys=True, default=str)
+    return hashlib.blake2b(blob.encode(), digest_size=20).hexdigest()
+
+
+def _stamp(path: Path) -> ListType[int]:
+    st = path.stat()
+    return [st.st_size, st.st_mtime_ns]
+
+
+def versions() -> ListType[str]:
+    """i.e. of the packages whose upgrade could change a spec"""
+    return [__version__, dist_version("altair"), dist_version("pandas")]
+
+
+def install_stamps() -> ListType:
+    """
+    A cheaper stand-in for versions(), i.e. without reading package metadata:
+        the size and mtime of each package's __init__.py, which an upgrade replaces
+    """
+    from importlib.util import find_spec
+
+    stamps = [__version__]
+    for name in ("altair", "pandas"):
+        spec = find_spec(name)
+        stamps.append(_stamp(Path(spec.origin)) if spec and spec.origin else None)
+    return stamps
+
+
+def argv_key(argv: ListType[str]) -> str:
+    return _hash([os.getcwd(), argv, install_stamps()])
+
+
+def get(key: str) -> OptionalType[CachedSpec]:
+    path = specs_dir() / f"{key}.json"
+    try:
+        with open(path, "r") as f:
+            warnings = json.loads(f.readline())
+            spec = f.read()
+    except (OSError, ValueError):
+        return None
+    touch(path)
+    return CachedSpec(spec, warnings)
+
+
+def get_by_argv(argv: ListType[str]) -> OptionalType[CachedSpec]:
+    """the spec that this command line produced, if its input file hasn't changed since"""
+    try:
+        alias = json.loads((specs_dir() / "argv" / argv_key(argv)).read_text())
+        if _stamp(Path(alias["input"])) != alias["stamp"]:
+            return None
+    except (OSError, ValueError, KeyError):
+        return None
+    return get(alias["key"])
+
+
+def put(
+    key: str,
+    spec: str,
+    warnings: ListType[str],
+    max_bytes: int = DEFAULT_SPEC_CACHE_BYTES,
+    argv: OptionalType[ListType[str]] = None,
+    input_path: OptionalType[str] = None,
+) -> None:
+    """
+    stores the spec, preceded by a line of its warnings, then evicts down to max_bytes.
+        If given, argv, i.e. the command line that produced the spec, is aliased to it
+    """
+    data = (json.dumps(warnings) + "\n" + spec).encode()
+    if len(data) > max_bytes:
+        return
+    try:
+        write_atomic(specs_dir() / f"{key}.json", data)
+        if argv is not None and input_path:
+            path = Path(input_path).resolve()
+            alias = {"key": key, "input": str(path), "stamp": _stamp(path)}
+            write_atomic(
+                specs_dir() / "argv" / argv_key(argv), json.dumps(alias).encode()
+            )
+        evict(max_bytes)
+    except OSError:
+        pass  # e.g. a read-only home directory; the spec just won't be cached
+
+
+def evict(max_bytes: int = DEFAULT_SPEC_CACHE_BYTES) -> None:
+    """i.e. specs, and their argv aliases and input hashes, which are tiny"""
+    evict_lru(specs_dir(), max_bytes)
@@ -7,12 +7,12 @@ from csvviz import __version__
 from csvviz.settings import *
 
 
-def clout(*args, use_stderr: bool = False) -> NoReturnType:
+def clout(*args, use_stderr: bool = False, nl: bool = True) -> NoReturnType:
     """top-level method that is used to output to stdout"""
     output = [
         json.dumps(a, indent=2) if isinstance(a, MappingType) else str(a) for a in args
     ]
-    click.echo(" ".join(output), err=use_stderr)
+    click.echo(" ".join(output), err=use_stderr, nl=nl)
 
 
 def clerr(*args) -> NoReturnType:
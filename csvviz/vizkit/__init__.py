@@ -5,6 +5,7 @@ from pathlib import Path
 from typing import (
     Callable as CallableType,
     Dict as DictType,
+    Iterator as IteratorType,
     List as ListType,
     NoReturn as NoReturnType,
     Optional as OptionalType,
@@ -12,12 +13,21 @@ from typing import (
 )
 
 
+from csvviz import altUndefined
 from csvviz.exceptions import ConflictingArgs
 from csvviz.helpers import parse_delimited_str
+from csvviz.utils import arrow
+from csvviz.utils.columnar import RangeFilter
+from csvviz.utils.downsample import downsample_series
+from csvviz.utils.schema_index import schema_index
 from csvviz.settings import *
 from csvviz.vizkit.channel_group import ChannelGroup
 from csvviz.vizkit.chart import Chart
+from csvviz.vizkit.data_out import is_dir_target
 from csvviz.vizkit.dataful import Dataful
+from csvviz.vizkit.datasource import DataSource
+from csvviz.vizkit.facets import FacetSplitter
+from csvviz.vizkit.pushdown import AggregatePushdown, FOLDABLE_OPS
 from csvviz.vizkit.interfaces import ClickFace, OutputFace
 
 
@@ -33,18 +43,31 @@ class Vizkit(Dataful, ClickFace, OutputFace):
 
     color_channel_name = "fill"  # can be either 'fill' or 'stroke'
 
+    # i.e. rows outside of --xlim/--ylim can be dropped as they're read, because every
+    # mark is clipped to the axes, and no mark depends on its neighbours, e.g. scatter
+    limit_filterable = False
+
     default_chart_height = 400
     default_chart_width = 600
 
     default_faceted_height = 150
     default_faceted_width = 250
 
-    def __init__(self, input_file: UnionType[str, Path], options: DictType):
+    def __init__(
+        self, input_file: UnionType[str, Path, pd.DataFrame], options: DictType
+    ):
         self.warnings = []
 
         self.validate_options(options)
         self.input_file = input_file
-        self._dataframe = pd.read_csv(self.input_file)
+        self.datasource = DataSource(
+            self.input_file,
+            chunksize=options.get("chunksize"),
+            frame_cache=options.get("frame_cache"),
+            engine=options.get("engine") or "c",
+        )
+        # column names only, which is all that's needed to resolve the default channels
+        self._dataframe = self.datasource.header()
         # as of now, input_file is supposed to be a Path/str, but
         # in the edge case that it isn't like for testing, filename needs
         # to be something...        self.filename = self.input_file.name
@@ -55,12 +78,22 @@ class Vizkit(Dataful, ClickFace, OutputFace):
         )
 
         self.options = self.set_default_channels_and_options(options)
+        self._dataframe = self.load_data()
 
         ch = self.init_channels()
         self.channels = self.finalize_channels(ch)
+        self.chart_data = self.finalize_data(self.df)
 
         c = self.init_chart()
         self.chart = self.finalize_chart(c)
+        if (
+            self.chart.inline_format != "records"
+            and not self.chart.is_inline_text
+            and not self.options.get("data_out")
+        ):
+            self.warnings.append(
+                f"--inline-format {self.chart.inline_format} is ignored because the data has columns of mixed types, so it's embedded as records"
+            )
 
     @classmethod
     def chart_defaults(klass) -> DictType:
@@ -89,6 +122,26 @@ class Vizkit(Dataful, ClickFace, OutputFace):
                 "--color-list and --color-scheme cannot both be specified."
             )
 
+        if raw_options.get("split_facets") and not raw_options.get("facetvar"):
+            raise ConflictingArgs("--split-facets requires -g/--gridvar")
+
+        data_out = raw_options.get("data_out")
+        if data_out and raw_options.get("split_facets") and not is_dir_target(data_out):
+            raise ConflictingArgs(
+                "--split-facets writes one dataset per facet, so --data-out has to be a directory"
+            )
+
+        for flag, name in (("frame_cache", "--frame-cache"), ("engine", "--engine")):
+            if raw_options.get(flag) not in (True, "pyarrow"):
+                continue
+            if not arrow.is_available():
+                raw_options[flag] = "c" if flag == "engine" else False
+                self.warnings.append(
+                    f"{name} is ignored because it requires pyarrow, e.g. `pip install pyarrow`"
+                )
+            elif raw_options.get("chunksize"):
+                self.warnings.append(f"{name} is ignored with --chunksize")
+
         if raw_options.get("color_scheme"):
             if not raw_options.get("colorvar"):
                 self.warnings.append(
@@ -129,6 +182,70 @@ class Vizkit(Dataful, ClickFace, OutputFace):
 
         return opts
 
+    def load_data(self) -> pd.DataFrame:
+        """
+        Parse only the columns that the channel arguments refer to, e.g.
+            -x date -y 'sum(price)' only needs 'date' and 'price'
+
+        prereqs:
+            - self.options has its default channels set, i.e. xvar and yvar
+
+        Note: any referenced field that isn't actually a column is left for ChannelGroup
+            to complain about
+
+        Note: in chunked mode, this returns only the first chunk
+        """
+        fields = ChannelGroup.referenced_fields(self.options, self.color_channel_name)
+        usecols = [c for c in self.column_names if c in fields]
+        self.usecols = None if len(usecols) == len(self.column_names) else usecols
+        filters = self.limit_filters() if self.datasource.can_push_down else None
+        return self.datasource.read(usecols=self.usecols, filters=filters)
+
+    def limit_filters(self) -> ListType[RangeFilter]:
+        """
+        --xlim/--ylim as (field, min, max) filters, e.g. -x mass --xlim '0,50' => ('mass', 0, 50),
+            but only for a plain x/y field, i.e. not binned or aggregated, and when the
+            viz is limit_filterable. They're only applied to input that can skip rows as it's
+            read, i.e. Parquet's row groups.
+
+        Skipped rows would otherwise still count toward a scale's domain, e.g. y's, if only
+            --xlim is set, or the size and color legends'. So there are no filters unless
+            both x and y are limited, and no other channel refers to the data
+        """
+        filters = []
+        if not self.limit_filterable:
+            return filters
+        channels = ChannelGroup.channel_args(self.options, self.color_channel_name)
+        if set(channels) - {"x", "y"}:
+            return filters
+        for lvar in ("x", "y"):
+            limarg = self.options.get(f"{lvar}lim")
+            chvar = channels.get(lvar)
+            if not (limarg and chvar):
+                return []
+            shorthand, _title = ChannelGroup.parse_channel_arg(chvar)
+            parsed = ChannelGroup.parse_shorthand(shorthand)
+            field = parsed.get("field")
+            if (
+                field not in self.column_names
+                or parsed.get("type", "quantitative") != "quantitative"
+                or any(parsed.get(k) for k in ("aggregate", "bin", "timeUnit"))
+            ):
+                return []
+            try:
+                lo, hi = [float(a.strip()) for a in limarg.split(",")]
+            except ValueError:
+                return []  # e.g. dates, which are left to Vega
+            filters.append((field, min(lo, hi), max(lo, hi)))
+        return filters
+
+    def data_chunks(self) -> IteratorType[pd.DataFrame]:
+        """
+        In chunked mode, i.e. --chunksize, self.df is only the first chunk, which is enough
+        to infer channel types; finalize_data() iterates over the whole input with this
+        """
+        return self.datasource.chunks(usecols=self.usecols)
+
     def init_channels(self) -> ChannelGroup:
         """just a wrapper around ChannelGroup constructor"""
         ch = ChannelGroup(
@@ -146,12 +263,81 @@ class Vizkit(Dataful, ClickFace, OutputFace):
         """
         return channels
 
+    def finalize_data(self, data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Reduce the parsed data to what actually gets embedded in the chart, rewriting
+        self.channels to match, e.g. -y 'sum(revenue)' is grouped and summed here,
+        rather than in the browser
+
+        In chunked mode, the whole input is folded into the aggregates chunk by chunk,
+        which is why that mode requires aggregate shorthand
+
+        Subclasses that do their own reducing (e.g. binning) should override this
+        """
+        pushdown = AggregatePushdown(self.channels)
+        if self.is_chunked:
+            if not pushdown.is_foldable:
+                raise ConflictingArgs(
+                    f"--chunksize requires a chart that can be aggregated chunk by chunk, i.e. with aggregate shorthand like -y 'sum(amount)', using one of: {', '.join(FOLDABLE_OPS)}"
+                )
+            data = pushdown.fold(self.data_chunks())
+            pushdown.rewrite_channels(self.channels)
+        elif pushdown.is_applicable:
+            data = pushdown.aggregate(data)
+            pushdown.rewrite_channels(self.channels)
+        return data
+
+    def downsample_series(
+        self, data: pd.DataFrame, max_points: int, stacked: bool = False
+    ) -> pd.DataFrame:
+        """
+        LTTB-downsample each series, i.e. each color and/or facet group, to at most max_points;
+            used by line-ish charts with a --max-points option
+
+        stacked: if True, the color groups are stacked, e.g. an area chart's, and so they're
+            downsampled to the same x positions
+
+        Only plain x and y fields can be downsampled, e.g. not 'year(date)' or 'argmax(price)',
+            which Vega still has to aggregate
+        """
+        fields = {}
+        for cname in ("x", "y", self.color_channel_name, "facet"):
+            channel = self.channels.get(cname)
+            if channel is None:
+                continue
+            if (
+                not isinstance(channel, alt.utils.schemapi.SchemaBase)
+                or channel._get("aggregate") is not altUndefined
+                or channel._get("bin") is not altUndefined
+                or channel._get("timeUnit") is not altUndefined
+            ):
+                self.warnings.append(
+                    f"--max-points is ignored because the '{cname}' channel is aggregated, binned, or time-unit'ed by Vega"
+                )
+                return data
+            fields[cname] = channel.field
+
+        by = []
+        for c in (self.color_channel_name, "facet"):
+            if c in fields and fields[c] not in by:
+                by.append(fields[c])
+
+        color = fields.get(self.color_channel_name)
+        return downsample_series(
+            data,
+            xfield=fields["x"],
+            yfield=fields["y"],
+            by=by,
+            max_points=max_points,
+            stacked_by=[color] if stacked and color else [],
+        )
+
     def init_chart(self) -> Chart:
         """
         instantiate and create a Chart object
 
         prereqs:
-            - self.channels has been set up
+            - self.channels and self.chart_data have been set up
             - self.chart_defaults() is defined
 
         Note: `options` is still just a sloppy grabbag from the command-line arg parser, consider
@@ -159,7 +345,7 @@ class Vizkit(Dataful, ClickFace, OutputFace):
         """
         x = Chart(
             viz_name=self.viz_commandname,
-            data=self.df,
+            data=self.chart_data,
             channels=self.channels,
             defaults=self.chart_defaults(),
             options=self.options,
@@ -173,18 +359,12 @@ class Vizkit(Dataful, ClickFace, OutputFace):
         # return chart
 
     @staticmethod
-    def validate_color_scheme(scheme: str) -> str:
-        # TK: DRY this schema loading with info.py's use
-        # also should be lazy loading, etc.
-        core = alt.vegalite.core.load_schema()
-        defs = core["definitions"]
-        cats = [s["$ref"].split("/")[-1] for s in defs["ColorScheme"]["anyOf"]]
-        # e.g. ['Categorical', 'SequentialSingleHue', 'SequentialMultiHue', 'Diverging', 'Cyclical']
-        all_schemes = []
-        for c in cats:
-            all_schemes.extend(defs[c]["enum"])
-
-        return scheme in all_schemes
+    def validate_color_scheme(scheme: str) -> bool:
+        return schema_index().is_color_scheme(scheme)
+
+    def write_split_facets(self, dirpath: UnionType[str, Path]) -> IteratorType[Path]:
+        """i.e. --split-facets: writes one chart per facet value; see facets.py"""
+        return FacetSplitter(self).write(dirpath)
 
     def chart_dict(self, **kwargs) -> dict:
         """
@@ -198,8 +378,20 @@ class Vizkit(Dataful, ClickFace, OutputFace):
         The JSON specification of the chart object.
         altair/utils/schemapi.py
         """
+        if self.options.get("no_validate"):
+            kwargs.setdefault("fast", True)
         return self.chart.to_json(**kwargs)
 
+    def iter_chart_json(self, **kwargs) -> IteratorType[str]:
+        """chart_json(), in pieces; see Chart.iter_json()"""
+        if self.options.get("no_validate"):
+            kwargs.setdefault("fast", True)
+        return self.chart.iter_json(**kwargs)
+
+    @property
+    def is_chunked(self) -> bool:
+        return bool(self.datasource.chunksize)
+
     @property
     def mark_name(self) -> str:
         return self.chart.mark_name
@@ -125,28 +125,101 @@ class ChannelGroup(dict, Dataful, Helpers):
         """Overrides the default implementation"""
         return {k: self[k] for k in CHANNELS.keys() if self.get(k)}
 
-    def scaffold(self) -> "ChannelGroup":
+    @staticmethod
+    def channel_args(
+        options: dict, color_channel_name: OptionalType[str] = None
+    ) -> DictType[str, str]:
+        """
+        returns the raw channel arguments, keyed by channel name, e.g.
+            {'x': 'name', 'y': 'sum(amount)|Total', 'fill': 'fruit'}
+        """
         # at this point, options['colorvar'] is set (via Click interface), but NOT
         #  options['fillvar']/options['strokevar']/etc
-        # so we (messily) inject it into a copy of the self.options dict (don't want to alter original tho...)
+        # so we (messily) inject it into a copy of the options dict (don't want to alter original tho...)
         # TK: seems like spaghetti but whatever...
-        _opts = self.options.copy()
+        _opts = options.copy()
         colarg = _opts.get("colorvar")
         if colarg:
-            _opts["%svar" % self.color_channel_name] = colarg
-
-        for cname, Channel in CHANNELS.items():
-            k = _opts.get(f"{cname}var")
-            if k:
-                shorthand, title = self.parse_channel_arg(k)
-                chargs = self.parse_shorthand(shorthand, data=self.df)
-                if chargs["field"] not in self.column_names:
-                    raise InvalidDataReference(
-                        f"""'{shorthand}' is either an invalid column name, or invalid Altair shorthand"""
-                    )
-                if title:
-                    chargs["title"] = title
-                self[cname] = Channel(**chargs)
+            _opts["%svar" % color_channel_name] = colarg
+
+        return {
+            cname: _opts[f"{cname}var"]
+            for cname in CHANNELS.keys()
+            if _opts.get(f"{cname}var")
+        }
+
+    @classmethod
+    def referenced_fields(
+        klass,
+        options: dict,
+        color_channel_name: OptionalType[str] = None,
+    ) -> ListType[str]:
+        """
+        The data fields that the channel arguments refer to, resolved without
+        needing any data, e.g. -x name -y 'sum(amount)' => ['name', 'amount']
+
+        Vizkit uses this to figure out which columns actually need to be parsed
+        """
+        fields = []
+        for arg in klass.channel_args(options, color_channel_name).values():
+            shorthand, _title = klass.parse_channel_arg(arg)
+            f = klass.parse_shorthand(shorthand).get("field")
+            if f and f not in fields:
+                fields.append(f)
+        return fields
+
+    def encoded_fields(self) -> OptionalType[ListType[str]]:
+        """
+        The data fields that the finished channels (including any tooltip) refer to,
+            e.g. a channel's field, or the field of its sort, i.e. what Chart has to embed.
+
+        Returns None if any channel can't be inspected, i.e. every field should be kept
+        """
+        fields = []
+
+        def _collect(obj):
+            if isinstance(obj, dict):
+                for k, v in obj.items():
+                    if k == "field" and isinstance(v, str):
+                        if v not in fields:
+                            fields.append(v)
+                    else:
+                        _collect(v)
+            elif isinstance(obj, (list, tuple)):
+                for v in obj:
+                    _collect(v)
+
+        for channel in self.values():
+            items = channel if isinstance(channel, (list, tuple)) else [channel]
+            for ch in items:
+                if isinstance(ch, str):
+                    ch = self.parse_shorthand(ch)
+                elif isinstance(ch, alt.utils.schemapi.SchemaBase):
+                    try:
+                        ch = ch.to_dict(validate=False)
+                    except Exception:  # e.g. shorthand that needs data to be resolved
+                        return None
+                _collect(ch)
+
+        return fields
+
+    def scaffold(self) -> "ChannelGroup":
+        args = self.channel_args(self.options, self.color_channel_name)
+        for cname, k in args.items():
+            Channel = CHANNELS[cname]
+            shorthand, title = self.parse_channel_arg(k)
+            chargs = self.parse_shorthand(shorthand, data=self.df)
+            field = chargs.get("field")
+            # fieldless aggregate shorthand, i.e. 'count()', is fine
+            if field not in self.column_names and not (
+                field is None and chargs.get("aggregate")
+            ):
+                raise InvalidDataReference(
+                    f"""'{shorthand}' is either an invalid column name, or invalid Altair shorthand"""
+                )
+            if title:
+                chargs["title"] = title
+            self[cname] = Channel(**chargs)
 
         return self
 
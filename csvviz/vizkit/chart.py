@@ -1,20 +1,26 @@
 import altair as alt
+from contextlib import contextmanager
 import pandas as pd
+import re
 from typing import (
     Any as AnyType,
     Callable as CallableType,
     Dict as DictType,
+    Iterator as IteratorType,
     List as ListType,
     NoReturn as NoReturnType,
     Optional as OptionalType,
-    # Tuple as TupleType,
-    # Union as UnionType,
+    Tuple as TupleType,
+    Union as UnionType,
 )
 
 
 from csvviz.vizkit.channel_group import ChannelGroup
+from csvviz.vizkit.data_out import write_data
 from csvviz.vizkit.dataful import Dataful
-
+from csvviz.vizkit.inline import inline_data
+from csvviz.vizkit.sanitize import enable_data_transformer, presanitized, sanitize
+from csvviz.vizkit.serialize import is_streamable, iter_chart_json, spec_to_json
 
 DEFAULT_PROPS = {
     "autosize": {
@@ -30,6 +36,7 @@ VIZ_MARK_NAME_LOOKUP = {
     "abstract": "bar",  # for testing purposes
     "area": "area",
     "bar": "bar",
+    "density": "rect",  # i.e. scatter --density
     "heatmap": "rect",
     "hist": "bar",
     "line": "line",
@@ -38,6 +45,16 @@ VIZ_MARK_NAME_LOOKUP = {
 }
 
 
+def unescape_field(field: str) -> str:
+    """e.g. 'a\\.b' => 'a.b'"""
+    return re.sub(r"\\(.)", r"\1", field)
+
+
+def field_root(field: str) -> str:
+    """the top-level name of a nested field reference, e.g. 'a.b' => 'a'"""
+    return unescape_field(re.split(r"(?<!\\)[.\[]", field)[0])
+
+
 class Chart(Dataful):
     def __init__(
         self,
@@ -61,6 +78,10 @@ class Chart(Dataful):
         self.defaults = defaults
         self._dataframe = data
         self._channels = channels
+        # i.e. whether the dataset was embedded as --inline-format csv/tsv text
+        self.is_inline_text = False
+        # (the chart's dataframe, its sanitized copy), once it's been serialized
+        self._sanitized: OptionalType[TupleType[pd.DataFrame, pd.DataFrame]] = None
 
         tkc = self.scaffold()
         # given a funky name because _chart_object is not meant to be touched
@@ -69,7 +90,8 @@ class Chart(Dataful):
 
     def scaffold(self) -> alt.Chart:
         alt.themes.enable("none")
-        c = alt.Chart(data=self.df)
+        enable_data_transformer()
+        c = alt.Chart(data=self.data_spec())
 
         # set local configs
         # c = getattr(c, self.mark_method_name)(clip=True)
@@ -96,6 +118,17 @@ class Chart(Dataful):
 
         return c
 
+    def data_spec(self) -> UnionType[pd.DataFrame, alt.Data]:
+        """
+        the chart's data: written to --data-out and referenced by URL, or else embedded,
+            i.e. as --inline-format
+        """
+        if self.options.get("data_out"):
+            return write_data(self.embedded_data, self.options["data_out"])
+        data = inline_data(self.embedded_data, self.inline_format)
+        self.is_inline_text = isinstance(data, alt.InlineData)
+        return data
+
     def init_props(self) -> DictType:
         """assumes self.channels has been set, particularly the types of x/y channels"""
         props = {}
@@ -138,13 +171,28 @@ class Chart(Dataful):
         Convert the chart to a dictionary suitable for JSON export
         File:   altair/vegalite/v4/api.py
         """
-        return self.raw_chart.to_dict(**kwargs)
+        with self.sanitized_data():
+            return self.raw_chart.to_dict(**kwargs)
 
-    def to_json(self, **kwargs) -> str:
+    @contextmanager
+    def sanitized_data(self) -> IteratorType[None]:
         """
-        The JSON specification of the chart object.
-        altair/utils/schemapi.py
+        within this context, the chart's dataframe is serialized from the sanitized copy that
+            this chart keeps, i.e. it's sanitized only once, however many times the chart is
+            serialized. The copy is redone if the chart's data is replaced, but not if
+            the dataframe is modified in place
         """
+        df = self.raw_chart.data
+        if not isinstance(df, pd.DataFrame):
+            yield
+            return
+        if self._sanitized is None or self._sanitized[0] is not df:
+            self._sanitized = (df, sanitize(df))
+        with presanitized(*self._sanitized):
+            yield
+
+    @staticmethod
+    def _json_kwargs(kwargs: DictType) -> DictType:
         kwargs["indent"] = kwargs.get("indent") or 2
         kwargs["sort_keys"] = (
             False if kwargs.get("sort_keys") is None else kwargs["sort_keys"]
@@ -152,8 +200,32 @@ class Chart(Dataful):
         kwargs["validate"] = (
             True if kwargs.get("validate") is None else kwargs["validate"]
         )
+        return kwargs
+
+    def iter_json(self, **kwargs) -> IteratorType[str]:
+        """
+        to_json(), in pieces, i.e. with the embedded dataset's rows serialized a chunk at a time
+        """
+        kwargs = self._json_kwargs(kwargs)
+        if is_streamable(self.raw_chart, kwargs["indent"]):
+            yield from iter_chart_json(self.raw_chart, **kwargs)
+        else:
+            yield self.to_json(**kwargs)
+
+    def to_json(self, **kwargs) -> str:
+        """
+        The JSON specification of the chart object.
+        altair/utils/schemapi.py
 
-        return self.raw_chart.to_json(**kwargs)
+        fast: validate only the spec's skeleton and serialize with orjson, if available
+        """
+        kwargs = self._json_kwargs(kwargs)
+
+        with self.sanitized_data():
+            if kwargs.pop("fast", False):
+                # i.e. --no-validate: see serialize.py
+                return spec_to_json(self.raw_chart.to_dict(validate=False), **kwargs)
+            return self.raw_chart.to_json(**kwargs)
 
     @property
     def channels(self) -> ChannelGroup:
@@ -164,12 +236,38 @@ class Chart(Dataful):
         """returns OptionalType[UnionType[alt.Fill, alt.Stroke]]"""
         return self.channels.color_channel
 
+    @property
+    def embedded_data(self) -> pd.DataFrame:
+        """
+        self.df, minus the columns that no channel refers to, which would otherwise
+            be serialized into every row of the chart's dataset
+        """
+        fields = self.channels.encoded_fields()
+        if not fields:
+            return self.df
+
+        cols = []
+        for col in self.column_names:
+            # vega-lite field names can be nested references, e.g. 'a.b' or 'a[0]',
+            # with literal dots/brackets escaped
+            if any(
+                f == col or unescape_field(f) == col or field_root(f) == col
+                for f in fields
+            ):
+                cols.append(col)
+        return self.df[cols] if len(cols) < len(self.column_names) else self.df
+
     @property
     def is_faceted(self) -> bool:
         """should throw error if accessed before self.channels is set"""
         c = self.channels.get("facet")
         return isinstance(c, alt.Facet)
 
+    @property
+    def inline_format(self) -> str:
+        """i.e. --inline-format: 'records', the default, 'csv', or 'tsv'"""
+        return self.options.get("inline_format") or "records"
+
     @property
     def interactive_mode(self) -> bool:
         return self.options.get("is_interactive") == True
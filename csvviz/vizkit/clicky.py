@@ -2,6 +2,7 @@ import click
 from collections import defaultdict
 from contextlib import contextmanager
 import sys
+from typing import IO as IOType
 
 from csvviz.settings import *
 
@@ -50,6 +51,31 @@ class Clicky(click.Command):
         return ctx
 
 
+def stdin_reader(buffer_size: int = DEFAULT_STDIN_BUFFER_BYTES) -> IOType[bytes]:
+    """
+    stdin as undecoded bytes, with a big read buffer, i.e. the parser gets large reads,
+        and does its own decoding
+    """
+    stdin = click.get_binary_stream("stdin")
+    try:
+        fd = stdin.fileno()
+    except (AttributeError, OSError, ValueError):  # e.g. CliRunner's BytesIO
+        return stdin
+    return open(fd, "rb", buffering=buffer_size, closefd=False)
+
+
+class InputFile(click.File):
+    """click.File('rb'), except that '-' gets stdin_reader()"""
+
+    def __init__(self):
+        super().__init__("rb")
+
+    def convert(self, value, param, ctx):
+        if value == "-":
+            return stdin_reader()
+        return super().convert(value, param, ctx)
+
+
 class GenArgument(click.Argument):
     """not much different from regular click.Argument, for now"""
 
@@ -67,7 +93,7 @@ class GenArgument(click.Argument):
             return value
         else:
             if not sys.stdin.isatty():
-                return click.get_text_stream("stdin")
+                return stdin_reader()
             else:
                 ctx.fail(
                     f"Missing argument: {param.human_readable_name}.\n"
@@ -110,6 +136,13 @@ GENERAL_OPTS["facet"] = {
         type=click.STRING,
         help="The name of the column to use as a facet for creating a grid of multiple charts",
     ),
+    "split_facets": GenOption.foo(
+        "--split-facets",
+        "split_facets",
+        category="Grid (i.e. faceted/trellis)",
+        type=click.Path(file_okay=False, writable=True),
+        help="Rather than one faceted chart, write each facet's chart (as JSON) into this directory, with shared scales. The paths are printed to stdout",
+    ),
     "facet_columns": GenOption.foo(
         "--grid-columns",
         "--gc",
@@ -204,10 +237,29 @@ GENERAL_OPTS["axis"] = {
 GENERAL_OPTS["io"] = {
     "input_file": GenArgument.foo(
         "input_file",
-        type=click.File("r"),
+        type=InputFile(),
         required=False,
         callback=GenArgument.check_piped_arg,
     ),
+    "chunksize": GenOption.foo(
+        "--chunksize",
+        category="Input",
+        type=click.IntRange(min=1),
+        help="Read the input this many rows at a time, folding each chunk into running aggregates so that memory stays bounded. Requires aggregate shorthand, e.g. -y 'sum(amount)', or a hist chart",
+    ),
+    "engine": GenOption.foo(
+        "--engine",
+        category="Input",
+        type=click.Choice(["auto", "c", "pyarrow"], case_sensitive=False),
+        default="auto",
+        help=f"The CSV parser: pandas' 'c', or Arrow's multi-threaded 'pyarrow' (requires pyarrow); 'auto' (default) uses pyarrow, if it's installed, for files of {DEFAULT_ARROW_ENGINE_BYTES // 2**20}MB or more",
+    ),
+    "frame_cache": GenOption.foo(
+        "--frame-cache",
+        category="Input",
+        is_flag=True,
+        help="Keep the parsed input in a columnar cache (requires pyarrow), so that later charts of the same, unchanged file skip parsing it",
+    ),
     "is_interactive": GenOption.foo(
         "--interactive/--static",
         "is_interactive",
@@ -223,6 +275,31 @@ GENERAL_OPTS["io"] = {
         default=False,
         help="Output to stdout the Vega JSON representation",
     ),
+    "no_validate": GenOption.foo(
+        "--no-validate",
+        category="Output and presentation",
+        is_flag=True,
+        help="Skip validating the embedded data against the Vega-Lite schema, and serialize with orjson if it's installed; much faster for large datasets",
+    ),
+    "inline_format": GenOption.foo(
+        "--inline-format",
+        category="Output and presentation",
+        type=click.Choice(["records", "csv", "tsv"], case_sensitive=False),
+        default="records",
+        help="How the data is embedded in the spec: as an array of row objects (default), or as a compact 'csv' or 'tsv' string, typed with format.parse, which doesn't repeat the column names in every row",
+    ),
+    "data_out": GenOption.foo(
+        "--data-out",
+        category="Output and presentation",
+        type=click.Path(dir_okay=True, writable=True),
+        help="Write the chart's data to this .csv, .tsv, or .json file, and reference it by URL, rather than embedding it in the spec. If it's a directory, i.e. it exists or ends with '/', the file is named by its contents' hash, so that charts of the same data share it",
+    ),
+    "no_cache": GenOption.foo(
+        "--no-cache",
+        category="Output and presentation",
+        is_flag=True,
+        help="Don't reuse (or store) the cached --json output of a previous run with the same input file and options",
+    ),
     "no_preview": GenOption.foo(
         "--no-preview",
         "--NP",
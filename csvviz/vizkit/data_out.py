@@ -0,0 +1,85 @@
+"""
+data_out.py
+
+--data-out PATH: rather than embedding the chart's dataset in the spec, it's written to a file,
+and the spec references it by URL, i.e. consumers can cache the spec apart from the data:
+
+    $ csvviz bar sales.csv -x region -y 'sum(revenue)' --json --data-out sales.csv.data.json
+    "data": {"url": "sales.csv.data.json", "format": {"type": "json"}}
+
+If PATH is a directory, i.e. it exists or ends with a slash, the file is named by
+the hash of its contents, e.g. data/data-3f2a9c....csv, which means that charts of the same
+data share a single file, and it's only written once. Its format is CSV, typed with
+format.parse (see inline.py), or JSON records if the data can't round-trip through CSV.
+Otherwise, PATH's suffix, i.e. .csv, .tsv, or .json, is the format.
+
+The URL is PATH as given, i.e. a relative PATH is relative to wherever the spec is loaded from
+"""
+
+import hashlib
+import os
+from pathlib import Path
+from typing import (
+    Optional as OptionalType,
+    Tuple as TupleType,
+)
+
+import altair as alt
+import pandas as pd
+
+from csvviz.exceptions import VizValueError
+from csvviz.utils.diskcache import write_atomic
+from csvviz.vizkit.inline import delimited
+from csvviz.vizkit.sanitize import sanitize
+from csvviz.vizkit.serialize import dumps
+
+SUFFIX_FORMATS = {
+    ".csv": "csv",
+    ".tsv": "tsv",
+    ".json": "json",
+}
+
+
+def is_dir_target(path: str) -> bool:
+    """i.e. --data-out is a directory to write content-addressed files into"""
+    return path.endswith(("/", os.sep)) or os.path.isdir(path)
+
+
+def encode(
+    df: pd.DataFrame, fmt: str
+) -> OptionalType[TupleType[bytes, alt.DataFormat]]:
+    """(df as fmt, i.e. 'csv', 'tsv', or 'json', and its format), or None if it can't be fmt"""
+    if fmt == "json":
+        records = sanitize(df).to_dict(orient="records")
+        return dumps(records, indent=None).encode(), alt.DataFormat(type="json")
+    encoded = delimited(df, fmt)
+    if encoded is None:
+        return None
+    text, dformat = encoded
+    return text.encode(), dformat
+
+
+def write_data(df: pd.DataFrame, data_out: str) -> alt.UrlData:
+    """writes df to data_out, and returns the data that references it"""
+    if is_dir_target(data_out):
+        payload, dformat = encode(df, "csv") or encode(df, "json")
+        name = f"data-{hashlib.md5(payload).hexdigest()}.{dformat.type}"
+        path = Path(data_out, name)
+        if path.exists():  # i.e. the same data, already written by another chart
+            return alt.UrlData(url=path.as_posix(), format=dformat)
+    else:
+        fmt = SUFFIX_FORMATS.get(Path(data_out).suffix.lower())
+        if fmt is None:
+            raise VizValueError(
+                f"--data-out must end with .csv, .tsv, or .json, or be a directory, not '{data_out}'"
+            )
+        encoded = encode(df, fmt)
+        if encoded is None:
+            raise VizValueError(
+                f"--data-out can't write this data as {fmt}, because it has columns of mixed types; try .json"
+            )
+        payload, dformat = encoded
+        path = Path(data_out)
+
+    write_atomic(path, payload)
+    return alt.UrlData(url=path.as_posix(), format=dformat)
@@ -0,0 +1,305 @@
+"""
+datasource.py
+
+A wrapper around Vizkit's input_file, i.e. whatever gets handed to pd.read_csv
+"""
+
+import io
+import os
+import pandas as pd
+from pathlib import Path
+from typing import (
+    IO as IOType,
+    Iterator as IteratorType,
+    List as ListType,
+    Optional as OptionalType,
+    Union as UnionType,
+)
+
+from csvviz.exceptions import ConflictingArgs, VizValueError
+from csvviz.settings import DEFAULT_ARROW_ENGINE_BYTES
+from csvviz.utils import arrow, columnar, compression, frame_cache
+from csvviz.utils.columnar import RangeFilter
+
+
+class DataSource:
+    """
+    Reads the input in two steps, so that Vizkit can figure out which columns
+    a chart needs before paying for a full parse:
+
+        src = DataSource("data.csv")
+        src.header()                    # empty dataframe, i.e. column names only
+        src.read(usecols=["name", "amount"])
+
+    input_file can be a path, or a file-like object. A local Parquet, Feather, or Arrow IPC
+        file, i.e. by its extension or magic bytes, is read with csvviz.utils.columnar,
+        rather than as CSV. Non-seekable streams (e.g. piped stdin)
+        can't be rewound after the header is sniffed, so they get parsed once, in full,
+        and then projected. It can also be an already-parsed dataframe, e.g. one that's
+        shared by several charts in `csvviz batch`
+
+    A local file, e.g. an open file that hasn't been read from yet, is handed to pd.read_csv
+        by its path, i.e. memory-mapped, so that the parser works on the OS's page cache
+        (which concurrent csvviz runs share) rather than on buffered copies.
+        Compressed input, i.e. gzip, bz2, xz, or zstd, by its suffix or magic bytes, is
+        decompressed as it's parsed instead, including in chunked mode
+
+    chunksize: if set, the input is meant to be iterated over with chunks(), and
+        read() returns only the first chunk, i.e. a sample for inferring types
+
+    frame_cache: if True, and the input is a local file, it's parsed in full once, and
+        stored with csvviz.utils.frame_cache; later reads get just their columns from there.
+        Ignored in chunked mode
+
+    engine: 'c', i.e. pd.read_csv's default, or 'pyarrow', i.e. Arrow's multi-threaded reader;
+        'auto' means pyarrow for local files of at least DEFAULT_ARROW_ENGINE_BYTES.
+        pyarrow is only used for whole, local, uncompressed files, i.e. not in chunked mode;
+        or, with engine='pyarrow', for piped binary input, e.g. stdin, which it decodes itself
+    """
+
+    def __init__(
+        self,
+        input_file: UnionType[str, Path, IOType, pd.DataFrame],
+        chunksize: OptionalType[int] = None,
+        frame_cache: bool = False,
+        engine: str = "c",
+    ):
+        self.input_file = input_file
+        self.chunksize = chunksize
+        path = self.local_path()
+        # e.g. 'gzip', if the input is to be decompressed as it's parsed
+        self.compression: OptionalType[str] = None
+        if path:
+            self.compression = compression.detect(path)
+            if self.compression:
+                compression.require(self.compression)
+            if self.compression or self.is_path or input_file.tell() == 0:
+                # i.e. pd.read_csv opens it itself, and can reopen it to rewind
+                self.input_file = path
+        elif not self.is_frame and not self.is_path:
+            # e.g. piped stdin; a text stream is peeked at by its underlying bytes
+            stream = getattr(input_file, "buffer", input_file)
+            self.compression = compression.detect_stream(stream)
+            if self.compression:
+                self.input_file = compression.decompress_stream(
+                    stream, self.compression
+                )
+        # e.g. 'csv', 'parquet'
+        self.format = (
+            columnar.detect_format(path) if path and not self.compression else "csv"
+        )
+        is_csv = self.format == "csv"
+        # the input's path, if it's to be read from/stored in the frame cache
+        self.cache_path: OptionalType[str] = (
+            path if frame_cache and is_csv and not chunksize else None
+        )
+        # the input's path, if it's to be parsed with pyarrow
+        self.arrow_path: OptionalType[str] = (
+            path
+            if engine != "c" and is_csv and not (chunksize or self.compression)
+            else None
+        )
+        # i.e. piped binary input, e.g. stdin, that's to be parsed with pyarrow
+        self.arrow_stream = (
+            engine == "pyarrow"
+            and not (path or self.is_path or self.is_frame or chunksize)
+            and not isinstance(self.input_file, io.TextIOBase)
+            and arrow.is_peekable(self.input_file)
+        )
+        if engine == "auto" and self.arrow_path:
+            big = os.path.getsize(self.arrow_path) >= DEFAULT_ARROW_ENGINE_BYTES
+            if not (big and arrow.is_available()):
+                self.arrow_path = None
+        # i.e. how many rows read(filters=...) skipped over
+        self.skipped_rows = 0
+        self._cached = False
+        self._start = None
+        if not self.is_path and not self.is_frame and self.is_rewindable:
+            self._start = self.input_file.tell()
+        self._fullframe: OptionalType[pd.DataFrame] = (
+            input_file if self.is_frame else None
+        )
+        # for non-rewindable input in chunked mode, the reader that header() started
+        self._reader = None
+        self._firstchunk: OptionalType[pd.DataFrame] = None
+
+    @property
+    def is_path(self) -> bool:
+        return isinstance(self.input_file, (str, Path))
+
+    @property
+    def is_frame(self) -> bool:
+        return isinstance(self.input_file, pd.DataFrame)
+
+    @property
+    def is_rewindable(self) -> bool:
+        if self.is_path or self.is_frame:
+            return True
+        if self.compression:  # i.e. a decompressing stream, which can't seek backward
+            return False
+        seekable = getattr(self.input_file, "seekable", None)
+        try:
+            return bool(seekable and seekable())
+        except ValueError:  # e.g. closed file
+            return False
+
+    @property
+    def can_push_down(self) -> bool:
+        """i.e. read(filters=...) can skip over Parquet row groups, rather than parse them"""
+        return self.format == "parquet" and not self.chunksize
+
+    def local_path(self) -> OptionalType[str]:
+        """the path of the input, if it's a regular file, e.g. not stdin"""
+        if self.is_frame:
+            return None
+        name = (
+            self.input_file if self.is_path else getattr(self.input_file, "name", None)
+        )
+        if isinstance(name, (str, Path)) and os.path.isfile(name):
+            return str(name)
+        return None
+
+    def rewind(self) -> None:
+        if self._start is not None:
+            self.input_file.seek(self._start)
+
+    def header(self) -> pd.DataFrame:
+        """returns an empty dataframe with the input's column names"""
+        if self._fullframe is not None:
+            return self._fullframe.iloc[0:0]
+        if self.format != "csv":
+            names = columnar.column_names(self.local_path(), self.format)
+            return pd.DataFrame(columns=names)
+        if self.cache_path:
+            hf = frame_cache.header(self.cache_path)
+            if hf is not None:
+                self._cached = True
+                return hf
+        if not self.is_rewindable:
+            if self.chunksize:
+                self._reader = self.read_csv(chunksize=self.chunksize)
+                self._firstchunk = next(self._reader)
+                return self._firstchunk.iloc[0:0]
+            self._fullframe = self.parse()
+            return self._fullframe.iloc[0:0]
+
+        self.rewind()
+        hf = self.read_csv(nrows=0)
+        self.rewind()
+        return hf
+
+    def read(
+        self,
+        usecols: OptionalType[ListType[str]] = None,
+        filters: OptionalType[ListType[RangeFilter]] = None,
+    ) -> pd.DataFrame:
+        """
+        usecols: the subset of column names to parse; all columns are parsed if None.
+            As with pd.read_csv(usecols=...), columns are returned in the input's order
+
+        filters: (field, min, max) ranges, for input that can_push_down: the row groups
+            that are wholly outside of one are skipped, and counted in self.skipped_rows.
+            Rows aren't filtered individually, and other input is read in full
+        """
+        if not (filters and self.can_push_down):
+            return self._read(usecols)
+        path = self.local_path()
+        df = columnar.read(path, self.format, columns=usecols, filters=filters)
+        self.skipped_rows = columnar.num_rows(path, self.format) - len(df)
+        return df
+
+    def _read(self, usecols: OptionalType[ListType[str]] = None) -> pd.DataFrame:
+        if self._fullframe is not None:
+            df = self._fullframe
+            if self.chunksize:  # i.e. a shared dataframe, in chunked mode
+                df = df.iloc[: self.chunksize]
+            return self.project(df, usecols)
+        if self._firstchunk is not None:
+            return self.project(self._firstchunk, usecols)
+        if self.format != "csv":
+            if self.chunksize:
+                return next(self.chunks(usecols))
+            return columnar.read(self.local_path(), self.format, columns=usecols)
+        if self._cached:
+            df = frame_cache.read(self.cache_path, usecols)
+            if df is not None:
+                return df
+        if self.cache_path:
+            # i.e. a miss: every column is parsed, so that any later chart can use the cache
+            df = self.parse()
+            frame_cache.store(self.cache_path, df)
+            return self.project(df, usecols)
+        if self.chunksize:
+            self.rewind()
+            return self.read_csv(usecols=usecols, nrows=self.chunksize)
+        return self.parse(usecols)
+
+    def parse(self, usecols: OptionalType[ListType[str]] = None) -> pd.DataFrame:
+        """the whole input, with the chosen engine"""
+        if self.arrow_path or self.arrow_stream:
+            try:
+                return arrow.read_csv(
+                    self.arrow_path or self.input_file, usecols=usecols
+                )
+            except VizValueError:  # i.e. a stream that Arrow has already read from
+                raise
+            except ValueError:  # i.e. input that pandas is more forgiving of
+                pass
+        self.rewind()
+        return self.read_csv(usecols=usecols)
+
+    def read_csv(self, **kwargs) -> UnionType[pd.DataFrame, IteratorType[pd.DataFrame]]:
+        """
+        pd.read_csv on the input, i.e. a path is memory-mapped, or decompressed with
+            the compression that was detected by magic bytes. Input that isn't valid
+            compression after all raises VizValueError
+        """
+        if self.is_path and self.compression:
+            kwargs["compression"] = self.compression
+        elif self.is_path and os.path.getsize(self.input_file):
+            # i.e. mmap() refuses empty files, which pandas has its own error for
+            kwargs["memory_map"] = True
+        if not self.compression:
+            return pd.read_csv(self.input_file, **kwargs)
+        name = f"'{self.input_file}'" if self.is_path else "input"
+        with compression.errors(self.compression, name):
+            result = pd.read_csv(self.input_file, **kwargs)
+        if kwargs.get("chunksize"):
+            return compression.checked(result, self.compression, name)
+        return result
+
+    def chunks(
+        self, usecols: OptionalType[ListType[str]] = None
+    ) -> IteratorType[pd.DataFrame]:
+        """
+        Iterates over the input, self.chunksize rows at a time.
+
+        Each call starts over from the beginning of the input, which means that
+        non-rewindable input can only be iterated over once
+        """
+        if self.format != "csv":
+            yield from columnar.iter_batches(
+                self.local_path(), self.format, self.chunksize, columns=usecols
+            )
+        elif self.is_frame:
+            df = self.input_file
+            for i in range(0, len(df), self.chunksize):
+                yield self.project(df.iloc[i : i + self.chunksize], usecols)
+        elif self._reader is not None:
+            reader, self._reader = self._reader, None
+            yield self.project(self._firstchunk, usecols)
+            for chunk in reader:
+                yield self.project(chunk, usecols)
+        elif self.is_rewindable:
+            self.rewind()
+            yield from self.read_csv(usecols=usecols, chunksize=self.chunksize)
+        else:
+            raise ConflictingArgs(
+                "Piped input can only be read once, which isn't enough for this chart in chunked mode; pass in a file path instead"
+            )
+
+    @staticmethod
+    def project(
+        df: pd.DataFrame, usecols: OptionalType[ListType[str]] = None
+    ) -> pd.DataFrame:
+        return df if usecols is None else df[[c for c in df.columns if c in usecols]]
@@ -0,0 +1,225 @@
+"""
+facets.py
+
+--split-facets DIR, i.e. rather than one faceted chart that embeds every panel's data,
+one chart per facet value, each with just its own rows:
+
+    $ csvviz bar sales.csv -x month -y revenue --gridvar store --split-facets charts/
+
+    charts/store-101.json
+    charts/store-102.json
+    ...
+
+To keep the panels comparable, i.e. like a faceted chart's shared scales, each split chart's
+x, y, color, and size scales get the same domain, as computed from all of the data
+"""
+
+import copy
+import re
+from pathlib import Path
+from typing import (
+    Any as AnyType,
+    Iterator as IteratorType,
+    List as ListType,
+    Union as UnionType,
+    Optional as OptionalType,
+    Tuple as TupleType,
+)
+
+import altair as alt
+import pandas as pd
+
+from csvviz import altUndefined
+from csvviz.exceptions import ConflictingArgs
+from csvviz.utils.diskcache import atomic_path
+from csvviz.utils.parallel import fork_map
+from csvviz.vizkit.channel_group import ChannelGroup
+from csvviz.vizkit.chart import Chart
+from csvviz.vizkit.pushdown import is_set
+
+# the marks that Vega-Lite stacks by color
+STACKED_MARKS = (
+    "area",
+    "bar",
+)
+
+
+def facet_filename(value: AnyType, taken: set) -> str:
+    """e.g. 'North America' => 'North-America.json'; made unique against taken"""
+    stem = re.sub(r"[^\w.-]+", "-", str(value)).strip("-.") or "facet"
+    name, i = stem, 1
+    while name.lower() in taken:
+        i += 1
+        name = f"{stem}-{i}"
+    taken.add(name.lower())
+    return f"{name}.json"
+
+
+def as_native(value: AnyType) -> AnyType:
+    """e.g. numpy.int64(3) => 3, for serializing"""
+    return value.item() if hasattr(value, "item") else value
+
+
+def is_plain(channel) -> bool:
+    """i.e. a field that Vega doesn't aggregate, bin, or time-unit"""
+    return isinstance(channel, alt.utils.schemapi.SchemaBase) and not any(
+        is_set(channel._get(a)) for a in ("aggregate", "bin", "timeUnit")
+    )
+
+
+class FacetSplitter:
+    """
+    Partitions a Vizkit's chart data by its facet field, in a single groupby pass,
+    and builds one Chart per partition
+    """
+
+    def __init__(self, vizkit):
+        self.vizkit = vizkit
+        self.data: pd.DataFrame = vizkit.chart_data
+        self.channels: ChannelGroup = vizkit.channels
+
+        facet = self.channels.get("facet")
+        if not isinstance(facet, alt.Facet):
+            raise ConflictingArgs("--split-facets requires -g/--gridvar")
+        if not is_plain(facet):
+            raise ConflictingArgs(
+                "--split-facets requires a plain --gridvar field, e.g. 'region', not 'year(date)'"
+            )
+        self.facet_field = facet.field
+        self.facet_sort = facet._get("sort", None)
+
+    def shared_channels(self) -> ChannelGroup:
+        """a copy of the channels, minus facet, with every scale domain that can be shared"""
+        channels = copy.copy(self.channels)
+        channels.pop("facet")
+        cname = self.vizkit.color_channel_name
+        for name in ("x", "y", cname, "size"):
+            ch = channels.get(name)
+            if ch is None:
+                continue
+            domain = self.domain(name, ch, channels)
+            if domain is not None:
+                ch = ch.copy()
+                scale = ch.scale.copy() if is_set(ch._get("scale")) else alt.Scale()
+                scale.domain = domain
+                ch.scale = scale
+                channels[name] = ch
+        return channels
+
+    def domain(
+        self, name: str, channel, channels: ChannelGroup
+    ) -> OptionalType[ListType]:
+        """
+        The domain of channel across all the data, or None if it can't be computed here,
+            e.g. temporal fields, sorted fields, normalized stacks
+        """
+        if not is_plain(channel) or channel.field not in self.data.columns:
+            return None
+        scale = channel._get("scale")
+        if is_set(scale) and is_set(scale._get("domain")):
+            return None  # e.g. --xlim, which is already shared
+
+        values = self.data[channel.field]
+        if channel.type in ("nominal", "ordinal"):
+            if is_set(channel._get("sort")):
+                return None
+            uniques = values.dropna().unique().tolist()
+            try:
+                return sorted(uniques)
+            except TypeError:  # i.e. mixed types
+                return uniques
+
+        if channel.type != "quantitative":
+            return None
+
+        lo, hi = values.min(), values.max()
+        if name in ("x", "y"):
+            stack = self.stacking(name, channel, channels)
+            if stack not in (None, "zero"):
+                return None  # i.e. normalize and center
+            if stack == "zero":
+                # the extent of the stacked totals, i.e. per facet and x (or y) value
+                partner = channels.get("y" if name == "x" else "x")
+                keys = [self.data[self.facet_field]]
+                if is_set(partner._get("field")):
+                    keys.append(self.data[partner.field])
+                lo = values.clip(upper=0).groupby(keys, dropna=False).sum().min()
+                hi = values.clip(lower=0).groupby(keys, dropna=False).sum().max()
+
+        if name in ("x", "y", "size"):
+            # i.e. vega-lite's default scale.zero, which an explicit domain turns off
+            if not (is_set(scale) and scale._get("zero") is False):
+                lo, hi = min(lo, 0), max(hi, 0)
+
+        if pd.isna(lo) or pd.isna(hi):
+            return None
+        return [as_native(lo), as_native(hi)]
+
+    def stacking(self, name: str, channel, channels: ChannelGroup) -> OptionalType[str]:
+        """
+        How Vega-Lite stacks the x or y channel, e.g. 'zero', 'normalize', or None for not at all:
+            only area and bar marks are stacked by default, and only by color, and only
+            when the other positional channel is discrete, binned, or temporal
+        """
+        partner = channels.get("y" if name == "x" else "x")
+        if (
+            self.vizkit.mark_name not in STACKED_MARKS
+            or channels.get(self.vizkit.color_channel_name) is None
+            or partner is None
+            or (is_plain(partner) and partner.type == "quantitative")
+        ):
+            return None
+        stack = channel._get("stack")
+        if stack is altUndefined or stack is True:
+            return "zero"
+        return stack or None
+
+    def partitions(self) -> IteratorType[TupleType[AnyType, pd.DataFrame]]:
+        """(facet value, rows), in the same order as the faceted chart's panels"""
+        groups = self.data.groupby(self.facet_field, sort=True, dropna=False)
+        parts = list(groups)
+        if self.facet_sort == "descending":
+            parts.reverse()
+        return iter(parts)
+
+    def charts(self) -> IteratorType[TupleType[str, Chart]]:
+        """(filename, Chart) for each facet value"""
+        vk = self.vizkit
+        channels = self.shared_channels()
+        title = vk.options.get("chart_title")
+        taken = set()
+        for value, part in self.partitions():
+            opts = {
+                **vk.options,
+                "chart_title": f"{title}: {value}" if title else str(value),
+            }
+            chart = Chart(
+                viz_name=vk.chart.viz_name,
+                data=part,
+                channels=channels,
+                defaults=vk.chart_defaults(),
+                options=opts,
+            )
+            yield facet_filename(value, taken), vk.finalize_chart(chart)
+
+    def write(
+        self, dirpath: UnionType[str, Path], processes: OptionalType[int] = None
+    ) -> IteratorType[Path]:
+        """
+        Writes each facet's chart into dirpath, serializing them in a pool of processes,
+        and yields their paths, in facet order
+        """
+        dirpath = Path(dirpath)
+        dirpath.mkdir(parents=True, exist_ok=True)
+        fast = bool(self.vizkit.options.get("no_validate"))
+
+        def _write(item: TupleType[str, Chart]) -> Path:
+            filename, chart = item
+            path = dirpath / filename
+            # i.e. a facet that fails to serialize doesn't leave a half-written file behind
+            with atomic_path(path) as tmp:
+                with open(tmp, "w") as f:
+                    f.writelines(chart.iter_json(fast=fast))
+            return path
+
+        yield from fork_map(_write, self.charts(), processes=processes)
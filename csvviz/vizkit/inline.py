@@ -0,0 +1,110 @@
+"""
+inline.py
+
+--inline-format csv|tsv: instead of an array of row objects, which repeats every column
+name in every row, the chart's dataset is embedded as one delimited string, e.g.
+
+    "datasets": {"data-3f2a...": "name,amount\\napples,40\\nbananas,12\\n"}
+    "data": {"name": "data-3f2a...", "format": {"type": "csv", "parse": {"amount": "number"}}}
+
+The values are typed with format.parse, from the dataframe's dtypes, rather than left to
+Vega's inference, i.e. a string column of numbers like zip codes stays a string.
+
+Note that CSV has no null for strings, i.e. a missing string becomes "", whereas
+a missing number, boolean, or date becomes null, as with records
+"""
+
+from typing import (
+    Dict as DictType,
+    Optional as OptionalType,
+    Tuple as TupleType,
+    Union as UnionType,
+)
+
+import altair as alt
+import numpy as np
+import pandas as pd
+
+INLINE_FORMATS = ("records", "csv", "tsv")
+
+DELIMITERS = {"csv": ",", "tsv": "\t"}
+
+# pd.api.types.infer_dtype() => the format.parse type, or None for strings
+PARSE_TYPES = {
+    "string": None,
+    "empty": None,
+    "integer": "number",
+    "floating": "number",
+    "mixed-integer-float": "number",
+    "decimal": "number",
+    "boolean": "boolean",
+    "datetime64": "date",
+    "datetime": "date",
+    "date": "date",
+}
+
+
+def parse_types(df: pd.DataFrame) -> OptionalType[DictType[str, OptionalType[str]]]:
+    """
+    {column: 'number'|'boolean'|'date'|None}, or None if any column's values can't
+        round-trip through delimited text, e.g. a mix of strings and numbers
+    """
+    types = {}
+    for col in df.columns:
+        if not isinstance(col, str):
+            return None
+        values = df[col]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            values = values.astype(object)
+        kind = pd.api.types.infer_dtype(values, skipna=True)
+        if kind not in PARSE_TYPES:
+            return None
+        types[col] = PARSE_TYPES[kind]
+    return types
+
+
+def to_text(values: pd.Series, ptype: OptionalType[str]) -> pd.Series:
+    """values as the strings that Vega's parser turns back into the same values"""
+    if ptype == "boolean":
+        # i.e. Vega reads 'False' as true; only 'false' and '0' are false
+        return values.map({True: "true", False: "false"}).fillna("")
+    if ptype == "date":
+        # i.e. the same ISO format as Altair's records, which JS reads as local time
+        text = [d.isoformat() if pd.notna(d) else "" for d in pd.to_datetime(values)]
+        return pd.Series(text, index=values.index, dtype=object)
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        values = values.astype(object)
+    if ptype == "number":
+        # i.e. null, as with records, rather than NaN
+        return values.replace([np.inf, -np.inf], np.nan)
+    return values
+
+
+def delimited(
+    df: pd.DataFrame, fmt: str
+) -> OptionalType[TupleType[str, alt.DataFormat]]:
+    """
+    (df as fmt, i.e. 'csv' or 'tsv' text, and the format that Vega-Lite reads it with),
+        or None if it can't be delimited text
+    """
+    types = parse_types(df)
+    if types is None:
+        return None
+    text = pd.DataFrame({col: to_text(df[col], t) for col, t in types.items()})
+    values = text.to_csv(index=False, sep=DELIMITERS[fmt], lineterminator="\n")
+    parse = {col: t for col, t in types.items() if t}
+    return values, alt.DataFormat(type=fmt, parse=parse or alt.Undefined)
+
+
+def inline_data(
+    df: pd.DataFrame, fmt: str = "records"
+) -> UnionType[pd.DataFrame, alt.InlineData]:
+    """
+    df as fmt, i.e. the dataframe itself for records, which is what Altair embeds by default;
+        also the dataframe, for Altair to embed as records, if it can't be delimited text
+    """
+    encoded = delimited(df, fmt) if fmt in DELIMITERS else None
+    if encoded is None:
+        return df
+    values, dformat = encoded
+    return alt.InlineData(values=values, format=dformat)
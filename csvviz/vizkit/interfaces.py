@@ -1,8 +1,8 @@
 """a holding place for functionality that I haven't figured out how to separate"""
 
 import altair as alt
+import json
 from altair.utils import parse_shorthand as alt_parse_shorthand
-import altair_viewer as altview
 import click
 import pandas as pd
 from typing import (
@@ -16,6 +16,8 @@ from typing import (
 
 from csvviz.exceptions import VizValueError
 from csvviz.helpers import parse_delimited_str
+from csvviz.settings import DEFAULT_SPEC_CACHE_BYTES
+from csvviz.utils import spec_cache
 from csvviz.utils.sysio import (
     clout,
     clerr,
@@ -36,18 +38,59 @@ class ClickFace:
     def cmd_wrapper(klass):
         # TODO: this is bad OOP; func should be properly named and in some more logical place
         def func(**options):
+            key = klass.spec_cache_key(options)
+            hit = spec_cache.get(key) if key else None
+            if hit:
+                clout(hit.spec)
+                [clerr(f"Warning: {w}") for w in hit.warnings]
+                if not options.get("no_preview"):
+                    klass.open_chart_in_browser(json.loads(hit.spec))
+                return
+
             try:
                 vk = klass(input_file=options.get("input_file"), options=options)
             except VizValueError as err:
                 # TODO: dude what?
                 clexit(1, err)
             else:
-                vk.output_chart()
+                spec = vk.output_chart(
+                    keep_bytes=DEFAULT_SPEC_CACHE_BYTES if key else 0
+                )
                 [clerr(f"Warning: {w}") for w in vk.warnings]
+                if key and spec is not None:
+                    # i.e. cli.main() can only serve a spec straight from the cache
+                    # if there's no chart to preview
+                    argv = None
+                    ctx = click.get_current_context(silent=True)
+                    if ctx and ctx.obj and options.get("no_preview"):
+                        argv = ctx.obj.get("argv")
+                    spec_cache.put(
+                        key,
+                        spec,
+                        vk.warnings,
+                        argv=argv,
+                        input_path=options["input_file"].name,
+                    )
                 vk.preview_chart()
 
         return func
 
+    @classmethod
+    def spec_cache_key(klass, options: DictType) -> OptionalType[str]:
+        """None if this command's output can't be cached, e.g. it isn't --json, or it's from stdin"""
+        if (
+            options.get("no_cache")
+            or not options.get("to_json")
+            or options.get("split_facets")
+            # i.e. a cached spec would skip writing the data file
+            or options.get("data_out")
+        ):
+            return None
+        name = getattr(options.get("input_file"), "name", None)
+        if not isinstance(name, str) or name == "-":
+            return None
+        return spec_cache.cache_key(klass.viz_commandname, options, name)
+
     @classmethod
     def register_command(klass):
         command = klass.cmd_wrapper()
@@ -67,16 +110,40 @@ class ClickFace:
 class OutputFace:
     """a namespace/mixin for functions that output the viz"""
 
-    def output_chart(self) -> NoReturnType:
-        """Send to stdout the desired representation of a chart"""
-        if self.options["to_json"]:
-            clout(self.chart_json())
+    def output_chart(self, keep_bytes: OptionalType[int] = None) -> OptionalType[str]:
+        """
+        Send to stdout the desired representation of a chart; returns the JSON spec, if that's what was sent,
+            unless it's longer than keep_bytes. The spec is written as it's serialized, a chunk at a time
+        """
+        if self.options.get("split_facets"):
+            for path in self.write_split_facets(self.options["split_facets"]):
+                clout(str(path))
+        elif self.options["to_json"]:
+            kept, size = [], 0
+            for chunk in self.iter_chart_json():
+                clout(chunk, nl=False)
+                size += len(chunk)
+                if kept is not None and (keep_bytes is None or size <= keep_bytes):
+                    kept.append(chunk)
+                else:
+                    kept = None  # i.e. there's no use in keeping part of it
+            clout("")
+            return "".join(kept) if kept is not None else None
 
     def preview_chart(self) -> NoReturnType:
-        if not self.options.get("no_preview"):
-            self.open_chart_in_browser(self.raw_chart)
+        # the split-up charts are files; there's no one chart to preview
+        if not self.options.get("no_preview") and not self.options.get("split_facets"):
+            chart = self.raw_chart
+            if self.options.get("data_out"):
+                # i.e. the preview's page can't fetch a local file by its URL
+                chart = chart.copy(deep=False)
+                chart.data = self.chart.embedded_data
+            self.open_chart_in_browser(chart)
 
     @staticmethod
-    def open_chart_in_browser(chart: alt.Chart) -> NoReturnType:
-        # a helpful wrapper around altair_viewer.altview
+    def open_chart_in_browser(chart: UnionType[alt.Chart, DictType]) -> NoReturnType:
+        # a helpful wrapper around altair_viewer.altview; imported here because
+        # it's slow to import, and not needed for e.g. --json --no-preview
+        import altair_viewer as altview
+
         altview.show(chart)
@@ -0,0 +1,213 @@
+"""
+pushdown.py
+
+Does the grouping and aggregating that Altair shorthand, e.g. -y 'sum(revenue)',
+would otherwise leave to Vega in the browser, so that only the aggregated
+table gets embedded in the chart
+"""
+
+import altair as alt
+import pandas as pd
+import re
+from typing import (
+    Dict as DictType,
+    Iterable as IterableType,
+    List as ListType,
+    NamedTuple,
+    Optional as OptionalType,
+    Tuple as TupleType,
+)
+
+from csvviz import altUndefined
+from csvviz.vizkit.channel_group import ChannelGroup
+
+# vega-lite aggregate op => (pandas GroupBy method, kwargs)
+# https://vega.github.io/vega-lite/docs/aggregate.html#ops
+AGGREGATE_OPS: DictType[str, TupleType[str, dict]] = {
+    "count": ("size", {}),
+    "valid": ("count", {}),
+    "distinct": ("nunique", {"dropna": False}),
+    "sum": ("sum", {}),
+    "mean": ("mean", {}),
+    "average": ("mean", {}),
+    "median": ("median", {}),
+    "min": ("min", {}),
+    "max": ("max", {}),
+    "variance": ("var", {}),
+    "variancep": ("var", {"ddof": 0}),
+    "stdev": ("std", {}),
+    "stdevp": ("std", {"ddof": 0}),
+    "stderr": ("sem", {}),
+}
+
+
+# the ops that can be computed incrementally, i.e. chunk by chunk:
+#   vega-lite aggregate op => [(partial GroupBy method, how partials are combined), ...]
+FOLDABLE_OPS: DictType[str, ListType[TupleType[str, str]]] = {
+    "count": [("size", "sum")],
+    "valid": [("count", "sum")],
+    "sum": [("sum", "sum")],
+    "mean": [("sum", "sum"), ("count", "sum")],
+    "average": [("sum", "sum"), ("count", "sum")],
+    "min": [("min", "min")],
+    "max": [("max", "max")],
+}
+
+
+class Measure(NamedTuple):
+    channel_name: str
+    op: str
+    field: OptionalType[str]  # count() has no field
+    column: str  # the name of the aggregated column in the pushed-down data
+
+
+def aggregate_title(op: str, field: OptionalType[str]) -> str:
+    """
+    What Vega-Lite would have titled the aggregated field, i.e. its "verbal" titleFormatter:
+        https://vega.github.io/vega-lite/docs/config.html#format-config
+    """
+    if op == "count":
+        return "Count of Records"
+    return f"{op[0].upper()}{op[1:]} of {field}"
+
+
+def is_set(value) -> bool:
+    return value is not altUndefined and value is not None and value is not False
+
+
+class AggregatePushdown:
+    """
+    Plans the group-by from a ChannelGroup: every aggregated channel becomes a measure,
+    and every other channel's field becomes a group-by key, e.g.
+
+        -x product -y 'sum(revenue)' -c season
+            => data.groupby(['product', 'season'])['revenue'].sum()
+
+    Pushdown only applies when Vega's result can be exactly reproduced, i.e. all the
+    channels are plain Altair channel objects (not the dicts/strings that some kits set),
+    all aggregate ops are in AGGREGATE_OPS, and none of the group-by channels are binned
+    or time-unit'ed
+    """
+
+    def __init__(self, channels: ChannelGroup):
+        self.keys: ListType[str] = []
+        self.measures: ListType[Measure] = []
+        self._applicable = self.plan(channels)
+
+    @property
+    def is_applicable(self) -> bool:
+        return self._applicable
+
+    def plan(self, channels: ChannelGroup) -> bool:
+        for cname, channel in channels.items():
+            if not isinstance(channel, alt.utils.schemapi.SchemaBase):
+                return False
+
+            op = channel._get("aggregate")
+            field = channel._get("field")
+            if is_set(op):
+                if op not in AGGREGATE_OPS:
+                    return False
+                field = field if is_set(field) else None
+                self.measures.append(Measure(cname, op, field, column=""))
+            else:
+                if (
+                    not is_set(field)
+                    or is_set(channel._get("bin"))
+                    or is_set(channel._get("timeUnit"))
+                ):
+                    return False
+                if field not in self.keys:
+                    self.keys.append(field)
+
+        if not self.measures:
+            return False
+
+        taken = set(self.keys)
+        for i, m in enumerate(self.measures):
+            col = f"{m.op}_{m.field}" if m.field else m.op
+            # vega-lite treats dots and brackets in field names as nested access
+            col = re.sub(r"[.\[\]\\]", "_", col)
+            while col in taken:
+                col += "_"
+            taken.add(col)
+            self.measures[i] = m._replace(column=col)
+
+        return True
+
+    def aggregate(self, data: pd.DataFrame) -> pd.DataFrame:
+        """returns a table with one row per group, i.e. self.keys + measure columns"""
+        grouped = self.grouped(data)
+        cols = {}
+        for m in self.measures:
+            method, kwargs = AGGREGATE_OPS[m.op]
+            g = grouped if m.field is None else grouped[m.field]
+            cols[m.column] = getattr(g, method)(**kwargs)
+
+        df = pd.DataFrame(cols)
+        return df.reset_index() if self.keys else df.reset_index(drop=True)
+
+    @property
+    def is_foldable(self) -> bool:
+        return self.is_applicable and all(m.op in FOLDABLE_OPS for m in self.measures)
+
+    def grouped(self, data: pd.DataFrame, sort: bool = True):
+        if self.keys:
+            return data.groupby(self.keys, sort=sort, dropna=False)
+        # everything aggregates into a single row, e.g. -y 'sum(amount)' with no other fields
+        return data.groupby(pd.Series(0, index=data.index))
+
+    def fold(self, chunks: IterableType[pd.DataFrame]) -> pd.DataFrame:
+        """
+        Like aggregate(), but folds each chunk into running partial aggregates, e.g.
+            a mean is kept as a running sum and count
+
+        Memory is bounded by the number of groups, not the number of rows
+        """
+        combiners = {}
+        for m in self.measures:
+            for method, how in FOLDABLE_OPS[m.op]:
+                combiners[f"{m.column}:{method}"] = how
+
+        acc = None
+        for chunk in chunks:
+            grouped = self.grouped(chunk, sort=False)
+            partial = {}
+            for m in self.measures:
+                g = grouped if m.field is None else grouped[m.field]
+                for method, _how in FOLDABLE_OPS[m.op]:
+                    partial[f"{m.column}:{method}"] = getattr(g, method)()
+            partial = pd.DataFrame(partial)
+
+            if acc is not None:
+                partial = pd.concat([acc, partial])
+                levels = list(range(partial.index.nlevels))
+                partial = partial.groupby(level=levels, dropna=False).agg(combiners)
+            acc = partial
+
+        if acc is None:  # i.e. there were no chunks at all
+            return pd.DataFrame(columns=self.keys + [m.column for m in self.measures])
+
+        cols = {}
+        for m in self.measures:
+            if m.op in ("mean", "average"):
+                cols[m.column] = acc[f"{m.column}:sum"] / acc[f"{m.column}:count"]
+            else:
+                method = FOLDABLE_OPS[m.op][0][0]
+                cols[m.column] = acc[f"{m.column}:{method}"]
+
+        df = pd.DataFrame(cols).sort_index()
+        return df.reset_index() if self.keys else df.reset_index(drop=True)
+
+    def rewrite_channels(self, channels: ChannelGroup) -> ChannelGroup:
+        """point each aggregated channel at its pre-aggregated column, in place"""
+        for m in self.measures:
+            ch = channels[m.channel_name].copy()
+            ch.field = m.column
+            ch.aggregate = altUndefined
+            if not is_set(ch._get("type")):
+                ch.type = "quantitative"
+            if not is_set(ch._get("title")):
+                ch.title = aggregate_title(m.op, m.field)
+            channels[m.channel_name] = ch
+        return channels
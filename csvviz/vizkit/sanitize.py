@@ -0,0 +1,176 @@
+"""
+sanitize.py
+
+Altair turns a chart's dataframe into JSON-ready records with sanitize_dataframe(), on every
+to_dict()/to_json() call, i.e. chart_dict() and then chart_json() pay for it twice. And each
+time, it deep-copies the whole frame, then converts datetimes and arrays one value at a time.
+
+Instead, csvviz's data transformer, which Chart enables in place of Altair's default,
+sanitizes with vectorized conversions, building only the columns that need converting, and
+hands Altair {"values": records}.
+
+It can also be handed an already-sanitized frame, with presanitized(), i.e. Chart sanitizes
+its data once, and keeps the result for as long as it keeps that data
+
+Its output is the same as Altair's, MaxRowsError included. Altair still sees the original
+dataframe when it infers field types from shorthands
+"""
+
+from contextlib import contextmanager
+from typing import (
+    Iterator as IteratorType,
+    Optional as OptionalType,
+    Tuple as TupleType,
+)
+
+import altair as alt
+from altair.utils import sanitize_dataframe
+from altair.utils.data import limit_rows
+import numpy as np
+import pandas as pd
+
+TRANSFORMER_NAME = "csvviz"
+
+# i.e. what infer_dtype() calls object columns that can't hold arrays
+SCALAR_KINDS = {
+    "string",
+    "empty",
+    "bytes",
+    "boolean",
+    "integer",
+    "floating",
+    "mixed-integer-float",
+    "decimal",
+    "date",
+    "datetime",
+}
+
+NULLABLE_DTYPES = {
+    "category",
+    "string",
+    "boolean",
+    "Int8",
+    "Int16",
+    "Int32",
+    "Int64",
+    "UInt8",
+    "UInt16",
+    "UInt32",
+    "UInt64",
+    "Float32",
+    "Float64",
+}
+
+
+def nulls_to_none(col: pd.Series) -> pd.Series:
+    col = col.astype(object)
+    return col.where(col.notnull(), None)
+
+
+def isoformat(col: pd.Series) -> pd.Series:
+    """
+    col's datetimes as Timestamp.isoformat() strings, and NaT as '', i.e. with seconds, and
+        with as many fractional digits as each value needs
+    """
+    if col.dt.tz is not None or col.dtype != "datetime64[ns]":
+        return col.apply(lambda x: x.isoformat()).replace("NaT", "")
+
+    values = col.to_numpy()
+    ns = values.view("i8")
+    text = np.where(
+        ns % 1_000_000_000 == 0,
+        np.datetime_as_string(values, unit="s"),
+        np.where(
+            ns % 1000 == 0,
+            np.datetime_as_string(values, unit="us"),
+            np.datetime_as_string(values, unit="ns"),
+        ),
+    ).astype(object)
+    text[np.isnat(values)] = ""
+    return pd.Series(text, index=col.index, name=col.name)
+
+
+def sanitize_column(col: pd.Series) -> pd.Series:
+    """col, converted the way that Altair's sanitize_dataframe() does, without copying it if it needn't be"""
+    dtype = col.dtype
+    if str(dtype) in NULLABLE_DTYPES:
+        return nulls_to_none(col)
+    if str(dtype) == "bool":
+        return col.astype(object)
+    if str(dtype).startswith("datetime"):
+        return isoformat(col)
+    if str(dtype).startswith("timedelta"):
+        raise ValueError(
+            f'Field "{col.name}" has type "{dtype}" which is not supported by Altair. '
+            "Please convert to either a timestamp or a numerical value."
+        )
+    if str(dtype).startswith("geometry"):
+        return col
+    if np.issubdtype(dtype, np.integer):
+        return col.astype(object)
+    if np.issubdtype(dtype, np.floating):
+        return col.astype(object).where(~(col.isnull() | np.isinf(col)), None)
+    if dtype == object:
+        if pd.api.types.infer_dtype(col, skipna=True) not in SCALAR_KINDS:
+            col = col.apply(
+                lambda v: v.tolist() if isinstance(v, np.ndarray) else v,
+                convert_dtype=False,
+            )
+        return col.where(col.notnull(), None)
+    return col
+
+
+def sanitize(df: pd.DataFrame) -> pd.DataFrame:
+    """the same as Altair's sanitize_dataframe(df), but vectorized"""
+    if df.columns.has_duplicates or isinstance(df.columns, pd.MultiIndex):
+        # i.e. columns can't be built up by name; let Altair deal with, or reject, it
+        return sanitize_dataframe(df)
+    # raises the same errors as Altair's, e.g. about non-string column names
+    sanitize_dataframe(df.iloc[:0])
+    names = df.columns
+    if isinstance(names, pd.RangeIndex):
+        names = names.astype(str)
+    return pd.DataFrame(
+        {n: sanitize_column(df[c]).array for n, c in zip(names, df.columns)},
+        index=df.index,
+    )
+
+
+def data_transformer(
+    data,
+    max_rows: int = 5000,
+    sanitized: OptionalType[TupleType[pd.DataFrame, pd.DataFrame]] = None,
+):
+    """
+    Altair's default data transformer, i.e. limit_rows() then to_values(), but with sanitize().
+        sanitized: (a dataframe, its sanitize()d copy), which is used as is for that dataframe
+    """
+    if isinstance(data, pd.DataFrame):
+        limit_rows(data, max_rows=max_rows)
+        if sanitized is not None and sanitized[0] is data:
+            clean = sanitized[1]
+        else:
+            clean = sanitize(data)
+        return {"values": clean.to_dict(orient="records")}
+    return alt.default_data_transformer(data, max_rows=max_rows)
+
+
+def enable_data_transformer() -> None:
+    """
+    makes data_transformer() Altair's active one, with the default's options, e.g. max_rows,
+        unless something other than the default has been enabled
+    """
+    alt.data_transformers.register(TRANSFORMER_NAME, data_transformer)
+    if alt.data_transformers.active == "default":
+        alt.data_transformers.enable(TRANSFORMER_NAME, **alt.data_transformers.options)
+
+
+@contextmanager
+def presanitized(df: pd.DataFrame, clean: pd.DataFrame) -> IteratorType[None]:
+    """within this context, data_transformer() uses clean for df, rather than sanitizing df again"""
+    if alt.data_transformers.active != TRANSFORMER_NAME:
+        yield
+        return
+    options = {**alt.data_transformers.options, "sanitized": (df, clean)}
+    with alt.data_transformers.enable(TRANSFORMER_NAME, **options):
+        yield
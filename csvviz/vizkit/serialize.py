@@ -0,0 +1,202 @@
+"""
+serialize.py
+
+The --no-validate fast path for turning a chart spec into JSON: Altair's to_json() validates
+the entire spec against the Vega-Lite schema, embedded data rows and all, then serializes
+it with the stdlib json module. Instead, this:
+
+    - validates only the spec's skeleton, i.e. with its data values swapped out for [],
+        against a validator that's compiled once per process
+    - serializes with orjson, if it's installed
+
+And for --json in general, iter_chart_json() streams the spec: the skeleton is serialized
+as usual, but the dataset's rows are serialized a chunk at a time, straight from the
+dataframe, i.e. the whole spec never exists as one string. The pieces join up to exactly
+what to_json() returns
+"""
+
+import datetime
+from functools import lru_cache
+import hashlib
+import json
+from typing import (
+    Any as AnyType,
+    Callable as CallableType,
+    Dict as DictType,
+    Iterable as IterableType,
+    Iterator as IteratorType,
+    List as ListType,
+    Optional as OptionalType,
+)
+
+import altair as alt
+from altair.utils.data import limit_rows
+import jsonschema
+import numpy as np
+import pandas as pd
+
+from csvviz.exceptions import VizValueError
+from csvviz.settings import DEFAULT_JSON_CHUNK_ROWS
+from csvviz.vizkit.sanitize import TRANSFORMER_NAME, data_transformer, sanitize
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+@lru_cache(maxsize=None)
+def cached_validator():
+    """the Vega-Lite schema that Altair validates against, compiled just once"""
+    schema = alt.vegalite.core.load_schema()
+    klass = jsonschema.validators.validator_for(schema)
+    return klass(schema)
+
+
+def skeleton(spec: DictType) -> DictType:
+    """a shallow-ish copy of spec, in which every inline dataset is emptied"""
+    skel = dict(spec)
+    if isinstance(skel.get("datasets"), dict):
+        skel["datasets"] = {name: [] for name in skel["datasets"]}
+    data = skel.get("data")
+    if isinstance(data, dict) and "values" in data:
+        skel["data"] = {**data, "values": []}
+    return skel
+
+
+def validate_skeleton(spec: DictType) -> bool:
+    """
+    raises VizValueError if spec, minus its data values, isn't valid Vega-Lite.
+
+    The data rows don't need validating, as they come straight from a dataframe
+    """
+    validator = cached_validator()
+    error = jsonschema.exceptions.best_match(validator.iter_errors(skeleton(spec)))
+    if error is not None:
+        path = "/".join(str(p) for p in error.absolute_path)
+        raise VizValueError(f"Invalid chart spec at '{path}': {error.message}")
+    return True
+
+
+def default_encoder(obj: AnyType) -> AnyType:
+    """for the values that neither orjson nor json know about, e.g. pandas timestamps"""
+    if isinstance(obj, (datetime.datetime, datetime.date)):
+        return obj.isoformat()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(spec: AnyType, indent: OptionalType[int] = 2, sort_keys: bool = False) -> str:
+    """
+    orjson only knows how to indent by 2 spaces, or not at all, i.e. indent=None, so any
+        other indent falls back to json.
+
+    Note that orjson, unlike json, doesn't escape non-ASCII characters
+    """
+    if orjson is not None and indent in (None, 2):
+        option = orjson.OPT_SERIALIZE_NUMPY
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(spec, default=default_encoder, option=option).decode()
+
+    return json.dumps(spec, indent=indent, sort_keys=sort_keys, default=default_encoder)
+
+
+def spec_to_json(
+    spec: DictType, indent: int = 2, sort_keys: bool = False, validate: bool = True
+) -> str:
+    if validate:
+        validate_skeleton(spec)
+    return dumps(spec, indent=indent, sort_keys=sort_keys)
+
+
+# i.e. what the streamed dataset's rows are spliced in for
+PLACEHOLDER = "__csvviz_streamed_dataset__"
+
+
+def is_streamable(chart: alt.TopLevelMixin, indent: OptionalType[int] = 2) -> bool:
+    """i.e. chart's data is a dataframe that Altair would embed as records in datasets"""
+    return (
+        isinstance(chart, alt.Chart)
+        and isinstance(chart.data, pd.DataFrame)
+        and len(chart.data.columns) > 0
+        and alt.data_transformers.active in ("default", TRANSFORMER_NAME)
+        and bool(indent)
+    )
+
+
+def iter_records(df: pd.DataFrame, chunk_rows: int) -> IteratorType[ListType[DictType]]:
+    """df's JSON-ready records, chunk_rows at a time, i.e. only one chunk is sanitized at once"""
+    for i in range(0, len(df), chunk_rows):
+        yield sanitize(df.iloc[i : i + chunk_rows]).to_dict(orient="records")
+
+
+def dataset_name(chunks: IterableType[ListType[DictType]]) -> str:
+    """what Altair names a dataset of these records, i.e. by the md5 of their JSON, a chunk at a time"""
+    md5 = hashlib.md5(b"[")
+    sep = b""
+    for records in chunks:
+        for rec in records:
+            md5.update(sep + json.dumps(rec, sort_keys=True).encode())
+            sep = b", "
+    md5.update(b"]")
+    return f"data-{md5.hexdigest()}"
+
+
+def iter_chart_json(
+    chart: alt.Chart,
+    indent: int = 2,
+    sort_keys: bool = False,
+    validate: bool = True,
+    fast: bool = False,
+    chunk_rows: int = DEFAULT_JSON_CHUNK_ROWS,
+) -> IteratorType[str]:
+    """
+    chart's JSON spec, in pieces, with its dataset's rows serialized chunk_rows at a time.
+        fast: see spec_to_json()
+    """
+    df = chart.data
+    # i.e. the same MaxRowsError as Altair's default data transformer
+    max_rows = alt.data_transformers.options.get("max_rows", 5000)
+    limit_rows(df, max_rows=max_rows)
+    # i.e. the rows are sanitized twice, chunk by chunk, rather than kept in memory at once
+    name = dataset_name(iter_records(df, chunk_rows))
+
+    def transformer(data):
+        if data is df:
+            return {"name": name}
+        return data_transformer(data, max_rows=max_rows)
+
+    # i.e. the spec sans rows; Altair still sees the dataframe, to infer field types from
+    alt.data_transformers.register("csvviz_streamed", transformer)
+    with alt.data_transformers.enable("csvviz_streamed"):
+        spec = chart.to_dict(validate=validate and not fast)
+
+    encode: CallableType[[AnyType], str]
+    if fast:
+        if validate:
+            validate_skeleton(spec)
+        encode = lambda obj: dumps(obj, indent=indent, sort_keys=sort_keys)
+    else:
+        encode = lambda obj: json.dumps(obj, indent=indent, sort_keys=sort_keys)
+
+    # Altair puts datasets last, with the chart's own data first
+    spec["datasets"] = {name: PLACEHOLDER, **spec.pop("datasets", {})}
+    head, tail = encode(spec).split(json.dumps(PLACEHOLDER), 1)
+    keyline = head[head.rfind("\n") + 1 :]
+    outer = " " * (len(keyline) - len(keyline.lstrip(" ")))
+    inner = outer + " " * indent
+
+    yield head
+    opener = "[\n"
+    for records in iter_records(df, chunk_rows):
+        rows = (inner + encode(r).replace("\n", "\n" + inner) for r in records)
+        yield opener + ",\n".join(rows)
+        opener = ",\n"
+    yield "[]" if opener == "[\n" else f"\n{outer}]"
+    yield tail
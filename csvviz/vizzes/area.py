@@ -8,6 +8,7 @@ $ csvviz line examples/tonk.csv --json -x date:T
 
 import altair as alt
 import click
+import pandas as pd
 from csvviz.exceptions import *
 from csvviz.vizkit import Vizkit
 from csvviz.vizkit.channel_group import ChannelGroup
@@ -45,6 +46,12 @@ class Areakit(Vizkit):
             is_flag=True,
             help="For stacked bar charts, normalize the total area heights to 100%",
         ),
+        click.option(
+            "--max-points",
+            "max_points",
+            type=click.IntRange(min=2),
+            help="Downsample each series to at most this many points (LTTB), keeping the shape of the line. Stacked series are sampled at the same x values, picked from their total. Useful for long time series",
+        ),
         # TKD
         # https://altair-viz.github.io/user_guide/encoding.html?#ordering-marks
         # click.option(
@@ -84,6 +91,17 @@ class Areakit(Vizkit):
 
         return True
 
+    def finalize_data(self, data: pd.DataFrame) -> pd.DataFrame:
+        data = super().finalize_data(data)
+        if self.options.get("max_points"):
+            # i.e. areas with a color are stacked, so they're sampled at the same x's
+            data = self.downsample_series(
+                data,
+                self.options["max_points"],
+                stacked=bool(self.options.get("colorvar")),
+            )
+        return data
+
     @property
     def normalized(self) -> bool:
         return True if self.options.get("normalized") else False
@@ -7,9 +7,13 @@ csvviz hist 'year(birthday)' examples/real/congress.csv
 
 import altair as alt
 import click
-from typing import Dict as DictType
+import numpy as np
+import pandas as pd
+from typing import Dict as DictType, List as ListType
 
+from csvviz import altUndefined
 from csvviz.exceptions import *
+from csvviz.utils.binning import BinParams, bin_params, histogram
 from csvviz.vizzes.bar import Barkit
 from csvviz.vizkit.chart import Chart
 
@@ -18,6 +22,13 @@ BINNING_OPTS = (
     "binstepsize",
 )
 
+# the columns of the embedded, pre-binned data
+BINNED_COLUMNS = (
+    "bin_start",
+    "bin_end",
+    "count",
+)
+
 
 class Histkit(Barkit):
     viz_commandname = "hist"
@@ -106,6 +117,126 @@ class Histkit(Barkit):
 
         return channels
 
+    def finalize_data(self, data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Bin quantitative values with NumPy, so that only bin edges and counts get embedded,
+        rather than every observation, e.g.
+
+            bin_start  bin_end  count
+                 10.0     15.0      1
+                 20.0     25.0      1
+
+        Binning is done per group if --colorvar and/or --gridvar are set, but always
+        across the same bin edges, i.e. Vega's behavior
+
+        Non-quantitative values (e.g. 'amount:O', 'year(birthday)') are still binned by Vega
+        """
+        bname, cname = ("y", "x") if self.is_horizontal else ("x", "y")
+        binchannel = self.channels[bname]
+        if (
+            not isinstance(binchannel, (alt.X, alt.Y))
+            or binchannel.type != "quantitative"
+            or binchannel._get("timeUnit") is not altUndefined
+        ):
+            return super().finalize_data(data)
+
+        keys = []
+        for name, channel in self.channels.items():
+            if name in (bname, cname):
+                continue
+            if (
+                not isinstance(channel, alt.utils.schemapi.SchemaBase)
+                or channel._get("aggregate") is not altUndefined
+                or channel._get("bin") is not altUndefined
+                or channel._get("timeUnit") is not altUndefined
+            ):
+                return super().finalize_data(data)
+            if channel.field not in keys:
+                keys.append(channel.field)
+
+        xfield = binchannel.field
+        if any(k in BINNED_COLUMNS for k in keys):
+            return super().finalize_data(data)
+
+        # in chunked mode, the input is passed over twice: for the extent, then for the counts
+        frames = self.data_chunks if self.is_chunked else lambda: [data]
+
+        lo, hi = np.inf, -np.inf
+        for df in frames():
+            values = pd.to_numeric(df[xfield], errors="coerce")
+            lo, hi = np.fmin(lo, values.min()), np.fmax(hi, values.max())
+        if not np.isfinite(lo):  # i.e. there are no numeric values at all
+            return super().finalize_data(data)
+
+        binopts = binchannel.bin if isinstance(binchannel.bin, alt.Bin) else alt.Bin()
+        params = bin_params(
+            extent=(lo, hi),
+            maxbins=binopts._get("maxbins", None),
+            step=binopts._get("step", None),
+        )
+
+        binned = None
+        for df in frames():
+            hf = self.bin_counts(df, xfield, keys, params)
+            if binned is not None:
+                hf = (
+                    pd.concat([binned, hf])
+                    .groupby(keys + list(BINNED_COLUMNS[0:2]), dropna=False)
+                    .sum()
+                    .reset_index()
+                )
+            binned = hf
+
+        # rewrite the binned channel and the count channel, e.g. x, x2, and y
+        bin_start, bin_end, count = BINNED_COLUMNS
+        ch = binchannel.copy()
+        ch.field = bin_start
+        ch.bin = alt.Bin(binned=True, step=params.step)
+        if ch._get("title") is altUndefined:
+            ch.title = f"{xfield} (binned)"
+        self.channels[bname] = ch
+        self.channels[f"{bname}2"] = {"x": alt.X2, "y": alt.Y2}[bname](bin_end)
+        self.channels[cname] = {"x": alt.X, "y": alt.Y}[cname](
+            count, type="quantitative", title="Count of Records"
+        )
+
+        return binned.sort_values(keys + [BINNED_COLUMNS[0]], ignore_index=True)
+
+    @staticmethod
+    def bin_counts(
+        data: pd.DataFrame, xfield: str, keys: ListType[str], params: BinParams
+    ) -> pd.DataFrame:
+        """
+        returns the non-empty bins, i.e. keys + BINNED_COLUMNS, of data[xfield],
+            counted per group of keys
+        """
+        values = pd.to_numeric(data[xfield], errors="coerce")
+        if keys:
+            by = [data[k] for k in keys] if len(keys) > 1 else data[keys[0]]
+            groups = values.groupby(by, sort=False, dropna=False)
+        else:
+            groups = [((), values)]
+
+        frames = []
+        for gkey, gvals in groups:
+            counts, edges = histogram(gvals.to_numpy(dtype=float), params)
+            hf = pd.DataFrame(
+                {
+                    BINNED_COLUMNS[0]: edges[:-1],
+                    BINNED_COLUMNS[1]: edges[1:],
+                    BINNED_COLUMNS[2]: counts,
+                }
+            )
+            gkey = gkey if isinstance(gkey, tuple) else (gkey,)
+            for k, v in zip(keys, gkey):
+                hf.insert(len(hf.columns) - 3, k, v)
+            # like Vega, only bins that have values are emitted
+            frames.append(hf[hf[BINNED_COLUMNS[2]] > 0])
+
+        if not frames:
+            return pd.DataFrame(columns=keys + list(BINNED_COLUMNS))
+        return pd.concat(frames, ignore_index=True)
+
     def finalize_chart(self, chart: Chart) -> Chart:
         # ok, horizontal bar charts are confusing because by default, cvz bar makes a COLUMN chart
         # TK: make cvz column type
@@ -8,6 +8,7 @@ $ csvviz line examples/tonk.csv --json -x date:T
 
 import altair as alt
 import click
+import pandas as pd
 from csvviz.exceptions import *
 from csvviz.vizkit import Vizkit
 
@@ -40,6 +41,12 @@ class Linekit(Vizkit):
             type=click.STRING,
             help="The name of the column for mapping line colors. This is required for creating a multi-series line chart.",
         ),
+        click.option(
+            "--max-points",
+            "max_points",
+            type=click.IntRange(min=2),
+            help="Downsample each series to at most this many points (LTTB), keeping the shape of the line. Useful for long time series",
+        ),
     )
 
     def finalize_channels(self, channels):
@@ -48,3 +55,9 @@ class Linekit(Vizkit):
     def validate_options(self, options: dict) -> bool:
         super().validate_options(options)
         return True
+
+    def finalize_data(self, data: pd.DataFrame) -> pd.DataFrame:
+        data = super().finalize_data(data)
+        if self.options.get("max_points"):
+            data = self.downsample_series(data, self.options["max_points"])
+        return data
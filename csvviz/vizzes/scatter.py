@@ -1,13 +1,30 @@
 """
 scatter.py
 """
+
 from pathlib import Path
 
 import altair as alt
 import click
+import numpy as np
+import pandas as pd
+from typing import Optional as OptionalType, Tuple as TupleType
 
+from csvviz import altUndefined
 from csvviz.exceptions import *
+from csvviz.settings import *
+from csvviz.utils.binning import bin_params, histogram2d
 from csvviz.vizkit import Vizkit
+from csvviz.vizkit.chart import Chart
+
+# the columns of the embedded data in density mode, i.e. one row per non-empty cell
+DENSITY_COLUMNS = (
+    "x_start",
+    "x_end",
+    "y_start",
+    "y_end",
+    "count",
+)
 
 
 class Scatterkit(Vizkit):
@@ -17,6 +34,7 @@ class Scatterkit(Vizkit):
         """Example:  $ csvviz scatter -x mass -y volume -s velocity data.csv"""
     )
     color_channel_name = "fill"
+    limit_filterable = True
 
     COMMAND_DECORATORS = (
         click.option(
@@ -45,6 +63,12 @@ class Scatterkit(Vizkit):
             type=click.STRING,
             help="The name of the column for mapping dot size. This effectively creates a bubble chart.",
         ),
+        click.option(
+            "--density/--no-density",
+            "density",
+            default=None,
+            help=f"Bin the points into a 2D grid and color each cell by its count, rather than drawing every point. By default, this happens when there are more than {DEFAULT_DENSITY_THRESHOLD:,} rows",
+        ),
     )
 
     def finalize_channels(self, channels):
@@ -53,3 +77,175 @@ class Scatterkit(Vizkit):
     def validate_options(self, options: dict) -> bool:
         super().validate_options(options)
         return True
+
+    @property
+    def is_density(self) -> bool:
+        """set by finalize_data(), i.e. whether the points were actually binned"""
+        return getattr(self, "_is_density", False)
+
+    def wants_density(self, data: pd.DataFrame) -> bool:
+        """--density, --no-density, or else whether there are too many points to draw"""
+        opt = self.options.get("density")
+        if opt is not None:
+            return opt
+        # chunked input is presumably too big to embed point by point; and the rows in
+        # skipped Parquet row groups count, as they would if they'd been read
+        rows = len(data) + self.datasource.skipped_rows
+        return self.is_chunked or rows > DEFAULT_DENSITY_THRESHOLD
+
+    def finalize_data(self, data: pd.DataFrame) -> pd.DataFrame:
+        """
+        In density mode, x and y are binned into a grid with NumPy, and only the
+        non-empty cells get embedded, e.g.
+
+            x_start  x_end  y_start  y_end  count
+                 10     12       40     41     83
+
+        The grid is split by --gridvar, if set; --colorvar and --sizevar have no use
+        here, since the count is what gets mapped to color
+
+        --xlim/--ylim, if set, are the binning domain, i.e. points outside of them are dropped
+        """
+        self._is_density = False
+        if not self.wants_density(data):
+            return super().finalize_data(data)
+
+        xch, ych = self.channels["x"], self.channels["y"]
+        for channel in (xch, ych):
+            if (
+                not isinstance(channel, (alt.X, alt.Y))
+                or channel.type != "quantitative"
+                or channel._get("aggregate") is not altUndefined
+                or channel._get("bin") is not altUndefined
+                or channel._get("timeUnit") is not altUndefined
+            ):
+                self.warnings.append(
+                    "Density mode requires plain quantitative x and y fields, so every point is drawn"
+                )
+                return super().finalize_data(data)
+
+        keys = []
+        facet = self.channels.get("facet")
+        if facet is not None:
+            keys.append(facet.field)
+            if facet.field in DENSITY_COLUMNS:
+                return super().finalize_data(data)
+
+        xfield, yfield = xch.field, ych.field
+        xlim, ylim = self.parse_lim("xlim"), self.parse_lim("ylim")
+        # in chunked mode, the input is passed over twice: for the extents, then for the counts
+        frames = self.data_chunks if self.is_chunked else lambda: [data]
+
+        xlo = ylo = np.inf
+        xhi = yhi = -np.inf
+        if not (xlim and ylim):
+            for df in frames():
+                xs = pd.to_numeric(df[xfield], errors="coerce")
+                ys = pd.to_numeric(df[yfield], errors="coerce")
+                xlo, xhi = np.fmin(xlo, xs.min()), np.fmax(xhi, xs.max())
+                ylo, yhi = np.fmin(ylo, ys.min()), np.fmax(yhi, ys.max())
+        xlim = xlim or (xlo, xhi)
+        ylim = ylim or (ylo, yhi)
+        if not (np.isfinite(xlim).all() and np.isfinite(ylim).all()):
+            return super().finalize_data(data)
+
+        xparams = bin_params(xlim, maxbins=DEFAULT_DENSITY_MAXBINS)
+        yparams = bin_params(ylim, maxbins=DEFAULT_DENSITY_MAXBINS)
+
+        cells = []
+        for df in frames():
+            xs = pd.to_numeric(df[xfield], errors="coerce")
+            ys = pd.to_numeric(df[yfield], errors="coerce")
+            # the nice bin edges can be wider than the limits, which shouldn't let in more points
+            inbounds = xs.between(*xlim) & ys.between(*ylim)
+            if keys:
+                groups = df[inbounds].groupby(keys[0], sort=False, dropna=False)
+            else:
+                groups = [(None, df[inbounds])]
+
+            for gkey, gf in groups:
+                counts = histogram2d(
+                    pd.to_numeric(gf[xfield], errors="coerce").to_numpy(dtype=float),
+                    pd.to_numeric(gf[yfield], errors="coerce").to_numpy(dtype=float),
+                    xparams,
+                    yparams,
+                )
+                xi, yi = np.nonzero(counts)
+                cf = pd.DataFrame(
+                    {
+                        "x_start": xparams.edges[xi],
+                        "x_end": xparams.edges[xi + 1],
+                        "y_start": yparams.edges[yi],
+                        "y_end": yparams.edges[yi + 1],
+                        "count": counts[xi, yi],
+                    }
+                )
+                if keys:
+                    cf.insert(0, keys[0], gkey)
+                cells.append(cf)
+
+        if cells:
+            # the same cell can show up once per chunk
+            cells = (
+                pd.concat(cells)
+                .groupby(keys + list(DENSITY_COLUMNS[0:4]), dropna=False)
+                .sum()
+                .reset_index()
+            )
+        else:
+            cells = pd.DataFrame(columns=keys + list(DENSITY_COLUMNS))
+
+        for cname in (self.color_channel_name, "size"):
+            if self.channels.get(cname) is not None:
+                self.warnings.append(
+                    f"The '{cname}' channel is ignored in density mode, where color is mapped to the count of points"
+                )
+                del self.channels[cname]
+
+        for cname, ch, field, params in (
+            ("x", xch, xfield, xparams),
+            ("y", ych, yfield, yparams),
+        ):
+            ch = ch.copy()
+            ch.field = f"{cname}_start"
+            ch.bin = alt.Bin(binned=True, step=params.step)
+            if ch._get("title") is altUndefined:
+                ch.title = field
+            self.channels[cname] = ch
+            self.channels[f"{cname}2"] = {"x": alt.X2, "y": alt.Y2}[cname](
+                f"{cname}_end"
+            )
+        self.channels[self.color_channel_name] = alt.Fill(
+            "count",
+            type="quantitative",
+            title="Count of Records",
+            scale=alt.Scale(scheme=DEFAULT_COLOR_SCHEMES["heatmap"]),
+            legend=alt.Legend(orient=DEFAULT_LEGEND_ORIENTATION),
+        )
+
+        self._is_density = True
+        return cells.reset_index(drop=True)
+
+    def parse_lim(self, name: str) -> OptionalType[TupleType[float, float]]:
+        """e.g. --xlim '-10,50' => (-10.0, 50.0)"""
+        arg = self.options.get(name)
+        if not arg:
+            return None
+        try:
+            lo, hi = [float(a.strip()) for a in arg.split(",")]
+        except ValueError:
+            raise VizValueError(
+                f"--{name} must be a comma-delimited pair of numbers in density mode, not '{arg}'"
+            )
+        return (lo, hi)
+
+    def init_chart(self) -> Chart:
+        if not self.is_density:
+            return super().init_chart()
+        return Chart(
+            viz_name="density",
+            data=self.chart_data,
+            channels=self.channels,
+            defaults=self.chart_defaults(),
+            options=self.options,
+        )
@@ -18,7 +18,7 @@ install_requirements = [
     "altair>=4.1",
     "altair-viewer>=0.3.0",
     "Click>=7.0",
-    "pandas>=0.18",
+    "pandas>=1.1",
 
 ]
 setup_requirements = [
@@ -34,7 +34,7 @@ setup(
     version=csvviz_vals.__version__,
     author=csvviz_vals.__author__,
     author_email=csvviz_vals.__author_email__,
-    python_requires=">=3.6",
+    python_requires=">=3.7",
     classifiers=[
         "Development Status :: 3 - Alpha",
         "Environment :: Console",
@@ -51,7 +51,6 @@ setup(
         "Operating System :: Microsoft :: Windows :: Windows 10",
         "Operating System :: POSIX",
         "Programming Language :: Python :: 3",
-        "Programming Language :: Python :: 3.6",
         "Programming Language :: Python :: 3.7",
         "Programming Language :: Python :: 3.8",
         "Topic :: Scientific/Engineering :: Visualization",
@@ -72,6 +71,12 @@ setup(
             "tox>=3.14",
             "twine>=3",
         ],
+        "arrow": [
+            "pyarrow",
+        ],
+        "zstd": [
+            "zstandard",
+        ],
         "docs": [
             "sphinx",
             "sphinx_rtd_theme",
@@ -79,6 +84,9 @@ setup(
             "vega_datasets",
             "watchdog",
         ],
+        "fast": [
+            "orjson",
+        ],
         "tests": test_requirements,
     },
     install_requires=install_requirements,
@@ -0,0 +1,10 @@
+import pytest
+
+
+@pytest.fixture(autouse=True, scope="session")
+def csvviz_cache_dir(tmp_path_factory):
+    """keep the tests from reading or writing the user's ~/.cache/csvviz"""
+    mp = pytest.MonkeyPatch()
+    mp.setenv("CSVVIZ_CACHE_DIR", str(tmp_path_factory.mktemp("csvviz-cache")))
+    yield
+    mp.undo()
@@ -0,0 +1,41 @@
+import pytest
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+from click.testing import CliRunner
+
+from csvviz.vizkit.clicky import stdin_reader
+from csvviz.vizzes.bar import Barkit
+
+viz = Barkit.register_command()
+
+REPO_DIR = Path(__file__).resolve().parents[3]
+
+ARGS = ["-x", "product", "-y", "sum(revenue)", "--json", "--no-preview"]
+
+
+def spec(output) -> dict:
+    d = json.loads(output)
+    d.pop("selection", None)
+    return d
+
+
+def test_stdin_reader():
+    # i.e. a real pipe, rather than CliRunner's BytesIO
+    code = "from csvviz.vizkit.clicky import stdin_reader; f = stdin_reader(); print(type(f).__name__, f.mode, f.read())"
+    resp = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=REPO_DIR,
+        input=b"a,b\n",
+        capture_output=True,
+    )
+    assert resp.stdout.decode().strip() == r"BufferedReader rb b'a,b\n'"
+
+
+def test_piped_input_is_binary():
+    expected = spec(CliRunner().invoke(viz, [*ARGS, "examples/fruits.csv"]).output)
+    data = Path("examples/fruits.csv").read_bytes()
+    assert spec(CliRunner().invoke(viz, [*ARGS, "-"], input=data).output) == expected
+    assert spec(CliRunner().invoke(viz, ARGS, input=data).output) == expected
@@ -0,0 +1,128 @@
+import pytest
+import io
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pandas as pd
+from click.testing import CliRunner
+
+pytest.importorskip("pyarrow")
+
+from csvviz.exceptions import VizValueError
+from csvviz.utils import arrow
+from csvviz.vizkit.datasource import DataSource
+from csvviz.vizzes.line import Linekit
+
+line = Linekit.register_command()
+
+REPO_DIR = Path(__file__).resolve().parents[2]
+
+
+@pytest.fixture
+def datafile(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_text(
+        "id,date,when,name,flag,empty,amount\n"
+        "1,2020-01-01,2020-01-01 10:00:00,a,true,,1.5\n"
+        "2,2020-02-01,2020-02-01 11:30:00,NA,False,,n/a\n"
+        "3,2020-03-01,2020-03-01 12:45:00,,TRUE,,3\n"
+    )
+    return path
+
+
+def test_read_csv_matches_pandas(datafile):
+    expected = pd.read_csv(datafile)
+    df = arrow.read_csv(str(datafile))
+    pd.testing.assert_frame_equal(df, expected)
+    # i.e. dates are strings, as with pandas
+    assert df["date"].tolist() == ["2020-01-01", "2020-02-01", "2020-03-01"]
+
+    pd.testing.assert_frame_equal(
+        arrow.read_csv(str(datafile), usecols=["amount", "id"]),
+        expected[["id", "amount"]],
+    )
+
+
+def test_read_csv_refuses(tmp_path):
+    path = tmp_path / "dupes.csv"
+    path.write_text("a,a,\n1,2,3\n")
+    with pytest.raises(ValueError, match="pandas would rename"):
+        arrow.read_csv(str(path))
+
+
+def test_datasource_falls_back_to_pandas(tmp_path):
+    path = tmp_path / "short.csv"
+    # i.e. a row that's missing a field, which pandas fills with NaN
+    path.write_text("a,b\n1,2\n3\n")
+    with pytest.raises(ValueError):
+        arrow.read_csv(str(path))
+    df = DataSource(str(path), engine="pyarrow").read()
+    pd.testing.assert_frame_equal(df, pd.read_csv(path))
+
+
+def test_engine_auto(datafile, monkeypatch):
+    assert DataSource(str(datafile), engine="auto").arrow_path is None
+    assert DataSource(str(datafile), engine="pyarrow").arrow_path == str(datafile)
+    assert DataSource(str(datafile), engine="pyarrow", chunksize=10).arrow_path is None
+
+    monkeypatch.setattr("csvviz.vizkit.datasource.DEFAULT_ARROW_ENGINE_BYTES", 10)
+    assert DataSource(str(datafile), engine="auto").arrow_path == str(datafile)
+    monkeypatch.setattr("csvviz.utils.arrow.is_available", lambda: False)
+    assert DataSource(str(datafile), engine="auto").arrow_path is None
+
+
+def test_cli_engine_pyarrow():
+    args = ["-x", "date", "-y", "price", "-c", "company", "--json", "--no-preview"]
+    args += ["--no-cache", "examples/stocks.csv"]
+
+    def spec(resp):
+        d = json.loads(resp.output)
+        d.pop("selection", None)
+        return d
+
+    expected = spec(CliRunner().invoke(line, [*args, "--engine", "c"]))
+    assert spec(CliRunner().invoke(line, [*args, "--engine", "pyarrow"])) == expected
+
+
+class Unseekable(io.BytesIO):
+    """i.e. a pipe"""
+
+    def seekable(self):
+        return False
+
+
+def test_read_csv_stream(datafile):
+    expected = pd.read_csv(datafile)
+    with open(datafile, "rb") as f:
+        pd.testing.assert_frame_equal(arrow.read_csv(f), expected)
+
+    # i.e. Arrow has read past what pandas could've parsed instead
+    data = datafile.read_bytes() + b"4,2020-04-01\n"
+    stream = io.BufferedReader(Unseekable(data), buffer_size=64)
+    src = DataSource(stream, engine="pyarrow")
+    assert src.arrow_stream is True
+    with pytest.raises(VizValueError, match="try --engine c"):
+        src.header()
+
+
+def test_cli_piped_engine_pyarrow(datafile):
+    code = "from csvviz.cli import main; main()"
+    args = ["line", "-x", "date", "-y", "amount", "--json", "--no-preview"]
+    env = {**os.environ, "CSVVIZ_NO_DAEMON": "1"}
+
+    def spec(*a):
+        resp = subprocess.run(
+            [sys.executable, "-c", code, *args, *a],
+            input=datafile.read_bytes(),
+            capture_output=True,
+            cwd=REPO_DIR,
+            env=env,
+        )
+        d = json.loads(resp.stdout)
+        d.pop("selection", None)
+        return d
+
+    assert spec("--engine", "pyarrow") == spec("--engine", "c")
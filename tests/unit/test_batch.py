@@ -0,0 +1,228 @@
+import pytest
+import gzip
+import json
+from pathlib import Path
+
+import pandas as pd
+from click.testing import CliRunner
+
+from csvviz import batch
+from csvviz.batch import FrameCache, job_options, parse_manifest
+from csvviz.exceptions import VizValueError
+from csvviz.registry import load_command
+from csvviz.vizzes.bar import Barkit
+
+
+def manifest(tmp_path, *jobs) -> str:
+    path = tmp_path / "manifest.jsonl"
+    path.write_text("\n".join(json.dumps(j) for j in jobs))
+    return str(path)
+
+
+def test_parse_manifest():
+    jobs = parse_manifest(
+        [
+            '{"viz": "bar", "input": "a.csv", "output": "a.json"}',
+            "",
+            '{"viz": "line", "input": "a.csv", "output": "b.html", "options": {"x": "date"}}',
+        ]
+    )
+    assert [j.lineno for j in jobs] == [1, 3]
+    assert jobs[1].options == {"x": "date"}
+    assert jobs[1].output == Path("b.html")
+
+    with pytest.raises(VizValueError, match="line 1 is missing: output"):
+        parse_manifest(['{"viz": "bar", "input": "a.csv"}'])
+    with pytest.raises(VizValueError, match="unknown viz 'pie'"):
+        parse_manifest(['{"viz": "pie", "input": "a.csv", "output": "a.json"}'])
+    with pytest.raises(VizValueError, match="output path"):
+        parse_manifest(['{"viz": "bar", "input": "a.csv", "output": "a.png"}'])
+
+
+def test_job_options_defaults_and_aliases():
+    opts = job_options(
+        load_command("bar"),
+        {"x": "product", "color-scheme": "dark2", "chart_width": "300"},
+    )
+    assert opts["xvar"] == "product"
+    assert opts["color_scheme"] == "dark2"
+    assert opts["chart_width"] == 300
+    # i.e. the command line defaults
+    assert opts["is_interactive"] is True
+    assert opts["yvar"] is None
+
+    with pytest.raises(VizValueError, match="'bins' is not an option of `bar`"):
+        job_options(load_command("bar"), {"bins": 3})
+
+
+def test_frame_cache_parses_once_and_releases(monkeypatch):
+    calls = []
+    read_csv = pd.read_csv
+    monkeypatch.setattr(
+        pd, "read_csv", lambda p, **kw: calls.append(p) or read_csv(p, **kw)
+    )
+
+    jobs = parse_manifest(
+        [
+            '{"viz": "bar", "input": "examples/fruits.csv", "output": "a.json"}',
+            '{"viz": "bar", "input": "./examples/fruits.csv", "output": "b.json"}',
+        ]
+    )
+    cache = FrameCache(jobs)
+    assert cache.get("examples/fruits.csv") is cache.get("./examples/fruits.csv")
+    assert len(calls) == 1
+
+    cache.release("examples/fruits.csv")
+    assert cache.frames
+    cache.release("examples/fruits.csv")
+    assert not cache.frames
+
+
+def test_batch_matches_single_commands(tmp_path):
+    args = {"xvar": "product", "yvar": "revenue", "colorvar": "season"}
+    path = manifest(
+        tmp_path,
+        {
+            "viz": "bar",
+            "input": "examples/fruits.csv",
+            "output": str(tmp_path / "out/bar.json"),
+            "options": args,
+        },
+        {
+            "viz": "line",
+            "input": "examples/fruits.csv",
+            "output": str(tmp_path / "out/line.html"),
+        },
+    )
+    result = CliRunner().invoke(batch.command, [path])
+    assert result.exit_code == 0
+    assert result.output.splitlines() == [
+        str(tmp_path / "out/bar.json"),
+        str(tmp_path / "out/line.html"),
+    ]
+    assert "<html>" in (tmp_path / "out/line.html").read_text()
+
+    got = json.loads((tmp_path / "out/bar.json").read_text())
+    expected = json.loads(
+        CliRunner()
+        .invoke(
+            Barkit.register_command(),
+            [
+                "examples/fruits.csv",
+                "--json",
+                "--no-preview",
+                "-x",
+                "product",
+                "-y",
+                "revenue",
+                "-c",
+                "season",
+            ],
+        )
+        .output
+    )
+    # altair numbers each selection param with a global counter
+    got.pop("selection")
+    expected.pop("selection")
+    assert got == expected
+
+
+def test_batch_keeps_going_after_a_failure(tmp_path):
+    path = manifest(
+        tmp_path,
+        {
+            "viz": "bar",
+            "input": "examples/fruits.csv",
+            "output": str(tmp_path / "bad.json"),
+            "options": {"x": "nope"},
+        },
+        {
+            "viz": "bar",
+            "input": "examples/fruits.csv",
+            "output": str(tmp_path / "good.json"),
+        },
+    )
+    result = CliRunner(mix_stderr=False).invoke(batch.command, [path])
+    assert result.exit_code == 1
+    assert "Error: [line 1] InvalidDataReference" in result.stderr
+    assert "1 of 2 charts failed" in result.stderr
+    assert (tmp_path / "good.json").exists()
+    assert not (tmp_path / "bad.json").exists()
+
+
+def test_batch_jobs_match_serial(tmp_path):
+    jobs = []
+    for i, viz in enumerate(["bar", "line", "scatter", "area", "bar", "nope.csv"]):
+        jobs.append(
+            {
+                "viz": "bar" if viz.endswith(".csv") else viz,
+                "input": viz if viz.endswith(".csv") else "examples/fruits.csv",
+                "output": str(tmp_path / "{}" / f"{i}.json"),
+            }
+        )
+
+    outputs = {}
+    for mode, args in (("serial", []), ("parallel", ["--jobs", "3"])):
+        lines = [json.dumps(j).replace("{}", mode) for j in jobs]
+        path = tmp_path / f"{mode}.jsonl"
+        path.write_text("\n".join(lines))
+        result = CliRunner(mix_stderr=False).invoke(batch.command, [*args, str(path)])
+        assert result.exit_code == 1
+        assert "Error: [line 6]" in result.stderr
+        outputs[mode] = [Path(line).name for line in result.output.splitlines()]
+
+        for i in range(5):
+            d = json.loads((tmp_path / mode / f"{i}.json").read_text())
+            d.pop("selection", None)
+            outputs[f"{mode}-{i}"] = d
+
+    assert outputs["serial"] == outputs["parallel"]
+    assert outputs["serial"] == [f"{i}.json" for i in range(5)]
+    for i in range(5):
+        assert outputs[f"serial-{i}"] == outputs[f"parallel-{i}"]
+
+
+def test_batch_reports_too_many_rows_and_keeps_going(tmp_path):
+    big = tmp_path / "big.csv"
+    pd.DataFrame({"x": range(6000), "y": range(6000)}).to_csv(big, index=False)
+    path = manifest(
+        tmp_path,
+        {"viz": "scatter", "input": str(big), "output": str(tmp_path / "o1.json")},
+        {
+            "viz": "bar",
+            "input": "examples/fruits.csv",
+            "output": str(tmp_path / "o2.json"),
+        },
+    )
+    result = CliRunner(mix_stderr=False).invoke(batch.command, [path])
+    assert result.exit_code == 1
+    assert "Error: [line 1] The number of rows" in result.stderr
+    assert result.output.splitlines() == [str(tmp_path / "o2.json")]
+    json.loads((tmp_path / "o2.json").read_text())
+    # i.e. no empty o1.json, and no leftover temp file
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "big.csv",
+        "manifest.jsonl",
+        "o2.json",
+    ]
+
+
+def test_batch_reads_inputs_like_single_charts(tmp_path):
+    # i.e. gzipped, but without a suffix that pandas would recognize
+    gz = tmp_path / "fruits.data"
+    gz.write_bytes(gzip.compress(Path("examples/fruits.csv").read_bytes()))
+    jobs = parse_manifest(
+        [
+            json.dumps({"viz": "bar", "input": str(gz), "output": "a.json"}),
+            '{"viz": "bar", "input": "examples/fruits.csv", "output": "b.json"}',
+        ]
+    )
+    cache = FrameCache(jobs)
+    pd.testing.assert_frame_equal(cache.get(str(gz)), cache.get("examples/fruits.csv"))
+
+    pytest.importorskip("pyarrow")
+    parquet = tmp_path / "fruits.parquet"
+    pd.read_csv("examples/fruits.csv").to_parquet(parquet)
+    pd.testing.assert_frame_equal(
+        FrameCache([]).get(str(parquet)), pd.read_csv("examples/fruits.csv")
+    )
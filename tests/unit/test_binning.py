@@ -0,0 +1,49 @@
+import pytest
+import numpy as np
+
+from csvviz.utils.binning import BinParams, bin_params, histogram, histogram2d
+
+
+def test_bin_params_nice_defaults():
+    """i.e. what Vega's bin() would produce, with vega-lite's default maxbins of 10"""
+    assert bin_params((10, 42)) == BinParams(start=10, stop=45, step=5)
+    assert bin_params((130, 4997)) == BinParams(start=0, stop=5000, step=500)
+    assert bin_params((10, 42), maxbins=42) == BinParams(start=10, stop=42, step=1)
+
+
+def test_bin_params_step():
+    p = bin_params((10, 42), step=3)
+    assert p.step == 3
+    assert p.start == 9
+    assert p.stop == 42
+
+
+def test_histogram_last_bin_is_closed():
+    p = bin_params((10, 50))
+    counts, edges = histogram(np.array([10, 20, 50, 50, np.nan]), p)
+    assert list(edges) == list(p.edges)
+    assert counts.sum() == 4
+    assert counts[-1] == 2
+
+
+def test_histogram2d_ignores_nan_and_out_of_range():
+    xp = BinParams(start=0, stop=2, step=1)
+    yp = BinParams(start=0, stop=10, step=5)
+    counts = histogram2d(
+        np.array([0.5, 0.5, 1.5, np.nan, 3]),
+        np.array([1, 2, 7, 1, 1]),
+        xp,
+        yp,
+    )
+    assert counts.tolist() == [[2, 0], [0, 1]]
+
+
+def test_edges_are_rounded():
+    assert BinParams(start=0, stop=1, step=0.2).edges.tolist() == [
+        0,
+        0.2,
+        0.4,
+        0.6,
+        0.8,
+        1.0,
+    ]
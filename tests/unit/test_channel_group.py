@@ -176,3 +176,19 @@ def test_get_data_field(mydata):
     assert (
         cg.get_data_field("stroke") == "amount"
     )  # ignore aggregate function (for now)
+
+
+def test_referenced_fields():
+    """resolving fields doesn't need data, just the channel args"""
+    opts = {
+        "xvar": "name|The Name",
+        "yvar": "sum(amount)",
+        "colorvar": "category",
+        "facetvar": "name",
+    }
+    assert ChannelGroup.referenced_fields(opts, color_channel_name="fill") == [
+        "name",
+        "amount",
+        "category",
+    ]
+    assert ChannelGroup.referenced_fields({"xvar": "x", "yvar": "count()"}) == ["x"]
@@ -125,6 +125,38 @@ def test_bchart_channels(bchart):
     assert bchart.channels["stroke"].field == "category"
 
 
+def test_embeds_only_encoded_fields(bchart):
+    """'amount' isn't referenced by any channel, so it shouldn't be serialized"""
+    assert bchart.column_names == ["name", "amount", "category", "season"]
+    assert list(bchart.embedded_data.columns) == ["name", "category", "season"]
+
+    rows = list(bchart.to_dict()["datasets"].values())[0]
+    assert rows[0] == {"name": "Alice", "category": "cat", "season": "fall"}
+
+
+def test_embeds_sort_and_tooltip_fields(mydata, mychannels):
+    mychannels["x"].sort = alt.EncodingSortField(field="amount", op="sum")
+    mychannels["tooltip"] = [alt.Tooltip("season"), "category"]
+    mychannels.pop("fill")
+    mychannels.pop("stroke")
+    c = Chart(
+        viz_name=VIZ_NAME,
+        data=mydata,
+        channels=mychannels,
+        defaults=Vizkit.chart_defaults(),
+    )
+    assert list(c.embedded_data.columns) == ["name", "amount", "category", "season"]
+
+    mychannels.pop("tooltip")
+    c = Chart(
+        viz_name=VIZ_NAME,
+        data=mydata,
+        channels=mychannels,
+        defaults=Vizkit.chart_defaults(),
+    )
+    assert list(c.embedded_data.columns) == ["name", "amount", "category"]
+
+
 #####################################
 # get_chart_methodname
 #####################################
@@ -0,0 +1,159 @@
+import pytest
+import json
+
+import pandas as pd
+from click.testing import CliRunner
+
+pytest.importorskip("pyarrow")
+from pyarrow import feather, parquet
+import pyarrow as pa
+
+from csvviz.exceptions import VizValueError
+from csvviz.utils import columnar
+from csvviz.vizkit.datasource import DataSource
+from csvviz.vizzes.scatter import Scatterkit
+
+scatter = Scatterkit.register_command()
+
+CARS = "examples/cars.csv"
+
+
+@pytest.fixture
+def cars():
+    return pd.read_csv(CARS)
+
+
+@pytest.fixture
+def cars_parquet(cars, tmp_path):
+    path = tmp_path / "cars.parquet"
+    # i.e. small row groups, to be skipped by their statistics
+    cars.to_parquet(path, row_group_size=50)
+    return path
+
+
+def test_detect_format(cars, cars_parquet, tmp_path):
+    assert columnar.detect_format(CARS) == "csv"
+    assert columnar.detect_format(str(cars_parquet)) == "parquet"
+    assert columnar.detect_format(str(tmp_path / "missing.csv")) == "csv"
+
+    # i.e. by magic bytes, when the extension says nothing
+    unnamed = tmp_path / "data"
+    unnamed.write_bytes(cars_parquet.read_bytes())
+    assert columnar.detect_format(str(unnamed)) == "parquet"
+    cars.to_feather(unnamed)
+    assert columnar.detect_format(str(unnamed)) == "feather"
+
+    # i.e. a text extension isn't sniffed, and a Parquet file has to end with PAR1 too
+    fake = tmp_path / "par.csv"
+    fake.write_bytes(b"PAR1,b\n1,2\n")
+    assert columnar.detect_format(str(fake)) == "csv"
+    assert list(DataSource(str(fake)).read().columns) == ["PAR1", "b"]
+    fake = fake.rename(tmp_path / "par")
+    assert columnar.detect_format(str(fake)) == "csv"
+
+    broken = tmp_path / "broken.parquet"
+    broken.write_bytes(b"PAR1 nope PAR1")
+    with pytest.raises(VizValueError, match="Can't read .* as parquet"):
+        DataSource(str(broken)).header()
+
+
+def test_read_projects_columns(cars, cars_parquet, tmp_path):
+    featherpath = tmp_path / "cars.arrow"
+    cars.to_feather(featherpath)
+    streampath = tmp_path / "cars.arrows"
+    table = pa.Table.from_pandas(cars)
+    with pa.ipc.new_stream(streampath, table.schema) as writer:
+        writer.write_table(table)
+
+    for path in (cars_parquet, featherpath, streampath):
+        src = DataSource(str(path))
+        assert src.format != "csv"
+        assert list(src.header().columns) == list(cars.columns)
+        pd.testing.assert_frame_equal(
+            src.read(usecols=["Origin", "Name"]), cars[["Name", "Origin"]]
+        )
+
+        chunks = list(DataSource(str(path), chunksize=150).chunks(["Horsepower"]))
+        assert [len(c) for c in chunks] == [150, 150, 106]
+        pd.testing.assert_frame_equal(
+            pd.concat(chunks, ignore_index=True), cars[["Horsepower"]]
+        )
+
+
+def test_read_filters_skips_row_groups(cars, tmp_path):
+    path = tmp_path / "sorted.parquet"
+    ordered = cars.sort_values("Horsepower", ignore_index=True)
+    ordered.to_parquet(path, row_group_size=50)
+    filters = [("Horsepower", 100, 150), ("Name", 0, 1)]
+
+    # i.e. only the row groups wholly outside of the range are skipped, and every
+    # row of the rest is kept, in range or not
+    src = DataSource(str(path))
+    df = src.read(filters=filters)
+    assert 0 < len(df) < len(cars)
+    assert df["Horsepower"].min() < 100 or df["Horsepower"].max() > 150
+    expected = ordered["Horsepower"].between(100, 150)
+    assert expected.sum() == df["Horsepower"].between(100, 150).sum()
+    assert src.skipped_rows == len(cars) - len(df)
+
+    # i.e. CSV can't skip anything
+    pd.testing.assert_frame_equal(DataSource(CARS).read(filters=filters), cars)
+
+
+def test_missing_pyarrow(cars_parquet, monkeypatch):
+    monkeypatch.setattr("csvviz.utils.columnar.is_available", lambda: False)
+    with pytest.raises(Exception, match="requires pyarrow"):
+        DataSource(str(cars_parquet)).header()
+
+
+def test_cli_parquet(cars_parquet):
+    def spec(path, *args):
+        args = ["-x", "Horsepower", "-y", "Miles_per_Gallon", *args]
+        resp = CliRunner().invoke(scatter, [*args, "--json", "--no-preview", path])
+        d = json.loads(resp.output)
+        d.pop("selection", None)
+        return d
+
+    full = spec(CARS)
+    assert spec(str(cars_parquet)) == full
+
+
+def test_cli_parquet_limits_match_csv(cars, tmp_path):
+    def spec(path, *args):
+        args = ["-x", "Horsepower", "-y", "Miles_per_Gallon", *args]
+        resp = CliRunner().invoke(scatter, [*args, "--json", "--no-preview", path])
+        d = json.loads(resp.output)
+        d.pop("selection", None)
+        return d
+
+    path = tmp_path / "sorted.parquet"
+    cars.sort_values("Horsepower", ignore_index=True).to_parquet(
+        path, row_group_size=50
+    )
+    csvpath = tmp_path / "sorted.csv"
+    cars.sort_values("Horsepower", ignore_index=True).to_csv(csvpath, index=False)
+
+    # i.e. the size and color legends' domains depend on every row, so none are skipped
+    for args in (
+        ["--xlim", "100,150", "--ylim", "10,30", "-s", "Weight_in_lbs"],
+        ["--xlim", "100,150", "--ylim", "10,30", "-c", "Origin"],
+        ["--xlim", "100,150"],  # i.e. y's domain depends on every row
+    ):
+        assert spec(str(path), *args) == spec(str(csvpath), *args)
+
+    # with only x and y, both limited, the skipped row groups are all out of view
+    lims = ["--xlim", "100,150", "--ylim", "10,30"]
+    pq, csv = spec(str(path), *lims), spec(str(csvpath), *lims)
+    pq_rows = pq["datasets"][pq["data"]["name"]]
+    csv_rows = csv["datasets"][csv["data"]["name"]]
+    assert len(pq_rows) < len(csv_rows)
+
+    def in_view(rows):
+        return [
+            r
+            for r in rows
+            if 100 <= (r["Horsepower"] or 0) <= 150
+            and 10 <= (r["Miles_per_Gallon"] or 0) <= 30
+        ]
+
+    assert in_view(pq_rows) == in_view(csv_rows)
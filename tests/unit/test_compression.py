@@ -0,0 +1,122 @@
+import pytest
+import bz2
+import gzip
+import io
+import json
+import lzma
+from pathlib import Path
+
+import pandas as pd
+from click.testing import CliRunner
+
+from csvviz.exceptions import VizValueError
+from csvviz.utils import compression
+from csvviz.vizkit.datasource import DataSource
+from csvviz.vizzes.bar import Barkit
+
+bar = Barkit.register_command()
+
+FRUITS = Path("examples/fruits.csv")
+
+COMPRESSORS = {
+    "gzip": (".gz", gzip.compress),
+    "bz2": (".bz2", bz2.compress),
+    "xz": (".xz", lzma.compress),
+}
+
+
+@pytest.fixture(params=sorted(COMPRESSORS))
+def compressed(request, tmp_path):
+    suffix, compress = COMPRESSORS[request.param]
+    path = tmp_path / f"fruits.csv{suffix}"
+    path.write_bytes(compress(FRUITS.read_bytes()))
+    return request.param, path
+
+
+def test_detect(compressed, tmp_path):
+    name, path = compressed
+    assert compression.detect(str(path)) == name
+    assert compression.detect(str(FRUITS)) is None
+
+    # i.e. by magic bytes
+    unnamed = tmp_path / "fruits"
+    unnamed.write_bytes(path.read_bytes())
+    assert compression.detect(str(unnamed)) == name
+    with open(unnamed, "rb") as f:
+        assert compression.detect_stream(f) == name
+        assert f.tell() == 0
+
+
+def test_text_suffix_isnt_sniffed(tmp_path):
+    # i.e. a header that happens to start with bz2's magic bytes
+    path = tmp_path / "bzh.csv"
+    path.write_text("BZh,b\n1,2\n")
+    assert compression.detect(str(path)) is None
+    assert list(DataSource(str(path)).read().columns) == ["BZh", "b"]
+
+
+def test_invalid_compression(compressed, tmp_path):
+    name, path = compressed
+    for src in (tmp_path / "unnamed", tmp_path / "truncated.csv.gz"):
+        data = path.read_bytes()
+        src.write_bytes(
+            data[: len(data) // 2]
+            if src.suffix
+            else data[: compression.MAGIC_LENGTH] + b"oops"
+        )
+        with pytest.raises(VizValueError, match="Can't decompress"):
+            DataSource(str(src)).read()
+        with pytest.raises(VizValueError, match="Can't decompress"):
+            list(DataSource(str(src), chunksize=2).chunks())
+
+
+def test_datasource(compressed, tmp_path):
+    name, path = compressed
+    expected = pd.read_csv(FRUITS)
+    unnamed = tmp_path / "fruits"
+    unnamed.write_bytes(path.read_bytes())
+
+    for src in (str(path), str(unnamed)):
+        ds = DataSource(src)
+        assert ds.compression == name
+        assert list(ds.header().columns) == list(expected.columns)
+        pd.testing.assert_frame_equal(
+            ds.read(usecols=["revenue", "product"]), expected[["product", "revenue"]]
+        )
+        chunks = list(DataSource(src, chunksize=5).chunks(["revenue"]))
+        assert len(chunks) > 1
+        pd.testing.assert_frame_equal(
+            pd.concat(chunks, ignore_index=True), expected[["revenue"]]
+        )
+
+    # i.e. piped in, which can only be read once
+    stream = io.TextIOWrapper(io.BufferedReader(io.BytesIO(path.read_bytes())))
+    ds = DataSource(stream)
+    assert ds.compression == name
+    assert ds.is_rewindable is False
+    ds.header()
+    pd.testing.assert_frame_equal(ds.read(), expected)
+
+
+def test_zstd(tmp_path):
+    zstandard = pytest.importorskip("zstandard")
+    path = tmp_path / "fruits.csv.zst"
+    path.write_bytes(zstandard.ZstdCompressor().compress(FRUITS.read_bytes()))
+    pd.testing.assert_frame_equal(DataSource(str(path)).read(), pd.read_csv(FRUITS))
+
+
+def test_cli(tmp_path):
+    path = tmp_path / "fruits.csv.gz"
+    path.write_bytes(gzip.compress(FRUITS.read_bytes()))
+    args = ["-x", "product", "-y", "sum(revenue)", "--json", "--no-preview"]
+
+    def spec(*a, **kwargs):
+        resp = CliRunner().invoke(bar, [*args, *a], **kwargs)
+        d = json.loads(resp.output)
+        d.pop("selection", None)
+        return d
+
+    expected = spec(str(FRUITS))
+    assert spec(str(path)) == expected
+    assert spec("--chunksize", "3", str(path)) == spec("--chunksize", "3", str(FRUITS))
+    assert spec("-", input=path.read_bytes()) == expected
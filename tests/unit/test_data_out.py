@@ -0,0 +1,102 @@
+import pytest
+import io
+import json
+from pathlib import Path
+
+import pandas as pd
+from click.testing import CliRunner
+
+from csvviz.exceptions import VizValueError
+from csvviz.vizkit.data_out import write_data
+from csvviz.vizzes.bar import Barkit
+
+bar = Barkit.register_command()
+
+ARGS = ["-x", "product", "-y", "sum(revenue)", "--json", "--no-preview"]
+
+
+def spec(*args) -> dict:
+    resp = CliRunner().invoke(bar, [*ARGS, *args, "examples/fruits.csv"])
+    d = json.loads(resp.output)
+    d.pop("selection", None)
+    return d
+
+
+def test_write_data_to_file(tmp_path):
+    df = pd.DataFrame({"name": ["a", None], "amount": [1.5, None]})
+    data = write_data(df, str(tmp_path / "d.json"))
+    assert data.to_dict() == {"url": f"{tmp_path}/d.json", "format": {"type": "json"}}
+    assert json.loads((tmp_path / "d.json").read_text()) == [
+        {"name": "a", "amount": 1.5},
+        {"name": None, "amount": None},
+    ]
+
+    data = write_data(df, str(tmp_path / "d.tsv"))
+    assert data.format.to_dict() == {"type": "tsv", "parse": {"amount": "number"}}
+    assert (tmp_path / "d.tsv").read_text() == "name\tamount\na\t1.5\n\t\n"
+
+    with pytest.raises(VizValueError, match="must end with"):
+        write_data(df, str(tmp_path / "d.txt"))
+    with pytest.raises(VizValueError, match="mixed types"):
+        write_data(pd.DataFrame({"x": [1, "a"]}), str(tmp_path / "d.csv"))
+
+
+def test_write_data_to_dir_is_content_addressed(tmp_path):
+    dirpath = f"{tmp_path}/data/"
+    df = pd.DataFrame({"x": [1, 2]})
+    url = write_data(df, dirpath).url
+    assert url == write_data(df.copy(), dirpath).url
+    assert url != write_data(pd.DataFrame({"x": [1, 3]}), dirpath).url
+    assert len(list(Path(dirpath).iterdir())) == 2
+
+    # i.e. JSON, when the data can't be CSV
+    mixed = write_data(pd.DataFrame({"x": [1, "a"]}), dirpath)
+    assert mixed.url.endswith(".json")
+    assert mixed.format.type == "json"
+
+
+def test_cli_data_out(tmp_path):
+    expected = spec("--no-cache")
+    values = expected.pop("datasets")[expected["data"]["name"]]
+
+    cdata = spec("--data-out", str(tmp_path / "fruits.json"))
+    assert "datasets" not in cdata
+    assert cdata.pop("data") == {
+        "url": f"{tmp_path}/fruits.json",
+        "format": {"type": "json"},
+    }
+    expected.pop("data")
+    assert cdata == expected
+    assert json.loads((tmp_path / "fruits.json").read_text()) == values
+
+    cdata = spec("--data-out", f"{tmp_path}/")
+    path = Path(cdata["data"]["url"])
+    assert path.parent == tmp_path and path.suffix == ".csv"
+    assert pd.read_csv(path).to_dict(orient="records") == values
+
+
+def test_cli_data_out_split_facets(tmp_path):
+    args = [*ARGS, "-g", "season", "--split-facets", str(tmp_path / "charts")]
+    resp = CliRunner().invoke(
+        bar, [*args, "--data-out", str(tmp_path / "d.csv"), "examples/fruits.csv"]
+    )
+    assert resp.exit_code == 1
+    assert "has to be a directory" in resp.output
+
+    resp = CliRunner().invoke(
+        bar, [*args, "--data-out", f"{tmp_path}/data/", "examples/fruits.csv"]
+    )
+    assert resp.exit_code == 0
+    urls = {json.loads(Path(p).read_text())["data"]["url"] for p in resp.output.split()}
+    assert len(urls) == len(resp.output.split()) > 1
+    assert all(Path(u).exists() for u in urls)
+
+
+def test_preview_embeds_the_data(tmp_path, monkeypatch):
+    shown = []
+    monkeypatch.setattr(Barkit, "open_chart_in_browser", staticmethod(shown.append))
+    opts = {"xvar": "product", "yvar": "revenue", "data_out": f"{tmp_path}/"}
+    vk = Barkit(input_file="examples/fruits.csv", options=opts)
+    vk.preview_chart()
+    assert "url" in vk.chart_dict()["data"]
+    assert isinstance(shown[0].data, pd.DataFrame)
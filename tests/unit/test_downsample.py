@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+
+from csvviz.utils.downsample import as_numeric, downsample_series, lttb_indices
+
+
+def test_lttb_keeps_endpoints_and_count():
+    x = np.arange(1000, dtype=float)
+    y = np.sin(x / 50)
+    idx = lttb_indices(x, y, 100)
+
+    assert len(idx) == 100
+    assert idx[0] == 0 and idx[-1] == 999
+    assert (np.diff(idx) > 0).all()
+
+
+def test_lttb_keeps_spikes():
+    x = np.arange(500, dtype=float)
+    y = np.zeros(500)
+    y[123] = 100
+    y[321] = -100
+    idx = lttb_indices(x, y, 20)
+
+    assert 123 in idx
+    assert 321 in idx
+
+
+def test_lttb_passthrough_when_small():
+    x = np.arange(5, dtype=float)
+    assert list(lttb_indices(x, x, 10)) == [0, 1, 2, 3, 4]
+    assert list(lttb_indices(x, x, 2)) == [0, 4]
+
+
+def test_as_numeric_dates():
+    vals = as_numeric(pd.Series(["2020-01-01", "2020-01-03"]))
+    assert vals[1] - vals[0] == 2 * 24 * 3600 * 1e9
+
+    # unparseable values fall back to their position
+    assert list(as_numeric(pd.Series(["a", "b", "c"]))) == [0, 1, 2]
+
+
+def test_downsample_series_per_group():
+    df = pd.DataFrame(
+        {
+            "x": list(range(100)) * 2,
+            "y": list(np.random.RandomState(0).rand(200)),
+            "g": ["a"] * 100 + ["b"] * 100,
+        }
+    )
+    out = downsample_series(df, "x", "y", by=["g"], max_points=10)
+
+    assert out.groupby("g").size().to_dict() == {"a": 10, "b": 10}
+    # original row order is kept
+    assert list(out.index) == sorted(out.index)
+    assert out.iloc[0].to_dict() == df.iloc[0].to_dict()
+
+
+def test_downsample_series_sorts_non_iso_dates_as_dates():
+    dates = pd.date_range("2005-01-01", periods=60, freq="MS")
+    data = pd.DataFrame({"date": dates.strftime("%b %d %Y"), "price": range(60)})
+    out = downsample_series(data, "date", "price", [], 8)
+
+    assert len(out) == 8
+    assert out["date"].iloc[0] == "Jan 01 2005"
+    assert out["date"].iloc[-1] == "Dec 01 2009"
+
+
+def test_downsample_series_stacked():
+    rand = np.random.RandomState(0)
+    df = pd.DataFrame(
+        {
+            "x": list(range(100)) * 3,
+            "y": list(rand.rand(300)),
+            "g": ["a"] * 100 + ["b"] * 100 + ["c"] * 100,
+            "f": ["one"] * 200 + ["two"] * 100,
+        }
+    )
+    out = downsample_series(
+        df, "x", "y", by=["g", "f"], max_points=10, stacked_by=["g"]
+    )
+
+    assert out.groupby("g").size().to_dict() == {"a": 10, "b": 10, "c": 10}
+    xs = out.groupby("g")["x"].apply(list)
+    assert xs["a"] == xs["b"]
+    # i.e. facets are stacks of their own
+    assert xs["c"] != xs["a"]
+    assert list(out.index) == sorted(out.index)
@@ -0,0 +1,112 @@
+import pytest
+import json
+from pathlib import Path
+
+import altair as alt
+from click.testing import CliRunner
+
+from csvviz.exceptions import ConflictingArgs
+from csvviz.vizkit.chart import Chart
+from csvviz.vizkit.facets import FacetSplitter, facet_filename
+from csvviz.vizzes.bar import Barkit
+from csvviz.vizzes.line import Linekit
+from csvviz.vizzes.scatter import Scatterkit
+
+bar = Barkit.register_command()
+
+FRUIT_OPTS = {
+    "xvar": "product",
+    "yvar": "revenue",
+    "colorvar": "season",
+    "facetvar": "region",
+    "no_preview": True,
+    "to_json": False,
+}
+
+
+def test_facet_filename():
+    taken = set()
+    assert facet_filename("North America", taken) == "North-America.json"
+    assert facet_filename("north america", taken) == "north-america-2.json"
+    assert facet_filename("../etc", taken) == "etc.json"
+    assert facet_filename("", taken) == "facet.json"
+
+
+def test_requires_gridvar():
+    with pytest.raises(ConflictingArgs, match="requires -g/--gridvar"):
+        Barkit(
+            "examples/fruits.csv",
+            {**FRUIT_OPTS, "facetvar": None, "split_facets": "x"},
+        )
+
+
+def test_shared_domains_of_stacked_bars():
+    splitter = FacetSplitter(Barkit("examples/fruits.csv", FRUIT_OPTS))
+    channels = splitter.shared_channels()
+    assert "facet" not in channels
+    assert channels["x"].scale.domain == ["apples", "oranges", "peaches"]
+    assert channels["fill"].scale.domain == ["fall", "summer"]
+    # the tallest stack, i.e. south peaches: 110 + 130
+    assert channels["y"].scale.domain == [0, 240]
+    # the original channels are untouched
+    assert "facet" in splitter.channels
+    assert splitter.channels["y"]._get("scale", None) is None
+
+
+def test_shared_domains_unstacked_and_normalized():
+    lk = Linekit(
+        "examples/fruits.csv", {**FRUIT_OPTS, "xvar": "revenue", "yvar": "product"}
+    )
+    channels = FacetSplitter(lk).shared_channels()
+    assert channels["x"].scale.domain == [0, 130]
+
+    bk = Barkit("examples/fruits.csv", {**FRUIT_OPTS, "normalized": True})
+    channels = FacetSplitter(bk).shared_channels()
+    assert channels["y"]._get("scale", None) is None
+
+
+def test_shared_size_domain():
+    sk = Scatterkit(
+        "examples/fruits.csv",
+        {**FRUIT_OPTS, "xvar": "product", "sizevar": "revenue"},
+    )
+    channels = FacetSplitter(sk).shared_channels()
+    assert channels["size"].scale.domain == [0, 130]
+
+
+def test_split_facets_cli(tmp_path):
+    outdir = tmp_path / "charts"
+    result = CliRunner().invoke(
+        bar,
+        [
+            "examples/fruits.csv",
+            "--no-preview",
+            "--json",
+            *("-x", "product", "-y", "revenue", "-c", "season", "-g", "region"),
+            *("--split-facets", str(outdir)),
+        ],
+    )
+    assert result.exit_code == 0
+    assert result.output.splitlines() == [
+        str(outdir / f"{r}.json") for r in ("central", "north", "south")
+    ]
+
+    spec = json.loads((outdir / "north.json").read_text())
+    assert spec["title"] == "north"
+    assert "facet" not in spec["encoding"]
+    rows = list(spec["datasets"].values())[0]
+    assert len(rows) == 6
+    assert {r["product"] for r in rows} == {"apples", "oranges", "peaches"}
+    assert "region" not in rows[0]
+
+
+def test_split_facets_failure_leaves_no_file(tmp_path, monkeypatch):
+    def iter_json(self, **kwargs):
+        yield "{"
+        raise alt.MaxRowsError("too many rows")
+
+    monkeypatch.setattr(Chart, "iter_json", iter_json)
+    vk = Barkit(input_file="examples/fruits.csv", options=FRUIT_OPTS)
+    with pytest.raises(alt.MaxRowsError):
+        list(vk.write_split_facets(tmp_path / "charts"))
+    assert list((tmp_path / "charts").iterdir()) == []
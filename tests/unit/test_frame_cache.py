@@ -0,0 +1,114 @@
+import pytest
+import json
+import os
+
+import pandas as pd
+from click.testing import CliRunner
+
+pytest.importorskip("pyarrow")
+
+from csvviz.utils import frame_cache
+from csvviz.vizkit.datasource import DataSource
+from csvviz.vizzes.bar import Barkit
+
+bar = Barkit.register_command()
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("CSVVIZ_FRAME_CACHE_DIR", str(tmp_path / "frames"))
+
+
+@pytest.fixture
+def datafile(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_text(
+        "name,amount,count,flag,note\n"
+        "a,1.5,1,true,x\n"
+        "b,,2,false,\n"
+        "c,3.25,3,true,zz\n"
+    )
+    return path
+
+
+def no_read_csv(*args, **kwargs):
+    raise AssertionError("the frame should've come from the cache")
+
+
+def test_datasource_reads_from_cache(datafile, monkeypatch):
+    expected = pd.read_csv(datafile)
+
+    src = DataSource(str(datafile), frame_cache=True)
+    assert list(src.header().columns) == list(expected.columns)
+    pd.testing.assert_frame_equal(src.read(), expected)
+
+    monkeypatch.setattr("csvviz.vizkit.datasource.pd.read_csv", no_read_csv)
+    src = DataSource(str(datafile), frame_cache=True)
+    assert list(src.header().columns) == list(expected.columns)
+    pd.testing.assert_frame_equal(
+        src.read(usecols=["note", "amount"]), expected[["amount", "note"]]
+    )
+
+
+def test_file_objects_and_edits(datafile):
+    with open(datafile) as f:
+        DataSource(f, frame_cache=True).read()
+    assert frame_cache.header(str(datafile)) is not None
+
+    datafile.write_text("name,amount\nd,4\n")
+    os.utime(datafile, ns=(1, 1))
+    assert frame_cache.header(str(datafile)) is None
+    assert DataSource(str(datafile), frame_cache=True).read()["name"].tolist() == ["d"]
+
+
+def test_store_preserves_dtypes(datafile):
+    df = pd.DataFrame(
+        {
+            "when": pd.to_datetime(["2020-01-01", None, "2021-06-30"]),
+            "n": pd.array([1, None, 3], dtype="Int64"),
+        }
+    )
+    assert frame_cache.store(str(datafile), df) is True
+    pd.testing.assert_frame_equal(frame_cache.read(str(datafile)), df)
+
+    mixed = pd.DataFrame({"x": [1, "a", 2.5]})
+    assert frame_cache.store(str(datafile), mixed) is False
+    assert list(frame_cache.frames_dir().glob("*.tmp")) == []
+
+
+def test_evicts_by_total_bytes(tmp_path, monkeypatch):
+    paths = []
+    for i in range(3):
+        p = tmp_path / f"{i}.csv"
+        p.write_text("a,b\n" + "\n".join(f"{j},{j}" for j in range(1000)))
+        paths.append(p)
+        DataSource(str(p), frame_cache=True).read()
+        os.utime(frame_cache.entry_path(str(p)), ns=(i * 10**9, i * 10**9))
+
+    size = frame_cache.entry_path(str(paths[0])).stat().st_size
+    monkeypatch.setenv("CSVVIZ_FRAME_CACHE_BYTES", str(size * 2))
+    frame_cache.read(str(paths[0]))  # i.e. now the most recently used
+
+    p = tmp_path / "3.csv"
+    p.write_text(paths[0].read_text())
+    DataSource(str(p), frame_cache=True).read()
+    cached = [frame_cache.header(str(x)) is not None for x in [*paths, p]]
+    assert cached == [True, False, False, True]
+
+
+def test_cli_frame_cache(monkeypatch):
+    args = ["-x", "product", "-y", "revenue", "--json", "--no-preview", "--no-cache"]
+    args.append("examples/fruits.csv")
+    expected = json.loads(CliRunner().invoke(bar, args).output)
+    expected.pop("selection", None)
+
+    for _ in range(2):
+        resp = CliRunner(mix_stderr=False).invoke(bar, [*args, "--frame-cache"])
+        cdata = json.loads(resp.stdout)
+        cdata.pop("selection", None)
+        assert cdata == expected
+        assert resp.stderr == ""
+
+    monkeypatch.setattr("csvviz.utils.arrow.is_available", lambda: False)
+    resp = CliRunner(mix_stderr=False).invoke(bar, [*args, "--frame-cache"])
+    assert "--frame-cache is ignored because it requires pyarrow" in resp.stderr
@@ -4,8 +4,10 @@
 
 import pytest
 import re
+import subprocess
+import sys
 from click.testing import CliRunner
-from csvviz import __version__
+from csvviz import __version__, registry
 from csvviz.cli import cli
 
 
@@ -45,3 +47,19 @@ def test_top_version():
     result = CliRunner().invoke(cli, ["--version"])
     assert result.exit_code == 0
     assert result.output.strip() == __version__
+
+
+def test_subcommands_are_registered():
+    result = CliRunner().invoke(cli, ["--help"])
+    for name in registry.COMMANDS:
+        assert re.search(rf"^ +{name}\b", result.output, re.M)
+        assert registry.load_command(name).name == name
+
+
+def test_version_does_not_import_altair():
+    """i.e. subcommands and their heavy dependencies are only imported when invoked"""
+    code = "import sys; from csvviz.cli import cli; print('altair' in sys.modules)"
+    out = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert out.stdout.strip() == "False"
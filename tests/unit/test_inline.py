@@ -0,0 +1,98 @@
+import pytest
+import io
+import json
+
+import altair as alt
+import numpy as np
+import pandas as pd
+from click.testing import CliRunner
+
+from csvviz.vizkit.inline import inline_data, parse_types
+from csvviz.vizzes.line import Linekit
+
+line = Linekit.register_command()
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame(
+        {
+            "name": ["a,b", 'say "hi"', None],
+            "zip": ["02139", "10001", "94110"],
+            "amount": [1.5, np.nan, np.inf],
+            "count": [1, 2, 3],
+            "flag": [True, None, False],
+            "when": pd.to_datetime(["2020-01-01", None, "2021-06-30 10:30"]),
+            "kind": pd.Categorical(["x", "y", "x"]),
+        }
+    )
+
+
+def test_parse_types(df):
+    assert parse_types(df) == {
+        "name": None,
+        "zip": None,
+        "amount": "number",
+        "count": "number",
+        "flag": "boolean",
+        "when": "date",
+        "kind": None,
+    }
+    assert parse_types(pd.DataFrame({"mixed": [1, "a"]})) is None
+
+
+def test_inline_data(df):
+    assert inline_data(df, "records") is df
+    data = inline_data(df, "csv")
+    assert isinstance(data, alt.InlineData)
+    assert data.format.to_dict() == {
+        "type": "csv",
+        "parse": {
+            "amount": "number",
+            "count": "number",
+            "flag": "boolean",
+            "when": "date",
+        },
+    }
+
+    # i.e. what Vega's reader gets, before format.parse is applied
+    text = pd.read_csv(io.StringIO(data.values), dtype=str, keep_default_na=False)
+    assert text.to_dict(orient="list") == {
+        "name": ["a,b", 'say "hi"', ""],
+        "zip": ["02139", "10001", "94110"],
+        "amount": ["1.5", "", ""],
+        "count": ["1", "2", "3"],
+        "flag": ["true", "", "false"],
+        "when": ["2020-01-01T00:00:00", "", "2021-06-30T10:30:00"],
+        "kind": ["x", "y", "x"],
+    }
+
+    tsv = inline_data(df, "tsv")
+    assert tsv.format.type == "tsv"
+    assert tsv.values.splitlines()[0] == "name\tzip\tamount\tcount\tflag\twhen\tkind"
+
+
+def test_cli_inline_format():
+    args = ["-x", "date", "-y", "price", "-c", "company", "--json", "--no-preview"]
+    args += ["--no-cache", "examples/stocks.csv"]
+
+    def spec(*a):
+        resp = CliRunner(mix_stderr=False).invoke(line, [*args, *a])
+        assert resp.stderr == ""
+        return json.loads(resp.stdout)
+
+    records = spec()
+    rows = records["datasets"][records["data"]["name"]]
+    cdata = spec("--inline-format", "csv")
+    assert cdata["data"]["format"] == {"type": "csv", "parse": {"price": "number"}}
+    values = cdata["datasets"][cdata["data"]["name"]]
+    assert isinstance(values, str)
+    assert pd.read_csv(io.StringIO(values)).to_dict(orient="records") == rows
+
+
+def test_inline_format_falls_back():
+    data = pd.DataFrame({"x": [1, 2], "y": [1, "a"]})
+    vk = Linekit(input_file=data, options={"inline_format": "tsv"})
+    assert vk.chart.is_inline_text is False
+    assert "format" not in vk.chart_dict()["data"]
+    assert "--inline-format tsv is ignored" in vk.warnings[-1]
@@ -0,0 +1,122 @@
+import pytest
+import altair as alt
+import pandas as pd
+
+from csvviz import altUndefined
+from csvviz.exceptions import ConflictingArgs
+from csvviz.vizkit import Vizkit
+from csvviz.vizkit.channel_group import ChannelGroup
+from csvviz.vizkit.pushdown import AggregatePushdown, aggregate_title
+
+
+@pytest.fixture
+def mydata():
+    return pd.DataFrame(
+        [
+            {"name": "Alice", "amount": 10, "category": "cat"},
+            {"name": "Bob", "amount": 20, "category": "dog"},
+            {"name": "Alice", "amount": 5, "category": "dog"},
+            {"name": "Alice", "amount": 1, "category": "cat"},
+        ]
+    )
+
+
+def test_aggregate_title():
+    assert aggregate_title("sum", "amount") == "Sum of amount"
+    assert aggregate_title("mean", "amount") == "Mean of amount"
+    assert aggregate_title("count", None) == "Count of Records"
+
+
+def test_pushdown_plan(mydata):
+    cg = ChannelGroup(
+        {"xvar": "name", "yvar": "sum(amount)", "fillvar": "category"}, mydata
+    )
+    p = AggregatePushdown(cg)
+    assert p.is_applicable
+    assert p.keys == ["name", "category"]
+    assert [(m.channel_name, m.op, m.field, m.column) for m in p.measures] == [
+        ("y", "sum", "amount", "sum_amount")
+    ]
+
+
+def test_pushdown_not_applicable(mydata):
+    assert not AggregatePushdown(
+        ChannelGroup({"xvar": "name", "yvar": "amount"}, mydata)
+    ).is_applicable
+    # binned/timeunit'ed keys, and unsupported ops, are left to Vega
+    assert not AggregatePushdown(
+        ChannelGroup({"xvar": "name", "yvar": "argmax(amount)"}, mydata)
+    ).is_applicable
+    cg = ChannelGroup({"xvar": "amount", "yvar": "count()"}, mydata)
+    cg["x"].bin = True
+    assert not AggregatePushdown(cg).is_applicable
+
+
+def test_pushdown_aggregate_and_rewrite(mydata):
+    cg = ChannelGroup(
+        {"xvar": "name", "yvar": "sum(amount)|Total", "sizevar": "count()"}, mydata
+    )
+    p = AggregatePushdown(cg)
+    df = p.aggregate(mydata)
+    assert df.to_dict(orient="records") == [
+        {"name": "Alice", "sum_amount": 16, "count": 3},
+        {"name": "Bob", "sum_amount": 20, "count": 1},
+    ]
+
+    p.rewrite_channels(cg)
+    assert cg["y"].field == "sum_amount"
+    assert cg["y"].aggregate is altUndefined
+    assert cg["y"].title == "Total"
+    assert cg["size"].field == "count"
+    assert cg["size"].title == "Count of Records"
+
+
+def test_vizkit_embeds_only_aggregated_rows():
+    v = Vizkit(
+        input_file="examples/fruits.csv",
+        options={"xvar": "product", "yvar": "mean(revenue)", "colorvar": "season"},
+    )
+    d = v.chart_dict()
+    rows = d["datasets"][d["data"]["name"]]
+    assert len(rows) == len(v.df.groupby(["product", "season"]))
+    assert d["encoding"]["y"] == {
+        "field": "mean_revenue",
+        "title": "Mean of revenue",
+        "type": "quantitative",
+    }
+
+
+def test_pushdown_fold_matches_aggregate(mydata):
+    cg = ChannelGroup(
+        {"xvar": "category", "yvar": "mean(amount)", "sizevar": "count()"}, mydata
+    )
+    p = AggregatePushdown(cg)
+    assert p.is_foldable
+    chunks = [mydata.iloc[i : i + 1] for i in range(len(mydata))]
+    assert p.fold(chunks).equals(p.aggregate(mydata))
+
+
+def test_pushdown_not_foldable(mydata):
+    cg = ChannelGroup({"xvar": "category", "yvar": "median(amount)"}, mydata)
+    p = AggregatePushdown(cg)
+    assert p.is_applicable
+    assert not p.is_foldable
+
+
+def test_vizkit_chunked_mode():
+    opts = {"xvar": "product", "yvar": "sum(revenue)", "chunksize": 2}
+    v = Vizkit(input_file="examples/fruits.csv", options=opts)
+    # df is only a sample, i.e. the first chunk
+    assert len(v.df) == 2
+    assert v.chart_data.to_dict(orient="records") == [
+        {"product": "apples", "sum_revenue": 240},
+        {"product": "oranges", "sum_revenue": 420},
+        {"product": "peaches", "sum_revenue": 400},
+    ]
+
+
+def test_vizkit_chunked_mode_requires_aggregates():
+    opts = {"xvar": "product", "yvar": "revenue", "chunksize": 2}
+    with pytest.raises(ConflictingArgs) as err:
+        Vizkit(input_file="examples/fruits.csv", options=opts)
+    assert "--chunksize requires" in str(err.value)
@@ -0,0 +1,80 @@
+import pytest
+
+import altair as alt
+import numpy as np
+import pandas as pd
+from altair.utils import sanitize_dataframe
+
+from csvviz.vizkit.sanitize import data_transformer, sanitize
+from csvviz.vizzes.line import Linekit
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame(
+        {
+            "name": ["a", None, "c"],
+            "count": [1, 2, 3],
+            "amount": [1.5, np.nan, np.inf],
+            "flag": [True, False, True],
+            "maybe": pd.array([True, None, False], dtype="boolean"),
+            "num": pd.array([1, None, 3], dtype="Int64"),
+            "kind": pd.Categorical(["x", None, "y"]),
+            "when": pd.to_datetime(["2020-01-01", None, "2021-06-30 10:30:00.5"]),
+            "tz": pd.to_datetime(["2020-01-01", "2020-01-02", None]).tz_localize("UTC"),
+            "arr": [np.array([1, 2]), None, "z"],
+        },
+        index=[5, 5, 7],
+    )
+
+
+def test_sanitize_matches_altair(df):
+    expected = sanitize_dataframe(df).to_dict(orient="records")
+    assert sanitize(df).to_dict(orient="records") == expected
+    assert expected[2]["when"] == "2021-06-30T10:30:00.500000"
+
+    ranged = pd.DataFrame([[1, 2]])
+    assert sanitize(ranged).to_dict(orient="records") == [{"0": 1, "1": 2}]
+
+    with pytest.raises(ValueError, match="invalid column name"):
+        sanitize(pd.DataFrame({1: [1]}))
+    with pytest.raises(ValueError, match="not supported by Altair"):
+        sanitize(pd.DataFrame({"t": pd.to_timedelta([1], unit="s")}))
+
+
+def test_data_transformer(df):
+    assert data_transformer(df) == {"values": sanitize(df).to_dict(orient="records")}
+    with pytest.raises(alt.MaxRowsError):
+        data_transformer(df, max_rows=2)
+
+    clean = sanitize(df).iloc[:1]
+    assert data_transformer(df, sanitized=(df, clean))["values"] == clean.to_dict(
+        orient="records"
+    )
+    # i.e. only for the dataframe that it's a copy of
+    assert len(data_transformer(df.copy(), sanitized=(df, clean))["values"]) == 3
+
+
+def test_chart_uses_data_transformer():
+    vk = Linekit(
+        input_file="examples/stocks.csv",
+        options={"xvar": "date", "yvar": "price", "colorvar": "company"},
+    )
+    assert alt.data_transformers.active == "csvviz"
+    spec = vk.chart_dict()
+    with alt.data_transformers.enable("default"):
+        assert vk.raw_chart.to_dict() == spec
+
+
+def test_chart_sanitizes_once(monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        "csvviz.vizkit.chart.sanitize", lambda df: calls.append(df) or sanitize(df)
+    )
+    vk = Linekit(input_file="examples/stocks.csv", options={"xvar": "date"})
+    vk.chart_dict()
+    vk.chart_json()
+    vk.chart_json(fast=True)
+    assert len(calls) == 1
+    assert calls[0] is vk.raw_chart.data
+    assert alt.data_transformers.options.get("sanitized") is None
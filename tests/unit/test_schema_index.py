@@ -0,0 +1,43 @@
+import pytest
+import json
+
+import altair as alt
+
+from csvviz.utils import schema_index as si
+
+
+def test_index_matches_schema():
+    idx = si.schema_index()
+    assert idx.is_color_scheme("tableau20")
+    assert not idx.is_color_scheme("not-a-scheme")
+    assert idx.is_color("hotpink")
+    assert idx.topic("aggregates") == list(alt.utils.core.AGGREGATES)
+    assert idx.topic("typecodes") == alt.utils.core.INV_TYPECODE_MAP
+    assert ("Categorical", "tableau10") in idx.topic("colorschemes")
+
+
+def test_index_is_cached_in_memory():
+    assert si.schema_index() is si.schema_index()
+
+
+def test_index_is_persisted(tmp_path, monkeypatch):
+    monkeypatch.setenv("CSVVIZ_CACHE_DIR", str(tmp_path))
+    version = si.altair_version()
+    si.schema_index(version)
+    path = tmp_path / f"schema-index-{version}.json"
+    assert json.loads(path.read_text())["altair"] == version
+
+    # a fresh process would read the index back, rather than build it
+    si._load_index.cache_clear()
+    monkeypatch.setattr(si, "build_index", lambda: pytest.fail("rebuilt the index"))
+    assert si.schema_index(version).is_color_scheme("blues")
+
+
+def test_stale_index_is_rebuilt(tmp_path, monkeypatch):
+    monkeypatch.setenv("CSVVIZ_CACHE_DIR", str(tmp_path))
+    path = tmp_path / "schema-index-0.0.json"
+    path.write_text(json.dumps({"altair": "0.0", "colors": []}))
+
+    si._load_index.cache_clear()
+    assert si.schema_index("0.0").is_color("hotpink")
+    assert json.loads(path.read_text())["colors"]
@@ -0,0 +1,117 @@
+import pytest
+import json
+
+import numpy as np
+import pandas as pd
+from click.testing import CliRunner
+
+from csvviz.exceptions import VizValueError
+from csvviz.vizkit import serialize
+from csvviz.vizkit.serialize import (
+    cached_validator,
+    dumps,
+    iter_chart_json,
+    iter_records,
+    skeleton,
+    validate_skeleton,
+)
+from csvviz.vizzes.bar import Barkit
+from csvviz.vizzes.line import Linekit
+
+bar = Barkit.register_command()
+
+SPEC = {
+    "mark": "bar",
+    "data": {"name": "data-abc"},
+    "encoding": {"x": {"field": "name", "type": "nominal"}},
+    "datasets": {"data-abc": [{"name": "Alice"}, {"name": "Bob"}]},
+}
+
+
+def test_skeleton_swaps_out_data():
+    skel = skeleton(SPEC)
+    assert skel["datasets"] == {"data-abc": []}
+    assert skel["encoding"] == SPEC["encoding"]
+    # the original is untouched
+    assert len(SPEC["datasets"]["data-abc"]) == 2
+
+    assert skeleton({"data": {"values": [1, 2]}})["data"] == {"values": []}
+
+
+def test_validator_is_cached():
+    assert cached_validator() is cached_validator()
+
+
+def test_validate_skeleton():
+    assert validate_skeleton(SPEC) is True
+
+    with pytest.raises(VizValueError, match=r"Invalid chart spec at 'encoding/x/type'"):
+        validate_skeleton({**SPEC, "encoding": {"x": {"field": "name", "type": "nah"}}})
+
+
+def test_dumps_numpy_and_timestamps():
+    txt = dumps(
+        {"a": np.int64(3), "b": pd.Timestamp("2020-01-02"), "c": np.float32(1.5)}
+    )
+    assert json.loads(txt) == {"a": 3, "b": "2020-01-02T00:00:00", "c": 1.5}
+    assert txt.startswith("{\n  ")
+
+
+def test_no_validate_output_matches():
+    args = ["examples/fruits.csv", "--json", "--no-preview"]
+    slow = json.loads(CliRunner().invoke(bar, args).output)
+    fast = json.loads(CliRunner().invoke(bar, [*args, "--no-validate"]).output)
+
+    # altair numbers each selection param with a global counter
+    slow.pop("selection")
+    fast.pop("selection")
+    assert slow == fast
+
+
+@pytest.mark.parametrize("fast", [False, True])
+def test_iter_chart_json_matches_to_json(fast):
+    vk = Linekit(
+        input_file="examples/stocks.csv",
+        options={"xvar": "date", "yvar": "price", "colorvar": "company"},
+    )
+    expected = vk.chart.to_json(fast=fast)
+    for chunk_rows in (1, 7, 10000):
+        chunks = list(iter_chart_json(vk.raw_chart, fast=fast, chunk_rows=chunk_rows))
+        assert "".join(chunks) == expected
+    assert len(chunks) == 4  # i.e. head, the rows, the closing bracket, and tail
+
+    assert "".join(vk.chart.iter_json(indent=4, sort_keys=True)) == vk.chart.to_json(
+        indent=4, sort_keys=True
+    )
+
+    empty = Barkit(
+        input_file=pd.DataFrame({"name": [], "amount": []}),
+        options={"xvar": "name", "yvar": "amount"},
+    )
+    assert "".join(empty.chart.iter_json(fast=fast)) == empty.chart.to_json(fast=fast)
+
+
+def test_output_chart_streams(capsys):
+    vk = Barkit(input_file="examples/fruits.csv", options={"to_json": True})
+    spec = vk.output_chart()
+    assert capsys.readouterr().out == spec + "\n"
+    assert spec == vk.chart_json()
+
+    # i.e. too big to keep, e.g. for the spec cache, but still sent in full
+    assert vk.output_chart(keep_bytes=100) is None
+    assert capsys.readouterr().out == spec + "\n"
+
+
+def test_iter_records_sanitizes_a_chunk_at_a_time(monkeypatch):
+    df = pd.DataFrame({"when": pd.to_datetime(["2020-01-01", None, "2020-01-03"])})
+    sizes = []
+    sanitize = serialize.sanitize
+    monkeypatch.setattr(
+        serialize, "sanitize", lambda d: sizes.append(len(d)) or sanitize(d)
+    )
+    chunks = list(iter_records(df, 2))
+    assert chunks == [
+        [{"when": "2020-01-01T00:00:00"}, {"when": ""}],
+        [{"when": "2020-01-03T00:00:00"}],
+    ]
+    assert sizes == [2, 1]
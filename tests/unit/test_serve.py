@@ -0,0 +1,162 @@
+import pytest
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+from click.testing import CliRunner
+
+from csvviz import serve
+from csvviz.cli import cli
+
+pytestmark = pytest.mark.skipif(
+    not serve.is_supported(), reason="requires Unix domain sockets"
+)
+
+REPO_DIR = Path(__file__).resolve().parents[2]
+
+# i.e. a `csvviz` that only ever forwards; 99 means that it wasn't forwarded
+CLIENT = "import sys; from csvviz.serve import forward; code = forward(sys.argv[2:], sys.argv[1]); sys.exit(99 if code is None else code)"
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    path = tmp_path / "d.sock"
+    proc = subprocess.Popen(
+        [sys.executable, "-c", "from csvviz.cli import main; main()"]
+        + ["serve", "--socket", str(path)],
+        cwd=REPO_DIR,
+    )
+    for _ in range(300):
+        if path.exists():
+            break
+        time.sleep(0.1)
+    yield path
+    proc.terminate()
+    proc.wait(timeout=10)
+    assert not path.exists()
+
+
+def client(sockpath, *args, **kwargs) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, "-c", CLIENT, str(sockpath), *args],
+        cwd=REPO_DIR,
+        capture_output=True,
+        **kwargs,
+    )
+
+
+def spec(output) -> dict:
+    # altair's selection names come from a global counter, which differs between processes
+    d = json.loads(output)
+    d.pop("selection", None)
+    return d
+
+
+def test_forward_without_daemon(tmp_path):
+    assert serve.forward(["bar", "examples/fruits.csv"], tmp_path / "nope.sock") is None
+
+
+def test_forward_skips_local_commands(tmp_path, monkeypatch):
+    assert serve.forward(["serve"], tmp_path / "d.sock") is None
+    monkeypatch.setenv("CSVVIZ_NO_DAEMON", "1")
+    assert serve.forward(["bar"], tmp_path / "d.sock") is None
+
+
+def test_socket_path(monkeypatch, tmp_path):
+    monkeypatch.setenv("CSVVIZ_SOCKET", str(tmp_path / "x.sock"))
+    assert serve.socket_path() == tmp_path / "x.sock"
+    monkeypatch.delenv("CSVVIZ_SOCKET")
+    assert serve.socket_path().name == "serve.sock"
+
+
+def test_daemon_output_matches_in_process(daemon):
+    args = ["bar", "examples/fruits.csv", "-c", "product", "--json", "--no-preview"]
+    expected = spec(CliRunner().invoke(cli, args).output)
+
+    result = client(daemon, *args)
+    assert result.returncode == 0
+    assert spec(result.stdout) == expected
+
+    # piped stdin
+    data = (REPO_DIR / "examples/fruits.csv").read_bytes()
+    result = client(daemon, *args[0:1], "-", *args[2:], input=data)
+    assert result.returncode == 0
+    assert spec(result.stdout) == expected
+
+
+def test_daemon_errors(daemon):
+    result = client(daemon, "bar", "examples/fruits.csv", "-x", "nope", "--json")
+    assert result.returncode == 1
+    assert "'nope' is either an invalid column name" in result.stderr.decode()
+
+    result = client(daemon, "bar", "--bad-option")
+    assert result.returncode == 2
+    assert "no such option" in result.stderr.decode().lower()
+
+
+def test_serve_refuses_a_second_daemon(daemon):
+    result = CliRunner().invoke(cli, ["serve", "--socket", str(daemon)])
+    assert result.exit_code == 1
+    assert "already listening" in result.output
+
+
+def test_socket_is_only_accessible_to_its_owner(daemon):
+    assert daemon.stat().st_mode & 0o077 == 0
+
+
+def test_daemon_uses_the_clients_env(daemon, tmp_path):
+    frames = tmp_path / "frames"
+    env = {**os.environ, "CSVVIZ_FRAME_CACHE_DIR": str(frames)}
+    args = ["bar", "examples/fruits.csv", "--frame-cache", "--json", "--no-preview"]
+    result = client(daemon, *args, env=env)
+    assert result.returncode == 0
+    assert list(frames.iterdir())
+
+
+def fake_daemon(path, reply: bytes) -> threading.Thread:
+    """accepts one request, and answers it with reply"""
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(str(path))
+    listener.listen(1)
+
+    def answer():
+        with listener:
+            conn, _addr = listener.accept()
+            with conn:
+                conn.recvmsg(serve.MAX_HEADER_SIZE, socket.CMSG_SPACE(64))
+                conn.sendall(reply)
+
+    thread = threading.Thread(target=answer)
+    thread.start()
+    return thread
+
+
+def test_forward_falls_back_only_on_mismatch(tmp_path, capsys):
+    path = tmp_path / "mismatch.sock"
+    thread = fake_daemon(path, b'{"error": "mismatch"}\n')
+    assert serve.forward(["bar"], path) is None
+    thread.join()
+
+    # i.e. the daemon went away after it was handed stdin and the like
+    path = tmp_path / "died.sock"
+    thread = fake_daemon(path, b"")
+    assert serve.forward(["bar"], path) == 1
+    thread.join()
+    assert "failed to run the command" in capsys.readouterr().err
+
+
+def test_apply_env(monkeypatch):
+    monkeypatch.setenv("CSVVIZ_CACHE_DIR", "/daemon")
+    monkeypatch.setenv("CSVVIZ_SOCKET", "/daemon.sock")
+    monkeypatch.setenv("HOME", "/home/daemon")
+    monkeypatch.delenv("CSVVIZ_FRAME_CACHE_BYTES", raising=False)
+    serve.apply_env({"CSVVIZ_CACHE_DIR": "/client", "CSVVIZ_FRAME_CACHE_BYTES": "1"})
+    assert os.environ["CSVVIZ_CACHE_DIR"] == "/client"
+    assert os.environ["CSVVIZ_FRAME_CACHE_BYTES"] == "1"
+    assert "CSVVIZ_SOCKET" not in os.environ
+    assert os.environ["HOME"] == "/home/daemon"
@@ -0,0 +1,109 @@
+import pytest
+import json
+import os
+import shutil
+
+from click.testing import CliRunner
+
+from csvviz.utils import spec_cache
+from csvviz.vizzes.bar import Barkit
+
+bar = Barkit.register_command()
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("CSVVIZ_CACHE_DIR", str(tmp_path / "cache"))
+
+
+@pytest.fixture
+def datafile(tmp_path):
+    path = tmp_path / "fruits.csv"
+    shutil.copy("examples/fruits.csv", path)
+    return path
+
+
+def test_cache_key(datafile, tmp_path):
+    opts = {"xvar": "product", "to_json": True}
+    key = spec_cache.cache_key("bar", opts, str(datafile))
+    assert key == spec_cache.cache_key(
+        "bar", {**opts, "no_preview": True}, str(datafile)
+    )
+    assert key != spec_cache.cache_key("line", opts, str(datafile))
+    assert key != spec_cache.cache_key("bar", {**opts, "xvar": "region"}, str(datafile))
+
+    # i.e. a copy with the same content has the same key, a touched file too
+    other = tmp_path / "copy.csv"
+    shutil.copy(datafile, other)
+    assert key == spec_cache.cache_key("bar", opts, str(other))
+    os.utime(datafile, ns=(1, 1))
+    assert key == spec_cache.cache_key("bar", opts, str(datafile))
+
+    datafile.write_text(datafile.read_text() + "kiwis,1,fall,north\n")
+    assert key != spec_cache.cache_key("bar", opts, str(datafile))
+
+    assert spec_cache.cache_key("bar", opts, str(tmp_path / "nope.csv")) is None
+    assert spec_cache.cache_key("bar", opts, "-") is None
+
+
+def test_get_and_put():
+    assert spec_cache.get("abc") is None
+    spec_cache.put("abc", '{\n  "mark": "bar"\n}', ["careful"])
+    hit = spec_cache.get("abc")
+    assert hit.spec == '{\n  "mark": "bar"\n}'
+    assert hit.warnings == ["careful"]
+
+
+def test_evicts_least_recently_used():
+    spec = "x" * 100
+    for i, key in enumerate(("a", "b", "c")):
+        spec_cache.put(key, spec, [])
+        path = spec_cache.specs_dir() / f"{key}.json"
+        os.utime(path, ns=(i * 10**9, i * 10**9))
+
+    spec_cache.get("a")  # i.e. now the most recently used
+    spec_cache.put("d", spec, [], max_bytes=350)  # i.e. room for 3 specs
+    assert [k for k in "abcd" if spec_cache.get(k)] == ["a", "c", "d"]
+
+
+def test_cli_reuses_cached_spec(datafile, monkeypatch):
+    args = ["-x", "product", "-y", "revenue", "--json", "--no-preview", str(datafile)]
+    first = CliRunner(mix_stderr=False).invoke(bar, [*args, "--color-scheme", "nope"])
+    assert first.exit_code == 0
+
+    def broken(*args, **kwargs):
+        raise AssertionError("the chart should've come from the cache")
+
+    monkeypatch.setattr(Barkit, "__init__", broken)
+    second = CliRunner(mix_stderr=False).invoke(bar, [*args, "--color-scheme", "nope"])
+    assert second.exit_code == 0
+    assert second.stdout == first.stdout
+    assert second.stderr == first.stderr
+
+    resp = CliRunner().invoke(bar, [*args, "--color-scheme", "nope", "--no-cache"])
+    assert isinstance(resp.exception, AssertionError)
+
+
+def test_main_serves_cached_argv(datafile, capsys, monkeypatch):
+    from csvviz.cli import cli, output_cached
+
+    argv = ["bar", "-x", "product", "--json", "--no-preview", str(datafile)]
+    assert output_cached(argv) is False
+    resp = CliRunner().invoke(cli, argv, obj={"argv": argv})
+    assert resp.exit_code == 0
+
+    assert output_cached(argv) is True
+    assert capsys.readouterr().out == resp.output
+    assert output_cached([*argv, "--no-cache"]) is False
+
+    # i.e. a changed input invalidates the alias
+    datafile.write_text(datafile.read_text() + "kiwis,1,fall,north\n")
+    assert output_cached(argv) is False
+
+    # and only charts that aren't previewed are aliased
+    monkeypatch.setattr(
+        Barkit, "open_chart_in_browser", staticmethod(lambda chart: None)
+    )
+    argv = ["bar", "-x", "region", "--json", str(datafile)]
+    assert CliRunner().invoke(cli, argv, obj={"argv": argv}).exit_code == 0
+    assert output_cached(argv) is False
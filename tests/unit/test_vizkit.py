@@ -211,3 +211,65 @@ def test_parse_channel_arg_edge_case_vizkit_channels():
     # in the edge case that it isn't like for testing, filename needs
     # to be something...
     assert s.filename == "[input]"
+
+
+def test_vizkit_parses_only_referenced_columns():
+    opts = {
+        "xvar": "product",
+        "yvar": "sum(revenue)",
+    }
+    v = Vizkit(input_file="examples/fruits.csv", options=opts)
+    assert v.column_names == ["product", "revenue"]
+
+
+def test_vizkit_projects_columns_of_unseekable_input():
+    class Pipe(StringIO):
+        def seekable(self):
+            return False
+
+    data = Pipe("id,name,amount,extra\n1,foo,42,x\n2,bar,9,y\n")
+    v = Vizkit(input_file=data, options={"xvar": "name"})
+    # yvar defaults to columns[1], i.e. 'name'
+    assert v.column_names == ["name"]
+
+    data = Pipe("id,name,amount,extra\n1,foo,42,x\n2,bar,9,y\n")
+    v = Vizkit(input_file=data, options={"xvar": "name", "yvar": "amount"})
+    assert v.column_names == ["name", "amount"]
+    assert list(v.df["amount"]) == [42, 9]
+
+
+def test_vizkit_chunked_unseekable_input():
+    class Pipe(StringIO):
+        def seekable(self):
+            return False
+
+    data = Pipe("id,name,amount\n1,foo,42\n2,bar,9\n3,foo,1\n")
+    opts = {"xvar": "name", "yvar": "sum(amount)", "chunksize": 1}
+    v = Vizkit(input_file=data, options=opts)
+    assert v.chart_data.to_dict(orient="records") == [
+        {"name": "bar", "sum_amount": 9},
+        {"name": "foo", "sum_amount": 43},
+    ]
+
+
+def test_vizkit_memory_maps_local_files(monkeypatch):
+    calls = []
+    read_csv = pd.read_csv
+
+    def spy(*args, **kwargs):
+        calls.append((args[0], kwargs.get("memory_map")))
+        return read_csv(*args, **kwargs)
+
+    monkeypatch.setattr("csvviz.vizkit.datasource.pd.read_csv", spy)
+    opts = {"xvar": "product", "yvar": "sum(revenue)"}
+    with open("examples/fruits.csv", "rb") as f:
+        v = Vizkit(input_file=f, options=opts)
+    assert calls == [("examples/fruits.csv", True)] * 2
+    assert v.df["revenue"].sum() == pd.read_csv("examples/fruits.csv")["revenue"].sum()
+
+    # i.e. an open file that's already been read from is left as is
+    calls.clear()
+    with open("examples/fruits.csv", "rb") as f:
+        f.readline()
+        Vizkit(input_file=f, options={"xvar": "apples", "yvar": "40"})
+    assert [m for _f, m in calls] == [None] * 2
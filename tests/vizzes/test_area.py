@@ -198,3 +198,36 @@ def test_area_error_when_fill_sort_but_no_fill():
         "ConflictingArgs: --color-sort 'asc' was specified, but no --colorvar value"
         in result.output.strip()
     )
+
+
+def test_max_points_stacked():
+    """stacked series are downsampled to the same x values, so that the stack lines up"""
+    cdata = json.loads(
+        CliRunner()
+        .invoke(
+            area,
+            [
+                *STOCK_ARGS,
+                "-x",
+                "date",
+                "-y",
+                "price",
+                "-c",
+                "company",
+                "--max-points",
+                "5",
+            ],
+        )
+        .output
+    )
+    datavals = list(cdata["datasets"].values())[0]
+    dates = {}
+    for d in datavals:
+        dates.setdefault(d["company"], []).append(d["date"])
+
+    assert len(dates["AAPL"]) == 5
+    assert dates["AAPL"] == dates["MSFT"]
+    assert dates["AAPL"][0] == "Jan 1 2000"
+    assert dates["AAPL"][-1] == "Jan 1 2010"
+    # i.e. GOOG only starts in 2005
+    assert set(dates["GOOG"]) <= set(dates["AAPL"])
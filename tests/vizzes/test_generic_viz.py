@@ -119,8 +119,9 @@ def test_var_title_specified():
     assert cdata["encoding"]["x"]["title"] == "Foo"
     assert cdata["encoding"]["y"]["field"] == "amount"
     assert cdata["encoding"]["y"]["title"] == "Bar"
-    assert cdata["encoding"]["fill"]["aggregate"] == "sum"
-    assert cdata["encoding"]["fill"]["field"] == "amount"
+    # aggregates are pushed down, i.e. the fill channel refers to the pre-summed column
+    assert "aggregate" not in cdata["encoding"]["fill"]
+    assert cdata["encoding"]["fill"]["field"] == "sum_amount"
     assert cdata["encoding"]["fill"]["title"] == "Woah"
 
 
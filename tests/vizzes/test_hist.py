@@ -49,23 +49,32 @@ def test_hist_defaults():
 
     assert cdata["mark"]["type"] == "bar"
 
+    # values are binned before embedding, i.e. only bin edges and counts are in the data
     datavals = list(cdata["datasets"].values())[0]
-    assert datavals[0] == {"amount": 20, "name": "Alice"}
-    assert datavals[-1] == {"amount": 42, "name": "Ellie"}
+    assert datavals[0] == {"bin_start": 10, "bin_end": 15, "count": 1}
+    assert datavals[-1] == {"bin_start": 45, "bin_end": 50, "count": 1}
 
     assert cdata["encoding"]["x"] == {
-        "bin": True,
-        "field": "amount",
+        "bin": {"binned": True, "step": 5},
+        "field": "bin_start",
+        "title": "amount (binned)",
+        "type": "quantitative",
+    }
+    assert cdata["encoding"]["x2"] == {"field": "bin_end"}
+    assert cdata["encoding"]["y"] == {
+        "field": "count",
+        "title": "Count of Records",
         "type": "quantitative",
     }
-    assert cdata["encoding"]["y"] == {"aggregate": "count", "type": "quantitative"}
 
 
 def test_hist_bincount():
+    """-n/--bins is a max count, i.e. Vega's maxbins, which picks a 'nice' step"""
     cdata = json.loads(
         CliRunner().invoke(hist, ["-x", "amount", "-n", "42", *OUTPUT_ARGS]).output
     )
-    assert cdata["encoding"]["x"]["bin"]["maxbins"] == 42
+    assert cdata["encoding"]["x"]["bin"]["step"] == 1
+    assert "maxbins" not in cdata["encoding"]["x"]["bin"]
 
 
 def test_hist_bin_step_size():
@@ -133,3 +142,51 @@ def test_hist_nominal_x_bin_settings_ignored_but_warning():
         """Warning: Since 'name' consists of nominal values, csvviz will ignore bin-specific settings, e.g. -n/--bins and -s/--bin-size"""
         in result.stderr
     )
+
+
+def test_hist_colorvar_bins_per_group():
+    """each color group is binned across the same edges"""
+    cdata = json.loads(
+        CliRunner()
+        .invoke(
+            hist,
+            [
+                "-x",
+                "revenue",
+                "-c",
+                "season",
+                "--json",
+                "--no-preview",
+                "examples/fruits.csv",
+            ],
+        )
+        .output
+    )
+    datavals = list(cdata["datasets"].values())[0]
+    assert all(
+        set(d.keys()) == {"season", "bin_start", "bin_end", "count"} for d in datavals
+    )
+    assert cdata["encoding"]["fill"]["field"] == "season"
+
+    steps = {round(d["bin_end"] - d["bin_start"], 9) for d in datavals}
+    assert steps == {cdata["encoding"]["x"]["bin"]["step"]}
+
+
+def test_hist_horizontal_bins_on_y():
+    cdata = json.loads(
+        CliRunner().invoke(hist, ["-x", "amount", "-H", *OUTPUT_ARGS]).output
+    )
+    assert cdata["encoding"]["y"]["field"] == "bin_start"
+    assert cdata["encoding"]["y2"] == {"field": "bin_end"}
+    assert cdata["encoding"]["x"]["field"] == "count"
+
+
+def test_hist_chunked_mode_matches():
+    args = ["-x", "revenue", "-c", "season", "--json", "--no-preview"]
+    src = "examples/fruits.csv"
+    whole = json.loads(CliRunner().invoke(hist, [*args, src]).output)
+    chunked = json.loads(
+        CliRunner().invoke(hist, [*args, "--chunksize", "3", src]).output
+    )
+    assert chunked["datasets"] == whole["datasets"]
+    assert chunked["encoding"] == whole["encoding"]
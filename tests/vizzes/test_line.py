@@ -97,3 +97,42 @@ def test_line_colors():
     )
     e = cdata["encoding"]["stroke"]
     assert e["scale"]["range"] == ["red", "yellow"]
+
+
+def test_max_points():
+    cdata = json.loads(
+        CliRunner()
+        .invoke(
+            line,
+            [
+                *STOCK_ARGS,
+                "-x",
+                "date",
+                "-y",
+                "price",
+                "-c",
+                "company",
+                "--max-points",
+                "5",
+            ],
+        )
+        .output
+    )
+    datavals = list(cdata["datasets"].values())[0]
+    counts = {}
+    for d in datavals:
+        counts[d["company"]] = counts.get(d["company"], 0) + 1
+
+    assert counts == {"GOOG": 5, "AAPL": 5, "MSFT": 5}
+    # each series keeps its first and last points
+    firsts = {}
+    for d in datavals:
+        firsts.setdefault(d["company"], d["date"])
+    assert firsts["MSFT"] == "Jan 1 2000"
+
+
+def test_max_points_ignored_for_timeunit():
+    result = CliRunner().invoke(
+        line, [*STOCK_ARGS, "-x", "year(date)", "-y", "price", "--max-points", "5"]
+    )
+    assert "--max-points is ignored" in result.output
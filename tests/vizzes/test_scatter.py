@@ -116,3 +116,54 @@ def test_scatter_colors():
     )
     e = cdata["encoding"]["fill"]
     assert e["scale"]["range"] == ["red", "yellow"]
+
+
+def test_scatter_density():
+    resp = CliRunner(mix_stderr=False).invoke(
+        scatter, [*OUTPUT_ARGS, "-x", "mass", "-y", "volume", "--density"]
+    )
+    cdata = json.loads(resp.output)
+
+    assert cdata["mark"]["type"] == "rect"
+    enc = cdata["encoding"]
+    assert enc["x"]["field"] == "x_start"
+    assert enc["x"]["bin"] == {"binned": True, "step": enc["x"]["bin"]["step"]}
+    assert enc["x"]["title"] == "mass"
+    assert enc["x2"]["field"] == "x_end"
+    assert enc["y2"]["field"] == "y_end"
+    assert enc["fill"]["field"] == "count"
+    assert enc["fill"]["scale"]["scheme"] == DEFAULT_COLOR_SCHEMES["heatmap"]
+
+    cells = list(cdata["datasets"].values())[0]
+    assert sum(c["count"] for c in cells) == 14
+    assert set(cells[0].keys()) == {"x_start", "x_end", "y_start", "y_end", "count"}
+
+
+def test_scatter_density_limits_are_the_domain():
+    resp = CliRunner(mix_stderr=False).invoke(
+        scatter,
+        [*OUTPUT_ARGS, "--density", "--xlim", "0,0.5", "--ylim", "0,50", "-c", "breed"],
+    )
+    cdata = json.loads(resp.output)
+    cells = list(cdata["datasets"].values())[0]
+
+    # i.e. rows where mass <= 0.5 and volume <= 50
+    assert sum(c["count"] for c in cells) == 10
+    assert "'fill' channel is ignored in density mode" in resp.stderr
+
+
+def test_scatter_density_auto(monkeypatch):
+    cdata = json.loads(CliRunner().invoke(scatter, OUTPUT_ARGS).output)
+    assert cdata["mark"]["type"] == "point"
+
+    monkeypatch.setattr("csvviz.vizzes.scatter.DEFAULT_DENSITY_THRESHOLD", 10)
+    # i.e. the cached spec from above doesn't know about the patched threshold
+    cdata = json.loads(
+        CliRunner().invoke(scatter, [*OUTPUT_ARGS, "--no-cache"]).output
+    )
+    assert cdata["mark"]["type"] == "rect"
+
+    cdata = json.loads(
+        CliRunner().invoke(scatter, [*OUTPUT_ARGS, "--no-density"]).output
+    )
+    assert cdata["mark"]["type"] == "point"